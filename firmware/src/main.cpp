@@ -35,6 +35,10 @@
 // Default settings, classes and variables
 #define INTERNAL_LED LED_BUILTIN            // Indicates if connected with server
 #define OSC_IN_PORT 8888                    // Local osc receive port on the esp
+#define FRAME_MAGIC 0x50                    // First byte of a binary motor frame ('P')
+#define FRAME_FLAG_WIDE 0x01                // Binary frame values are uint16 instead of uint8
+#define FRAME_HEADER_SIZE 5                 // magic, flags, seq (uint16), count
+#define CAPABILITIES 0x01                   // Feature bits sent with the discovery reply, 0x01 = binary frames
 unsigned int remotePort = 0;                // Once available saves the remote server port we reply to
 unsigned long lastPacketRecv = millis();    // The time in millis when the last valid osc packet was received
 unsigned long lastHeartbeatSent = 0;        // The last time in millis when a heartbeat message was sent
@@ -43,6 +47,11 @@ bool enableOTA = true;                      // If ota should currently be enable
 byte mac[6];                                // The wifi mac adress of the devices (used for identification of the device)
 char hostname[11];                          // A human-friendly hotname with the 2nd half of the hardware mac
 byte numMotors = 0;                         // The total number of motors attached to this hardware
+uint16_t lastFrameSeq = 0;                  // The sequence number of the last applied binary frame
+bool hasFrameSeq = false;                   // If lastFrameSeq is valid (reset on connection loss)
+uint32_t framesReceived = 0;                // Binary frames applied since boot, reported with the pong
+uint32_t framesMissed = 0;                  // Binary frames skipped by sequence gaps since boot
+byte frameBuffer[FRAME_HEADER_SIZE + 2*255];  // Receive buffer for binary frames
 
 OSCErrorCode oscError;
 WiFiUDP Udp;
@@ -201,6 +210,46 @@ void handle_osc_motors(OSCMessage &msg) {
     #endif
 }
 
+void handle_binary_frame(byte *frame, unsigned int frameSize) {
+    // Validate header and length
+    if (frameSize < FRAME_HEADER_SIZE || frame[0] != FRAME_MAGIC) return;
+    byte flags = frame[1];
+    uint16_t seq = (frame[2] << 8) | frame[3];
+    byte count = frame[4];
+    byte width = (flags & FRAME_FLAG_WIDE) ? 2 : 1;
+    if (frameSize != FRAME_HEADER_SIZE + (unsigned int)count*width) return;
+
+    // Drop frames that are older than the last one we applied
+    if (hasFrameSeq) {
+        uint16_t delta = seq - lastFrameSeq;
+        if (delta == 0 || delta >= 0x8000) {
+            #if DEBUG
+            Serial.print("Dropped out-of-order frame ");
+            Serial.println(seq);
+            #endif
+            return;
+        }
+    }
+    if (hasFrameSeq) {
+        framesMissed += (uint16_t)(seq - lastFrameSeq) - 1;
+    }
+    framesReceived++;
+    lastFrameSeq = seq;
+    hasFrameSeq = true;
+    lastPacketRecv = millis();
+
+    for (byte i=0; i<count; i++) {
+        // Safeguard from overwriting into void
+        if (i >= numMotors) break;
+        byte *value = frame + FRAME_HEADER_SIZE + i*width;
+        uint16_t val = width == 2 ? (value[0] << 8) | value[1] : value[0];
+        analogWrite(motorPins[i], val);
+    }
+    hasConnection = true;
+    // Enable the onbord led
+    digitalWrite(INTERNAL_LED, LEDON);
+}
+
 void handle_osc_discover(OSCMessage &msg) {
     // If connection was established once, do not send reply
     if (hasConnection) return;
@@ -217,6 +266,7 @@ void handle_osc_discover(OSCMessage &msg) {
     discoverReply.add(WiFi.macAddress().c_str());
     discoverReply.add(hostname);
     discoverReply.add(numMotors);
+    discoverReply.add(CAPABILITIES);
     Udp.beginPacket(Udp.remoteIP(), remotePort);
     discoverReply.send(Udp);
     Udp.endPacket();
@@ -234,6 +284,22 @@ void handle_osc_discover(OSCMessage &msg) {
     sendHeartbeat();
 }
 
+void handle_osc_ping(OSCMessage &msg) {
+    // The server measures the link with these, see LinkTelemetry.py
+    if (remotePort == 0 || !msg.isInt(0)) return;
+
+    OSCMessage pongMessage("/patpatpat/pong");
+    pongMessage.add(WiFi.macAddress().c_str());
+    pongMessage.add(msg.getInt(0));
+    pongMessage.add((int32_t)micros());
+    pongMessage.add((int32_t)framesReceived);
+    pongMessage.add((int32_t)framesMissed);
+    Udp.beginPacket(Udp.remoteIP(), remotePort);
+    pongMessage.send(Udp);
+    Udp.endPacket();
+    pongMessage.empty();
+}
+
 void handleOTA() {
     if (enableOTA) {
         // Disable PTA after 5 minutes
@@ -251,8 +317,12 @@ void loop() {
     // Read data from udp socket
     unsigned int udpPacketSize = Udp.parsePacket();
 
-    // Check if there is data to parse
-    if (udpPacketSize > 0) {
+    // Binary motor frames start with a magic byte, osc always with '/' or '#'
+    if (udpPacketSize > 0 && Udp.peek() == FRAME_MAGIC) {
+        unsigned int frameSize = Udp.read(frameBuffer, sizeof(frameBuffer));
+        handle_binary_frame(frameBuffer, frameSize);
+        Udp.flush();
+    } else if (udpPacketSize > 0) {
         // Create new osc message from buffer
         OSCMessage msg;
         while (udpPacketSize--) {
@@ -270,6 +340,7 @@ void loop() {
             // Handle osc message
             msg.dispatch("/m", handle_osc_motors);
             msg.dispatch("/patpatpat/discover", handle_osc_discover);
+            msg.dispatch("/patpatpat/ping", handle_osc_ping);
         }
 
     }
@@ -282,6 +353,8 @@ void loop() {
     // Disable led and save state when we got no packets in the last 1000ms
     if (millis()-lastPacketRecv > 1000) {
         hasConnection = false;
+        // The server might have restarted, accept any sequence number
+        hasFrameSeq = false;
         digitalWrite(INTERNAL_LED, LEDOFF);
         // Set all motors to stop
         for (byte i=0; i<numMotors; i++) {
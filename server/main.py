@@ -64,5 +64,6 @@ if __name__ == "__main__":
     # Run the app
     returnCode = app.exec()
     logger.info(f"Exiting vrc-patpatpat with return code {returnCode}")
+    config.close()
     # Do any other deconstructing here if we need to
     sys.exit(returnCode)
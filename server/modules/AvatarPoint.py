@@ -15,22 +15,6 @@ class AvatarPointSphere(Sphere3D):
 
         self.xyz: tuple[float, ...] = settings["xyz"]
         self.receiverId: str = settings["receiverId"]
-        self.lastValue = 0.0
-        self.lastValueTs: float = 0.0
-
-    def vrcContact(self, time: float, params: list):
-        """The callback run by the ContactGroupManager when new data
-        from VRC comes in for this contact receiver.
-
-        Args:
-            time (float): The osc message creation time
-            params (list): The osc parameters
-        """
-        try:
-            self.lastValue = params[0]
-            self.lastValueTs = time
-        except Exception as E:
-            logger.exception(E)
 
     def __repr__(self) -> str:
         return self.__class__.__name__ + ":" + ";"\
@@ -0,0 +1,99 @@
+"""Vectorized multilateration for many independent problems at once.
+
+All problems are stacked into padded arrays so a whole tick worth of
+MLAT groups is solved with a handful of NumPy calls instead of one
+Python-level optimizer run per group.
+
+Typical usage example:
+
+    anchors = np.zeros((groups, maxAnchors, 3))
+    distances = np.zeros((groups, maxAnchors))
+    mask = np.zeros((groups, maxAnchors), dtype=bool)
+    ...
+    points, ok = solveBatch(anchors, distances, mask)
+"""
+
+import numpy as np
+
+
+def solveBatch(anchors: np.ndarray, distances: np.ndarray,
+               mask: np.ndarray, iterations: int = 5,
+               damping: float = 1e-6) -> tuple[np.ndarray, np.ndarray]:
+    """Solve a batch of padded multilateration problems.
+
+    A linearized least squares solution is used as starting point and
+    then refined with a few damped Gauss-Newton iterations on the
+    actual range residuals.
+
+    Args:
+        anchors (np.ndarray): (G, N, 3) anchor positions.
+        distances (np.ndarray): (G, N) measured distances.
+        mask (np.ndarray): (G, N) True for used anchors. The first
+            anchor of every problem must be used.
+        iterations (int, optional): Gauss-Newton iterations.
+            Defaults to 5.
+        damping (float, optional): Levenberg damping for the normal
+            equations. Defaults to 1e-6.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The (G, 3) solved points and a
+            (G,) bool array that is False where no solution was found.
+    """
+    weights = mask.astype(np.float64)
+    eye = np.eye(3)
+
+    # linearize against the first anchor of every problem:
+    # 2(a_i - a_0)·p = |a_i|² - |a_0|² - d_i² + d_0²
+    ref = anchors[:, :1, :]
+    refDist = distances[:, :1]
+    A = 2.0 * (anchors[:, 1:, :] - ref) * weights[:, 1:, None]
+    b = (np.sum(anchors[:, 1:, :]**2, axis=-1) - np.sum(ref**2, axis=-1)
+         - distances[:, 1:]**2 + refDist**2) * weights[:, 1:]
+    AtA = A.transpose(0, 2, 1) @ A + damping * eye
+    Atb = (A.transpose(0, 2, 1) @ b[..., None])[..., 0]
+    points = np.linalg.solve(AtA, Atb[..., None])[..., 0]
+
+    # problems that are rank deficient start at the anchor centroid
+    counts = np.maximum(weights.sum(axis=1, keepdims=True), 1.0)
+    centroid = (anchors * weights[..., None]).sum(axis=1) / counts
+    points = np.where(np.isfinite(points), points, centroid)
+
+    for _ in range(iterations):
+        diff = points[:, None, :] - anchors
+        ranges = np.maximum(np.linalg.norm(diff, axis=-1), 1e-12)
+        residuals = (ranges - distances) * weights
+        J = diff / ranges[..., None] * weights[..., None]
+        JtJ = J.transpose(0, 2, 1) @ J + damping * eye
+        Jtr = (J.transpose(0, 2, 1) @ residuals[..., None])[..., 0]
+        points = points - np.linalg.solve(JtJ, Jtr[..., None])[..., 0]
+
+    ok = np.isfinite(points).all(axis=1) & mask[:, 0]
+    return points, ok
+
+
+def motorSpeeds(points: np.ndarray, motorPositions: np.ndarray,
+                motorRadii: np.ndarray, strength: np.ndarray,
+                contactOnly: np.ndarray) -> np.ndarray:
+    """Calculate the motor speeds for a batch of solved points.
+
+    Args:
+        points (np.ndarray): (G, 3) solved points.
+        motorPositions (np.ndarray): (G, M, 3) motor positions.
+        motorRadii (np.ndarray): (G, M) motor radii, padding must be > 0.
+        strength (np.ndarray): (G,) strength factor (0-1) per problem.
+        contactOnly (np.ndarray): (G,) bool contact only mode.
+
+    Returns:
+        np.ndarray: (G, M) motor speeds.
+    """
+    distance = np.linalg.norm(
+        motorPositions - points[:, None, :], axis=-1) / motorRadii
+    # little deadband near the motors center
+    proportional = np.maximum(1.0 - np.maximum(distance, 0.1), 0.0)
+    contact = (distance <= 1.0).astype(np.float64)
+    return np.where(contactOnly[:, None], contact, proportional) \
+        * strength[:, None]
+
+
+if __name__ == "__main__":
+    print("There is no point running this file directly")
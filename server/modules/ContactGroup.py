@@ -1,6 +1,8 @@
 """This module handles everything related to running solvers"""
 
 import time
+from collections import deque
+from collections.abc import Callable
 
 from PyQt6.QtCore import QObject, Qt, QThread, QTimer
 from PyQt6.QtCore import pyqtSignal as QSignal
@@ -8,10 +10,15 @@ from PyQt6.QtCore import pyqtSlot as QSlot
 from PyQt6.QtGui import QVector3D
 
 from modules.AvatarPoint import AvatarPointSphere
+from modules.DeadlineScheduler import LivenessWatch
 from modules.GlobalConfig import GlobalConfigSingleton
+from modules.Measurements import MeasurementStage
 from modules.Motor import Motor
-from modules.Solver import SolverFactory
+from modules.OutputBuffers import (EnvelopeSettings, OutputBufferPool,
+                                   OutputFrame)
+from modules.Solver import ISolver, MlatBatch, SolverFactory
 from utils.ConfigTemplate import ConfigTemplate
+from utils.Enums import SolverType
 from utils.Logger import LoggerClass
 from utils.threadToStr import threadAsStr
 
@@ -23,15 +30,20 @@ class ContactGroup(QObject):
     dataRxStateChanged = QSignal(bool)
     avatarPointAdded = QSignal(object)
     avatarPointRemoved = QSignal(object)
-    motorPwmChanged = QSignal(int, int, int)
     strengthSliderValueChanged = QSignal(int)
     newPointSolved = QSignal(QVector3D, int)
     openSettings = QSignal()
+    _dataResumed = QSignal()
 
-    def __init__(self, configKey) -> None:
+    def __init__(self, configKey: str,
+                 measurements: MeasurementStage,
+                 outputs: OutputBufferPool) -> None:
         logger.debug(f"Creating {__class__.__name__}({configKey})")
         super().__init__()
         self._configKey = configKey
+        self._measurements = measurements
+        self._outputs = outputs
+        self._priority = 0
 
         self.motors: list[Motor] = []
         self.avatarPoints: list[AvatarPointSphere] = []
@@ -41,10 +53,18 @@ class ContactGroup(QObject):
             self._config = config.get(self._configKey)
             self._id = self._config["id"]
             self._name = self._config["name"]
+            # devices of high priority groups are sent first
+            self._priority = 1 if self._config.get("highPriority") else 0
 
             for motor in self._config["motors"]:
                 newMotor = Motor(motor)
-                newMotor.motorPwmChanged.connect(self.motorPwmChanged)
+                envelope = EnvelopeSettings(
+                    self._config.get("attackMs", 0),
+                    self._config.get("releaseMs", 200),
+                    self._config.get("smoothingMs", 0),
+                    motor["minPwm"], motor["maxPwm"])
+                newMotor.bindOutput(self._outputs.bind(
+                    *newMotor.espAddr, self._priority, envelope))
                 self.motors.append(newMotor)
 
             for avatarPoint in self._config["avatarPoints"]:
@@ -56,7 +76,8 @@ class ContactGroup(QObject):
             solverClass = SolverFactory.fromType(solverType)
             if solverClass:
                 self.solver = solverClass(
-                    self.motors, self.avatarPoints, self._configKey)
+                    self.motors, self.avatarPoints, self._configKey,
+                    self._measurements)
                 self.strengthSliderValueChanged.connect(
                     self.solver.setStrength)
                 self.solver.newPointSolved.connect(self.newPointSolved)
@@ -64,27 +85,41 @@ class ContactGroup(QObject):
             else:
                 logger.error("Unknown solver type specified")
 
-            self._currentDataState = False
-            self._dataTimer = QTimer()
-            self._dataTimer.timeout.connect(self._checkDataTimeout)
-            self._dataTimer.start(200)
+            # the same age the solver drives the motors with
+            self._dataWatch = LivenessWatch(
+                getattr(self, "solver", ISolver).maxDataAge,
+                self.dataRxStateChanged.emit)
+            self._dataResumed.connect(self._handleDataResumed)
         except Exception as E:
             logger.exception(E)
 
-    def _checkDataTimeout(self) -> None:
-        """Calculate if data for this group has recently come in.
-        """
-        # TODO: This also needs some rework as all other timeout checkers
-        now = time.time()
-        currentState = any(now - obj.lastValueTs <=
-                           0.5 for obj in self.avatarPoints)
-        if self._currentDataState != currentState:
-            self._currentDataState = currentState
-            self.dataRxStateChanged.emit(self._currentDataState)
+    @property
+    def receiverIds(self) -> set[str]:
+        """The contact receivers of this group's avatar points."""
+        return {p.receiverId for p in self.avatarPoints}
+
+    def dataReceived(self) -> None:
+        """Called by the ContactGroupManager from the solver thread for
+        every value one of our contact receivers gets. Only the time is
+        written, the main thread is woken when the state changes."""
+        if watch := getattr(self, "_dataWatch", None):
+            watch.lastSeen = time.monotonic()
+            if not watch.alive:
+                self._dataResumed.emit()
+
+    @QSlot()
+    def _handleDataResumed(self) -> None:
+        """The first value after the data timed out came in."""
+        self._dataWatch.seen(self._dataWatch.lastSeen)
 
     def close(self) -> None:
         """Closes everything we own and care for."""
         logger.debug(f"Stopping {__class__.__name__}({self._configKey})")
+        if hasattr(self, "_dataWatch"):
+            self._dataWatch.close()
+        for motor in self.motors:
+            motor.bindOutput(None)
+            self._outputs.unbind(*motor.espAddr, self._priority)
         for avatarPoint in self.avatarPoints:
             self.avatarPointRemoved.emit(avatarPoint)
         self.avatarPoints = []
@@ -98,11 +133,12 @@ class ContactGroupManager(QObject):
     registerAvatarPoint = QSignal(str)
     unregisterAvatarPoint = QSignal(str)
     tickSkipped = QSignal()  # ??
-    motorPwmChanged = QSignal(int, int, int)
     solverDone = QSignal()
     contactGroupListChanged = QSignal(dict)
     currentTpsChanged = QSignal(int)
     _tpsSettingChanged = QSignal()
+    # drop the oldest contacts if the solver stops draining them
+    MAX_PENDING_CONTACTS = 4096
 
     def __init__(self, parent: QObject | None = None) -> None:
         logger.debug(f"Creating {__class__.__name__}")
@@ -110,6 +146,20 @@ class ContactGroupManager(QObject):
         self._configKey = "groups"
         self.contactGroups: dict[int, ContactGroup] = {}
         self._avatarPoints: dict[str, list[AvatarPointSphere]] = {}
+        # the groups to notify of new data per contact receiver
+        self._receiverGroups: dict[str, list[ContactGroup]] = {}
+        self.contactGroupListChanged.connect(self._updateReceiverGroups)
+        self.measurements = MeasurementStage()
+        self.outputs = OutputBufferPool()
+        # called from the solver thread with the committed frames and
+        # the tick end time, must not block
+        self.outputSink: Callable[[tuple[OutputFrame, ...], int],
+                                  None] | None = None
+        # the vrc contacts, appended by the network reactor and drained
+        # by the solver thread, appending and popping is atomic
+        self.contacts: deque[tuple[float, str, list]] = deque(
+            maxlen=self.MAX_PENDING_CONTACTS)
+        self.mlatBatch: MlatBatch | None = None
 
         self.workerThread = QThread()
         self.worker = ContactGroupSolverWorker(self)
@@ -130,11 +180,22 @@ class ContactGroupManager(QObject):
         for key, group in groups.items():
             newGroup = self._contactGroupFactory(f"{self._configKey}.{key}")
             self.contactGroups[group["id"]] = newGroup
+        self._rebuildMlatBatch()
         self.contactGroupListChanged.emit(self.contactGroups)
 
+    def _rebuildMlatBatch(self) -> None:
+        """(Re-)create the batch of all MLAT solvers if batching is
+        enabled, otherwise remove it."""
+        if not config.get("program.batchMlat", False):
+            self.mlatBatch = None
+            return
+        solvers = [group.solver for group in self.contactGroups.values()
+                   if hasattr(group, "solver")
+                   and group.solver.getType() == SolverType.MLAT]
+        self.mlatBatch = MlatBatch(solvers) if solvers else None
+
     def _contactGroupFactory(self, key: str) -> ContactGroup:
-        group = ContactGroup(key)
-        group.motorPwmChanged.connect(self.motorPwmChanged)
+        group = ContactGroup(key, self.measurements, self.outputs)
         group.avatarPointAdded.connect(self.avatarPointAdded)
         group.avatarPointRemoved.connect(self.avatarPointRemoved)
         group.setup()
@@ -149,6 +210,7 @@ class ContactGroupManager(QObject):
         if not avatarPoint.receiverId in self._avatarPoints:
             self.registerAvatarPoint.emit(avatarPoint.receiverId)
             self._avatarPoints[avatarPoint.receiverId] = []
+            self.measurements.register(avatarPoint.receiverId)
         self._avatarPoints[avatarPoint.receiverId].append(avatarPoint)
         # logger.debug(self._avatarPoints)
 
@@ -165,25 +227,33 @@ class ContactGroupManager(QObject):
             self._avatarPoints[avatarPoint.receiverId].remove(avatarPoint)
             if not len(self._avatarPoints[avatarPoint.receiverId]):
                 self.unregisterAvatarPoint.emit(avatarPoint.receiverId)
+                self.measurements.unregister(avatarPoint.receiverId)
                 self._avatarPoints.pop(avatarPoint.receiverId)
         # logger.debug(self._avatarPoints)
 
-    @QSlot(float, str, list)
-    def onVrcContact(self, ts: float, addr: str, params: list) -> None:
-        """Distibute data coming from vrc to the ContactPoints.
-
-        Args:
-            ts (float): The osc message creation time
-            addr (str): The full osc path
-            params (list): The osc message parameter list
-        """
-        contactName = addr[19:]
-        # logger.debug(
-        # f"osc @ {ts}: addr={addr} msg={str(params)} "
-        # f"contactName = {contactName}")
-        if contactName in self._avatarPoints:
-            for point in self._avatarPoints[contactName]:
-                point.vrcContact(ts, params)
+    @QSlot(dict)
+    def _updateReceiverGroups(self, _: dict) -> None:
+        receiverGroups: dict[str, list[ContactGroup]] = {}
+        for group in self.contactGroups.values():
+            for receiverId in group.receiverIds:
+                receiverGroups.setdefault(receiverId, []).append(group)
+        self._receiverGroups = receiverGroups
+
+    def drainContacts(self) -> None:
+        """Distribute the data that came from vrc since the last tick to
+        the ContactPoints. Called from the solver thread."""
+        contacts = self.contacts
+        measurements = self.measurements
+        receiverGroups = self._receiverGroups
+        while contacts:
+            ts, addr, params = contacts.popleft()
+            contactName = addr[19:]
+            try:
+                if measurements.write(contactName, ts, params[0]):
+                    for group in receiverGroups.get(contactName, ()):
+                        group.dataReceived()
+            except Exception as E:
+                logger.exception(E)
 
     @QSlot(str)
     def _handleConfigPathChange(self, path: str) -> None:
@@ -192,6 +262,8 @@ class ContactGroupManager(QObject):
                 self.workerThread.quit()
                 self.workerThread.wait()
             self.workerThread.start()
+        elif path == "program.batchMlat":
+            self._rebuildMlatBatch()
 
     @QSlot(str)
     def _handleConfigRootChange(self, path: str) -> None:
@@ -215,6 +287,7 @@ class ContactGroupManager(QObject):
 
             newGroup = self._contactGroupFactory(path)
             self.contactGroups[group["id"]] = newGroup
+            self._rebuildMlatBatch()
             self.contactGroupListChanged.emit(self.contactGroups)
             if fireSettings:
                 newGroup.openSettings.emit()
@@ -225,6 +298,7 @@ class ContactGroupManager(QObject):
             groupId = int(path.removeprefix("groups.group"))
             self.contactGroups[groupId].close()
             del self.contactGroups[groupId]
+            self._rebuildMlatBatch()
             self.contactGroupListChanged.emit(self.contactGroups)
 
     @QSlot()
@@ -322,13 +396,24 @@ class ContactGroupSolverWorker(QObject):
             self._skipflag = False
             return
 
-        # Run solver
+        # Run solver on one consistent snapshot of the contact data
         try:
+            self._manager.drainContacts()
+            snapshot = self._manager.measurements.snapshot(time.time())
+            batch = self._manager.mlatBatch
             for group in self._manager.contactGroups.values():
-                group.solver.solve()
+                if batch and group.solver in batch:
+                    continue
+                group.solver.solve(snapshot)
+            if batch:
+                batch.solve(snapshot)
         except Exception as E:
             logger.exception(E)
 
+        # hand all written motor values to the hardware side at once
+        frames = self._manager.outputs.commit()
+        if sink := self._manager.outputSink:
+            sink(frames, time.perf_counter_ns())
         self._manager.solverDone.emit()
         self._tpsCounter += 1
         stopTime = time.perf_counter_ns()
@@ -0,0 +1,253 @@
+"""One timer for all the timeouts of the program.
+
+Components register deadlines on the monotonic clock instead of running
+their own polling timers. The deadlines are kept in a heap and a single
+QTimer is armed for the earliest one, so every deadline fires at it's
+expiry and the cost of a deadline doesn't depend on how many others are
+waiting. All methods must be called from the main thread.
+
+LivenessWatch builds the "did we hear from it recently" state on top:
+recording activity only stores a timestamp, a deadline is only pending
+for the expiry of the last activity.
+
+Typical usage example:
+
+    watch = LivenessWatch(6.0, self._setConnectionState)
+    watch.seen()
+    ...
+    watch.close()
+"""
+
+import heapq
+import itertools
+import time
+from collections.abc import Callable
+from math import ceil
+from typing import TypeVar
+
+from PyQt6.QtCore import QObject, Qt, QTimer
+from PyQt6.QtCore import pyqtSlot as QSlot
+
+from utils.Logger import LoggerClass
+
+logger = LoggerClass.getSubLogger(__name__)
+
+T = TypeVar('T', bound='DeadlineScheduler')
+
+
+class Deadline:
+    """A registered deadline, returned by DeadlineScheduler.schedule().
+
+    Attributes:
+        when (float): The time.monotonic() the callback is due.
+        active (bool): False once it fired or was cancelled.
+    """
+
+    __slots__ = ("when", "callback", "active", "_scheduler")
+
+    def __init__(self, when: float, callback: Callable[[], None],
+                 scheduler: "DeadlineScheduler") -> None:
+        self.when = when
+        self.callback = callback
+        self.active = True
+        self._scheduler = scheduler
+
+    def cancel(self) -> None:
+        """Don't run the callback, does nothing if it already ran."""
+        if self.active:
+            self.active = False
+            self._scheduler._cancelled += 1
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}:when={self.when};active={self.active}"
+
+
+class DeadlineScheduler(QObject):
+    """Runs callbacks at their deadline from a single timer."""
+
+    __instance = None
+
+    @classmethod
+    def getInstance(cls: type[T]) -> T:
+        """Get the shared instance, created on first use.
+
+        Returns:
+            DeadlineScheduler: The shared instance.
+        """
+        if DeadlineScheduler.__instance is None:
+            DeadlineScheduler.__instance = cls()
+        return DeadlineScheduler.__instance
+
+    def __init__(self, *args, **kwargs) -> None:
+        logger.debug(f"Creating {__class__.__name__}")
+        super().__init__(*args, **kwargs)
+        self._heap: list[tuple[float, int, Deadline]] = []
+        # keeps the order of equal deadlines, Deadline isn't comparable
+        self._counter = itertools.count()
+        self._cancelled = 0
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.timeout.connect(self._fire)
+
+    def schedule(self, when: float,
+                 callback: Callable[[], None]) -> Deadline:
+        """Run a callback at a point in time.
+
+        Args:
+            when (float): The time.monotonic() to run it at.
+            callback (Callable[[], None]): The function to run.
+
+        Returns:
+            Deadline: The handle to cancel it.
+        """
+        deadline = Deadline(when, callback, self)
+        heapq.heappush(self._heap, (when, next(self._counter), deadline))
+        if self._heap[0][2] is deadline:
+            self._arm()
+        return deadline
+
+    def scheduleIn(self, delay: float,
+                   callback: Callable[[], None]) -> Deadline:
+        """Run a callback after some time.
+
+        Args:
+            delay (float): The delay in seconds.
+            callback (Callable[[], None]): The function to run.
+
+        Returns:
+            Deadline: The handle to cancel it.
+        """
+        return self.schedule(time.monotonic() + delay, callback)
+
+    def runDue(self, now: float) -> int:
+        """Run all callbacks that are due.
+
+        Args:
+            now (float): The current time.monotonic().
+
+        Returns:
+            int: The number of callbacks that ran.
+        """
+        heap = self._heap
+        ran = 0
+        while heap and heap[0][0] <= now:
+            deadline = heapq.heappop(heap)[2]
+            if not deadline.active:
+                self._cancelled -= 1
+                continue
+            deadline.active = False
+            ran += 1
+            try:
+                deadline.callback()
+            except Exception as E:
+                logger.exception(E)
+        # drop cancelled deadlines once they are the majority
+        if self._cancelled > 64 and self._cancelled > len(heap) // 2:
+            self._heap = [entry for entry in heap if entry[2].active]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+        return ran
+
+    def __len__(self) -> int:
+        return len(self._heap) - self._cancelled
+
+    @QSlot()
+    def _fire(self) -> None:
+        self.runDue(time.monotonic())
+        self._arm()
+
+    def _arm(self) -> None:
+        """Start the timer for the earliest active deadline."""
+        heap = self._heap
+        while heap and not heap[0][2].active:
+            heapq.heappop(heap)
+            self._cancelled -= 1
+        if not heap:
+            self._timer.stop()
+            return
+        # rounded up, a timer firing early would only have to re-arm
+        delayMs = ceil((heap[0][0] - time.monotonic()) * 1000)
+        self._timer.start(max(delayMs, 0))
+
+    def close(self) -> None:
+        """Stop the timer and drop all deadlines."""
+        logger.debug(f"Stopping {__class__.__name__}")
+        self._timer.stop()
+        for _, _, deadline in self._heap:
+            deadline.active = False
+        self._heap = []
+        self._cancelled = 0
+        if DeadlineScheduler.__instance is self:
+            DeadlineScheduler.__instance = None
+
+    def __repr__(self) -> str:
+        return self.__class__.__name__ + ":" + ";"\
+            .join([f"{key}={str(val)}" for key, val in self.__dict__.items()])
+
+
+class LivenessWatch:
+    """Tracks if there was activity within the last timeout seconds.
+
+    Attributes:
+        alive (bool): If there was activity within timeout.
+        lastSeen (float): The time.monotonic() of the last activity.
+    """
+
+    def __init__(self, timeout: float,
+                 onChange: Callable[[bool], None],
+                 scheduler: DeadlineScheduler | None = None) -> None:
+        """Create a new watch, not alive until seen() is called.
+
+        Args:
+            timeout (float): The time in seconds activity keeps it alive.
+            onChange (Callable[[bool], None]): Called with the new state.
+            scheduler (DeadlineScheduler | None, optional): Defaults to
+                the shared instance.
+        """
+        self.timeout = timeout
+        self.alive = False
+        self.lastSeen = 0.0
+        self._onChange = onChange
+        self._scheduler = DeadlineScheduler.getInstance() \
+            if scheduler is None else scheduler
+        self._deadline: Deadline | None = None
+
+    def seen(self, ts: float | None = None) -> None:
+        """Record activity.
+
+        Args:
+            ts (float | None, optional): The time.monotonic() of the
+                activity. Defaults to now.
+        """
+        self.lastSeen = time.monotonic() if ts is None else ts
+        if not self.alive:
+            self._expire()
+
+    def _expire(self) -> None:
+        """Update the state and wait for the expiry of the last activity.
+        Activity in between only moved lastSeen."""
+        remaining = self.lastSeen + self.timeout - time.monotonic()
+        alive = remaining > 0
+        if alive:
+            self._deadline = self._scheduler.scheduleIn(
+                remaining, self._expire)
+        else:
+            self._deadline = None
+        if alive != self.alive:
+            self.alive = alive
+            self._onChange(alive)
+
+    def close(self) -> None:
+        """Cancel the pending deadline, no more changes are reported."""
+        if self._deadline:
+            self._deadline.cancel()
+            self._deadline = None
+
+    def __repr__(self) -> str:
+        return self.__class__.__name__ + ":" + ";"\
+            .join([f"{key}={str(val)}" for key, val in self.__dict__.items()])
+
+
+if __name__ == "__main__":
+    print("There is no point running this file directly")
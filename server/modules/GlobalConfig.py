@@ -1,16 +1,28 @@
 """Provides an interface to a configuration file in json format.
 
+Changes are written behind by a ConfigWriter thread: set() and delete()
+only mark the config dirty, the file is written at most every
+flushIntervalMs and once more on close(), so a dragged slider doesn't
+rewrite the file on every step.
+
 Typical usage example:
 
     config = GlobalConfig("myConfig.json")
     config.set("option", "value")
     value = config.get("option")
+    ...
+    config.close()
 """
 
+import atexit
+import copy
 import re
+import threading
+import time
+from collections.abc import Callable
 from typing import Any, TypeVar
 
-from PyQt6.QtCore import QMutex, QObject, pyqtBoundSignal
+from PyQt6.QtCore import QObject, QRecursiveMutex, pyqtBoundSignal
 from PyQt6.QtCore import pyqtSignal as QSignal
 
 from utils.ConfigHandler import FileHelper
@@ -22,6 +34,128 @@ logger = LoggerClass.getSubLogger(__name__)
 T = TypeVar('T', bound='GlobalConfigSingleton')
 
 
+class ConfigWriter:
+    """Writes the config in a background thread, coalescing all changes
+    in between two writes.
+
+    Attributes:
+        flushCount (int): The number of writes.
+        failedCount (int): The number of failed writes.
+        coalescedCount (int): The changes that didn't need a write of
+            their own.
+        flushTotalNs (int): The time spent writing.
+        flushMaxNs (int): The longest write.
+    """
+
+    def __init__(self, configHandler: FileHelper,
+                 snapshot: Callable[[], dict],
+                 flushIntervalMs: int) -> None:
+        """Start the writer thread.
+
+        Args:
+            configHandler (FileHelper): Config file handler.
+            snapshot (Callable[[], dict]): Returns a consistent copy of
+                the options to write.
+            flushIntervalMs (int): The minimum time between two writes.
+        """
+        self._configHandler = configHandler
+        self._snapshot = snapshot
+        self._interval = flushIntervalMs / 1000
+        self._condition = threading.Condition()
+        self._dirty = False
+        self._stopped = False
+        # serializes the writes of the thread and flush()
+        self._writeLock = threading.Lock()
+        self._lastFlush = 0.0
+        self.flushCount = 0
+        self.failedCount = 0
+        self.coalescedCount = 0
+        self.flushTotalNs = 0
+        self.flushMaxNs = 0
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name="ConfigWriter")
+        self._thread.start()
+
+    def markDirty(self) -> None:
+        """Schedule a write, thread safe. Writes right away once
+        closed."""
+        with self._condition:
+            if self._dirty:
+                self.coalescedCount += 1
+            self._dirty = True
+            if not self._stopped:
+                self._condition.notify()
+                return
+        self.flush()
+
+    def _run(self) -> None:
+        condition = self._condition
+        while True:
+            with condition:
+                while not (self._dirty or self._stopped):
+                    condition.wait()
+                # keep collecting changes until the interval is up
+                while not self._stopped and (remaining := self._lastFlush
+                                             + self._interval
+                                             - time.monotonic()) > 0:
+                    condition.wait(remaining)
+                if self._stopped:
+                    return
+            self.flush()
+
+    def flush(self) -> bool:
+        """Write the options now if they changed.
+
+        Returns:
+            bool: False if the write failed, otherwise True.
+        """
+        with self._writeLock:
+            with self._condition:
+                if not self._dirty:
+                    return True
+                self._dirty = False
+            startNs = time.perf_counter_ns()
+            success = self._configHandler.write(self._snapshot())
+            durationNs = time.perf_counter_ns() - startNs
+            self._lastFlush = time.monotonic()
+            self.flushCount += 1
+            self.flushTotalNs += durationNs
+            self.flushMaxNs = max(self.flushMaxNs, durationNs)
+            if not success:
+                self.failedCount += 1
+                with self._condition:
+                    # retried after the interval, or with the next change
+                    # once closed
+                    self._dirty = True
+            logger.debug(f"Config written in {durationNs / 1e6:.2f}ms")
+            return success
+
+    def close(self) -> bool:
+        """Stop the thread and write pending changes.
+
+        Returns:
+            bool: False if the last write failed, otherwise True.
+        """
+        with self._condition:
+            if self._stopped:
+                return True
+            self._stopped = True
+            self._condition.notify()
+        self._thread.join()
+        success = self.flush()
+        if self.flushCount:
+            logger.info(
+                f"Config written {self.flushCount} times "
+                f"({self.failedCount} failed, {self.coalescedCount} changes "
+                f"coalesced), {self.flushTotalNs / self.flushCount / 1e6:.2f}"
+                f"ms mean, {self.flushMaxNs / 1e6:.2f}ms max")
+        return success
+
+    def __repr__(self) -> str:
+        return self.__class__.__name__ + ":" + ";"\
+            .join([f"{key}={str(val)}" for key, val in self.__dict__.items()])
+
+
 class GlobalConfigSingleton(QObject):
     """
     Singleton class for global configuration.
@@ -45,16 +179,24 @@ class GlobalConfigSingleton(QObject):
         """
         return cls.__instance
 
+    # the minimum time between two writes of the file
+    FLUSH_INTERVAL_MS = 500
+
     @classmethod
-    def fromFile(cls: type[T], filename: str) -> T:
-        return cls(FileHelper(filename))
+    def fromFile(cls: type[T], filename: str,
+                 flushIntervalMs: int = FLUSH_INTERVAL_MS) -> T:
+        return cls(FileHelper(filename), flushIntervalMs)
 
-    def __init__(self, configHandler: FileHelper, *args, **kwargs) -> None:
+    def __init__(self, configHandler: FileHelper,
+                 flushIntervalMs: int = FLUSH_INTERVAL_MS,
+                 *args, **kwargs) -> None:
         """
         Initialize the singleton instance.
 
         Args:
             configHandler (FileHelper): Config file handler.
+            flushIntervalMs (int, optional): The minimum time between two
+                writes of the file. Defaults to FLUSH_INTERVAL_MS.
 
         Raises:
             RuntimeError: If multiple singleton instances are initialized.
@@ -65,7 +207,8 @@ class GlobalConfigSingleton(QObject):
         super().__init__()
         logger.debug(f"Creating {__class__.__name__}")
 
-        self._mutex = QMutex()
+        # the writer takes it's snapshot under it, even from within set()
+        self._mutex = QRecursiveMutex()
         self._configHandler = configHandler
         self._configHandler.createBackup()
         self._configOptions: dict[str, Any] = {}
@@ -78,6 +221,11 @@ class GlobalConfigSingleton(QObject):
             logger.exception(E)
             raise E
 
+        self._writer = ConfigWriter(
+            configHandler, self._snapshot, flushIntervalMs)
+        # don't lose changes if close() isn't reached
+        atexit.register(self.close)
+
         self.configPathHasChanged.connect(self._runChangeSignals)
         self.configPathWasDeleted.connect(self._runRemoveSignals)
         GlobalConfigSingleton.__instance = self
@@ -97,7 +245,7 @@ class GlobalConfigSingleton(QObject):
     def set(self, path: str,
             newVal: str | list | dict | int | float,
             wasChanged: bool = False) -> bool:
-        """Set a config option to a new value and trigger a flush.
+        """Set a config option to a new value and schedule a write.
 
         Args:
             path (str): The key to write.
@@ -107,7 +255,7 @@ class GlobalConfigSingleton(QObject):
                 should be emitted
 
         Returns:
-            bool: True if flush was successful otherwise False.
+            bool: True if the value was set otherwise False.
         """
         try:
             self._mutex.lock()
@@ -120,7 +268,8 @@ class GlobalConfigSingleton(QObject):
         else:
             if wasChanged:
                 self.configPathHasChanged.emit(path)
-            return self._writeOptions()
+            self._writer.markDirty()
+            return True
         finally:
             self._mutex.unlock()
 
@@ -171,7 +320,7 @@ class GlobalConfigSingleton(QObject):
                 dot notation.
 
         Returns:
-            None
+            bool: True if the option was deleted otherwise False.
         """
         try:
             self._mutex.lock()
@@ -181,7 +330,8 @@ class GlobalConfigSingleton(QObject):
             return False
         else:
             self.configPathWasDeleted.emit(path)
-            return self._writeOptions()
+            self._writer.markDirty()
+            return True
         finally:
             self._mutex.unlock()
 
@@ -193,6 +343,33 @@ class GlobalConfigSingleton(QObject):
         """
         return self._configHandler.write(self._configOptions)
 
+    def _snapshot(self) -> dict[str, Any]:
+        """Copy the options for the writer thread."""
+        self._mutex.lock()
+        try:
+            return copy.deepcopy(self._configOptions)
+        finally:
+            self._mutex.unlock()
+
+    def flush(self) -> bool:
+        """Write pending changes now instead of waiting for the writer.
+
+        Returns:
+            bool: True if write was successful otherwise False.
+        """
+        return self._writer.flush()
+
+    def close(self) -> bool:
+        """Stop the writer and write pending changes, later changes are
+        written right away.
+
+        Returns:
+            bool: True if write was successful otherwise False.
+        """
+        atexit.unregister(self.close)
+        logger.debug(f"Stopping {__class__.__name__}")
+        return self._writer.close()
+
     def _registerSignalForSignals(self, signalList: dict, pathPattern: str,
                                   signal: pyqtBoundSignal) -> None:
         """A helper function to avoid code duplication"""
@@ -1,13 +1,25 @@
-import socket
-from datetime import datetime
+import threading
+import time
+from array import array
+from collections.abc import Callable
+from functools import partial
 
+import serial
 from PyQt6.QtCore import QObject, QTimer
 from PyQt6.QtCore import pyqtSignal as QSignal
 from PyQt6.QtCore import pyqtSlot as QSlot
-from pythonosc.udp_client import SimpleUDPClient
+from pythonosc import slip
+from pythonosc.osc_message import OscMessage, ParseError
+from pythonosc.osc_message_builder import OscMessageBuilder
 
+from modules.DeadlineScheduler import LivenessWatch
 from modules.GlobalConfig import GlobalConfigSingleton
-from modules.OscMessageTypes import HeartbeatMessage
+from modules.LinkTelemetry import LinkStats, LinkTelemetry, nextPingSeq
+from modules.MotorFrame import MotorFrameEncoder
+from modules.OscMessageTypes import (DiscoveryResponseMessage,
+                                     HeartbeatMessage, PongMessage,
+                                     PreEncodedIntMessage)
+from modules.SharedUdpSocket import SharedUdpSocket
 from utils.Enums import HardwareConnectionType
 from utils.Logger import LoggerClass
 
@@ -21,7 +33,15 @@ class HardwareDevice(QObject):
     uiBatteryStateChanged = QSignal(float)
     uiRssiStateChanged = QSignal(int)
     deviceConnectionChanged = QSignal(bool)
-    motorDataSent = QSignal(list)
+    motorDataSent = QSignal(object)
+    uiSendStatsChanged = QSignal(int, int, int)
+    uiQueueDelayChanged = QSignal(float)
+    uiLinkStatsChanged = QSignal(object)
+    _pingSent = QSignal(int, object)
+    # the firmware stops all motors after 1000ms without a packet
+    MAX_KEEPALIVE_MS = 800
+    # heartbeats are sent every 4 seconds
+    HEARTBEAT_TIMEOUT = 6.0
 
     def __init__(self, key: str) -> None:
         super().__init__()
@@ -31,16 +51,39 @@ class HardwareDevice(QObject):
         # Heartbeat checker
         self.currentConnectionState: bool = False
         self._lastHeartbeat: HeartbeatMessage | None = None
-        self._heartbeatTimer = QTimer()
-        self._heartbeatTimer.timeout.connect(self.updateConnectionStatus)
-        self._heartbeatTimer.start(9000)
+        self._heartbeatWatch = LivenessWatch(
+            self.HEARTBEAT_TIMEOUT, self._setConnectionState)
+        # the last heartbeat before the connection was lost
+        self._lostAt: float | None = None
 
         self._loadSettingsFromConfig()
-        self.pinStates: dict[int, int | float] = {
-            i: 0 for i in range(self._numMotors)}
+        # one uint16 pwm value per channel, always changed in place
+        self.pinStates = array("H", bytes(2*self._numMotors))
+        self._zeroPinStates = array("H", bytes(2*self._numMotors))
+
+        # change-only sending
+        self._lastSentPinStates = array("H", bytes(2*self._numMotors))
+        self._lastSendTs = 0.0
+        self.sentCount = 0
+        self.suppressedCount = 0
+        self._queueDelaySum = 0
+        self._queueDelayCount = 0
+        self.telemetry = LinkTelemetry()
+        # numbered on the reactor thread, the telemetry is only used by
+        # the main thread
+        self._pingSeq = 0
+        self._pingSent.connect(self._handlePingSent)
+        # set by the HwManager, the manual sends are run on the output
+        # thread so only one thread ever encodes and sends
+        self.callOnOutputThread: \
+            Callable[[Callable[[], None]], None] | None = None
+        self.setKeepaliveInterval(config.get("program.hwKeepaliveMs", 250))
+        self._statsTimer = QTimer()
+        self._statsTimer.timeout.connect(self._emitSendStats)
+        self._statsTimer.start(1000)
         hardwareCommunicationAdapterClass = \
             HardwareCommunicationAdapterFactory.build_adapter(
-                self._connectionType)
+                self._connectionType, self._binaryFrames)
         if hardwareCommunicationAdapterClass:
             self.hardwareCommunicationAdapter = \
                 hardwareCommunicationAdapterClass()
@@ -50,6 +93,7 @@ class HardwareDevice(QObject):
 
         self.hardwareCommunicationAdapter.heartbeat.connect(
             self.processHeartbeat)
+        self.hardwareCommunicationAdapter.pong.connect(self.processPong)
 
     def _loadSettingsFromConfig(self) -> None:
         """Load settings from settings file into object."""
@@ -61,12 +105,33 @@ class HardwareDevice(QObject):
         self._wifiMac: str = config.get(f"{self._configKey}.wifiMac")
         self._serialPort: str = config.get(f"{self._configKey}.serialPort", "")
         self._numMotors: int = config.get(f"{self._configKey}.numMotors", 0)
+        self._binaryFrames: bool = config.get(
+            f"{self._configKey}.binaryFrames", False)
+
+    def setKeepaliveInterval(self, intervalMs: int) -> None:
+        """Set the max time between two sends of unchanged values.
+
+        Args:
+            intervalMs (int): The interval in ms, capped to
+                MAX_KEEPALIVE_MS.
+        """
+        self._keepaliveInterval = min(
+            intervalMs, self.MAX_KEEPALIVE_MS) / 1000
+
+    def _onOutputThread(self, callback: Callable[[], None]) -> None:
+        if self.callOnOutputThread:
+            self.callOnOutputThread(callback)
+        else:
+            callback()
 
     @QSlot()
     def resetAllPinStates(self) -> None:
         """Set all channels to 0 and send update to hardware."""
-        self.pinStates = {i: 0 for i in range(self._numMotors)}
-        self.sendPinValues()
+        self._onOutputThread(self._resetAllPinStates)
+
+    def _resetAllPinStates(self) -> None:
+        self.pinStates[:] = self._zeroPinStates
+        self.sendPinValues(force=True)
 
     @QSlot(int, int)
     def setAndSendPinValues(self, channelId: int, value: int) -> None:
@@ -76,16 +141,62 @@ class HardwareDevice(QObject):
             channelId (int): The channel to set the value for
             value (int): The new PWM value
         """
-        self.pinStates[channelId] = value
+        self._onOutputThread(
+            partial(self._setAndSendPinValues, channelId, value))
+
+    def _setAndSendPinValues(self, channelId: int, value: int) -> None:
+        if 0 <= channelId < len(self.pinStates):
+            self.pinStates[channelId] = min(max(int(value), 0), 0xFFFF)
         self.sendPinValues()
 
-    def sendPinValues(self) -> None:
-        """Create and send current self.pinStates to hardware."""
+    def sendPinValues(self, force: bool = False,
+                      deferred: bool = False) -> None:
+        """Send current self.pinStates to hardware if they changed since
+        the last send or the keepalive interval is up.
+
+        Args:
+            force (bool, optional): Send even if nothing changed.
+                Defaults to False.
+            deferred (bool, optional): Only queue the packet, the caller
+                flushes the SharedUdpSocket. Defaults to False.
+        """
         # logger.debug(f"Sending all pin values for {self._name}")
-        if self.currentConnectionState:
-            motorData = list(self.pinStates.values())[:self._numMotors]
-            self.hardwareCommunicationAdapter.sendPinValues(motorData)
-            self.motorDataSent.emit(motorData)
+        if not self.currentConnectionState:
+            return
+        now = time.monotonic()
+        if not force and self.pinStates == self._lastSentPinStates \
+                and now - self._lastSendTs < self._keepaliveInterval:
+            self.suppressedCount += 1
+            return
+        # the buffer is handed out as is, receivers must not keep it
+        self.hardwareCommunicationAdapter.sendPinValues(
+            self.pinStates, deferred)
+        self._lastSentPinStates[:] = self.pinStates
+        self._lastSendTs = now
+        self.sentCount += 1
+        self.motorDataSent.emit(self.pinStates)
+
+    def recordQueueDelay(self, delayNs: int) -> None:
+        """Record the time a send waited after the end of it's tick.
+        Called by the HwOutputWorker.
+
+        Args:
+            delayNs (int): The delay in ns.
+        """
+        self._queueDelaySum += delayNs
+        self._queueDelayCount += 1
+
+    @QSlot()
+    def _emitSendStats(self) -> None:
+        """Update the ui with the sent, suppressed and failed packet
+        counters."""
+        self.uiSendStatsChanged.emit(
+            self.sentCount, self.suppressedCount,
+            self.hardwareCommunicationAdapter.sendErrors)
+        if self._queueDelayCount:
+            self.uiQueueDelayChanged.emit(
+                self._queueDelaySum / self._queueDelayCount / 1e6)
+            self._queueDelaySum = self._queueDelayCount = 0
 
     def processHeartbeat(self, msg: HeartbeatMessage) -> None:
         """Process an incoming heartbeat message from the comms interface.
@@ -98,42 +209,89 @@ class HardwareDevice(QObject):
             return
         self._lastHeartbeat = msg
         # Check if the ip addr changed from known config
-        if not msg.sourceAddr == self._lastIp:
+        if self._connectionType == HardwareConnectionType.OSC \
+                and not msg.sourceAddr == self._lastIp:
             logger.debug(f"Device {self._name} changed ip from "
                          f"{self._lastIp} to {msg.sourceAddr}")
             config.set(f"{self._configKey}.lastIp", msg.sourceAddr, True)
             return
         self.uiBatteryStateChanged.emit(msg.vccBat)
         self.uiRssiStateChanged.emit(msg.rssi)
-        self.updateConnectionStatus()
+        self._heartbeatWatch.seen()
 
-    @QSlot()
-    def updateConnectionStatus(self) -> None:
-        """Recalculate the hardware connection status."""
-        # NOTE: This might need some rework some time
-        if not self._lastHeartbeat:
+    def processDiscoveryResponse(self, msg: DiscoveryResponseMessage) -> None:
+        """Count a discovery response from the known address as a sign
+        of life, the device replies to probes before it sends the first
+        heartbeat.
+
+        Args:
+            msg (DiscoveryResponseMessage): The discovery response message
+        """
+        if not msg.mac == self._wifiMac or self.currentConnectionState:
+            return
+        if self._connectionType == HardwareConnectionType.OSC \
+                and not msg.sourceAddr == self._lastIp:
+            # the heartbeat following it updates the ip
+            return
+        self._heartbeatWatch.seen()
+
+    def sendPing(self) -> None:
+        """Send a link telemetry ping if the device is connected. Called
+        from the reactor thread, the send time is handed to the main
+        thread."""
+        if not self.currentConnectionState:
             return
-        # logger.debug(datetime.now())
-        # logger.debug(self._lastHeartbeat.ts.second)
-        # logger.debug((datetime.now() - self._lastHeartbeat.ts).total_seconds())
-        if not self.currentConnectionState and \
-                (datetime.now() - self._lastHeartbeat.ts).total_seconds() <= 6:
-            self.currentConnectionState = True
-            logger.debug(f"Connection state for HardwareDevice {self._id} "
-                         f"changed to {self.currentConnectionState}")
-            self.deviceConnectionChanged.emit(self.currentConnectionState)
-        elif self.currentConnectionState and \
-                (datetime.now() - self._lastHeartbeat.ts).total_seconds() > 6:
-            self.currentConnectionState = False
-            logger.debug(f"Connection state for HardwareDevice {self._id} "
-                         f"changed to {self.currentConnectionState}")
-            self.deviceConnectionChanged.emit(self.currentConnectionState)
+        seq = self._pingSeq
+        self._pingSeq = nextPingSeq(seq)
+        sentNs = time.perf_counter_ns()
+        self.hardwareCommunicationAdapter.sendPing(seq)
+        self._pingSent.emit(seq, sentNs)
+
+    @QSlot(int, object)
+    def _handlePingSent(self, seq: int, sentNs: int) -> None:
+        self.telemetry.addPing(seq, sentNs)
+
+    @QSlot(object)
+    def processPong(self, msg: PongMessage) -> None:
+        """Process the answer to a ping from the comms interface.
+
+        Args:
+            msg (PongMessage): The PongMessage dataclass
+        """
+        if not msg.mac == self._wifiMac:
+            return
+        stats = self.telemetry.processPong(
+            msg.seq, msg.deviceUs, msg.framesReceived, msg.framesMissed,
+            msg.rxNs)
+        if stats:
+            self.uiLinkStatsChanged.emit(stats)
+
+    def _setConnectionState(self, connected: bool) -> None:
+        """Called by the heartbeat watch on the first heartbeat and
+        exactly HEARTBEAT_TIMEOUT after the last one."""
+        self.currentConnectionState = connected
+        if not connected:
+            self._lostAt = self._heartbeatWatch.lastSeen
+            self.telemetry.reset()
+            self.uiLinkStatsChanged.emit(LinkStats())
+        elif self._lostAt is not None:
+            downtime = time.monotonic() - self._lostAt
+            logger.info(f"HardwareDevice {self._id} reconnected after "
+                        f"{downtime:.2f}s, "
+                        f"{downtime - self.HEARTBEAT_TIMEOUT:.2f}s after "
+                        "the loss was detected")
+            self._lostAt = None
+        logger.debug(f"Connection state for HardwareDevice {self._id} "
+                     f"changed to {self.currentConnectionState}")
+        self.deviceConnectionChanged.emit(self.currentConnectionState)
 
     def close(self) -> None:
         """Closes everything we own and care for."""
         logger.debug(f"Stopping {__class__.__name__}({self._id})")
-        if hasattr(self, "_heartbeatTimer") and self._heartbeatTimer.isActive():
-            self._heartbeatTimer.stop()
+        if hasattr(self, "_heartbeatWatch"):
+            self._heartbeatWatch.close()
+        if hasattr(self, "_statsTimer") and self._statsTimer.isActive():
+            self._statsTimer.stop()
         if hasattr(self, "hardwareCommunicationAdapter"):
             self.hardwareCommunicationAdapter.close()
 
@@ -146,19 +304,35 @@ class IHardwareCommunicationAdapter():
     """The interface for a HardwareDevice to talk to the actual hardware."""
 
     heartbeat = QSignal(object)
+    discoveryResponse = QSignal(object)
+    pong = QSignal(object)
 
     def setup(self, settings: dict) -> None:
         """A generic setup method to be reimplemented."""
         raise NotImplementedError
 
-    def sendPinValues(self, pinValues: list) -> None:
+    def sendPinValues(self, pinValues: array,
+                      deferred: bool = False) -> None:
         """A generic sendPinValues method to be reimplemented."""
         raise NotImplementedError
 
+    def sendPing(self, seq: int) -> None:
+        """A generic sendPing method to be reimplemented."""
+        raise NotImplementedError
+
+    @property
+    def sendErrors(self) -> int:
+        """The number of failed sends, 0 if not tracked."""
+        return 0
+
     def receivedExtHeartbeat(self, msg: HeartbeatMessage) -> None:
         """A generic receivedExtHeartbeat method to be reimplemented."""
         raise NotImplementedError
 
+    def receivedExtPong(self, msg: PongMessage) -> None:
+        """A generic receivedExtPong method to be reimplemented."""
+        raise NotImplementedError
+
     def close(self) -> None:
         """A generic close method to be reimplemented."""
         raise NotImplementedError
@@ -175,7 +349,9 @@ class OscCommunicationAdapterImpl(IHardwareCommunicationAdapter, QObject):
         logger.debug(f"Creating {__class__.__name__}")
         super().__init__(*args, **kwargs)
 
-        self._oscClient: SimpleUDPClient | None = None
+        self._sender: SharedUdpSocket | None = None
+        self._target: tuple[str, int] = ("", 8888)
+        self._message: PreEncodedIntMessage | None = None
 
     def setup(self, settings: dict) -> None:
         """Setup everything required for this communication
@@ -185,23 +361,61 @@ class OscCommunicationAdapterImpl(IHardwareCommunicationAdapter, QObject):
             settings (dict): The settings dict for this HardwareDevice
         """
         try:
-            self.close()
-            self._oscClient = SimpleUDPClient(settings["lastIp"], 8888)
+            self._target = (settings["lastIp"], 8888)
+            self._sender = SharedUdpSocket.getInstance()
+            self._message = PreEncodedIntMessage(
+                "/m", settings.get("numMotors", 0))
         except Exception as E:
             logger.exception(E)
 
-    def sendPinValues(self, pinValues: list) -> None:
-        """Send motor values to device over osc."""
-        try:
-            if self._oscClient:
-                self._oscClient.send_message("/m", pinValues)
-        except OSError as E:
-            if E.errno == 10051:
-                pass
-            else:
-                logger.exception(E)
-        except Exception as E:
-            logger.exception(E)
+    def _encode(self, pinValues: array) -> bytearray:
+        """Encode the motor values into the datagram to send.
+
+        Args:
+            pinValues (array): The value per channel.
+
+        Returns:
+            bytearray: The datagram.
+        """
+        message = self._message
+        if not message or message.numValues != len(pinValues):
+            # only re-encoded if the channel count changes
+            message = self._message = PreEncodedIntMessage(
+                "/m", len(pinValues))
+        return message.update(pinValues)
+
+    def sendPinValues(self, pinValues: array,
+                      deferred: bool = False) -> None:
+        """Send motor values to device over osc.
+
+        Args:
+            pinValues (array): The value per channel.
+            deferred (bool, optional): Queue the packet for the next
+                SharedUdpSocket.flush(). Defaults to False.
+        """
+        if not self._sender:
+            return
+        if deferred:
+            self._sender.queue(self._encode(pinValues), self._target)
+        else:
+            self._sender.sendto(self._encode(pinValues), self._target)
+
+    def sendPing(self, seq: int) -> None:
+        """Send a link telemetry ping to the device.
+
+        Args:
+            seq (int): The sequence number the pong will carry.
+        """
+        if not self._sender:
+            return
+        ping = OscMessageBuilder("/patpatpat/ping")
+        ping.add_arg(seq)
+        self._sender.sendto(ping.build().dgram, self._target)
+
+    @property
+    def sendErrors(self) -> int:
+        """The number of failed sends to this device."""
+        return self._sender.errorCount(self._target) if self._sender else 0
 
     @QSlot(object)
     def receivedExtHeartbeat(self, msg: HeartbeatMessage) -> None:
@@ -212,43 +426,283 @@ class OscCommunicationAdapterImpl(IHardwareCommunicationAdapter, QObject):
         """
         self.heartbeat.emit(msg)
 
+    @QSlot(object)
+    def receivedExtPong(self, msg: PongMessage) -> None:
+        """Re-emit the pong message so the interfacce is consistant.
+
+        Args:
+            msg (PongMessage): The PongMessage dataclass instance
+        """
+        self.pong.emit(msg)
+
     def close(self) -> None:
-        """Do everything needed to cleanly close this class."""
-        if self._oscClient:
-            logger.debug(f"Stopping {__class__.__name__}")
-            self._oscClient._sock.shutdown(socket.SHUT_RDWR)
-            self._oscClient._sock.close()
-            self._oscClient = None
+        """Do everything needed to cleanly close this class. The shared
+        socket is closed by the HwManager."""
+        logger.debug(f"Stopping {__class__.__name__}")
+        self._sender = None
+
+
+class BinaryFrameCommunicationAdapterImpl(OscCommunicationAdapterImpl):
+    """Handle communication with a device over UDP, using the compact
+    binary motor frames from modules.MotorFrame instead of OSC for the
+    motor values. Discovery and heartbeat stay OSC."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        logger.debug(f"Creating {__class__.__name__}")
+        super().__init__(*args, **kwargs)
+        self._encoder: MotorFrameEncoder | None = None
+
+    def _encode(self, pinValues: array) -> bytearray:
+        encoder = self._encoder
+        if not encoder or encoder.numValues != len(pinValues):
+            encoder = self._encoder = MotorFrameEncoder(len(pinValues))
+        return encoder.encode(pinValues)
 
 
 class SlipSerialCommunicationAdapterImpl(IHardwareCommunicationAdapter, QObject):
-    """Handle communication with a device over Serial."""
+    """Handle communication with a device over Serial.
+
+    The same OSC messages (or binary motor frames) as over UDP are sent,
+    framed by SLIP. A reader thread receives the heartbeats and discovery
+    responses and reopens the port if it goes away. Sends are handed to
+    a writer thread that writes everything pending at once, only the
+    latest motor values are kept, so a busy port never builds a backlog.
+    """
+
+    # the firmware's Serial.begin()
+    BAUDRATE = 115200
+    READ_TIMEOUT = 0.1
+    REOPEN_INTERVAL = 1.0
+    # drop unframed data (e.g. debug prints) beyond this
+    MAX_PACKET_SIZE = 1024
 
     def __init__(self, *args, **kwargs) -> None:
-        ...
+        logger.debug(f"Creating {__class__.__name__}")
+        super().__init__(*args, **kwargs)
+
+        self._port = ""
+        self._binaryFrames = False
+        self._serial: serial.Serial | None = None
+        self._encoder: PreEncodedIntMessage | MotorFrameEncoder | None = None
+        self._discoverPacket = slip.encode(
+            OscMessageBuilder("/patpatpat/discover").build().dgram)
+        # handed to the writer thread, guarded by the condition
+        self._pending = threading.Condition()
+        self._pendingFrame: bytes | None = None
+        self._pendingPackets: list[bytes] = []
+        self._stopped = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._openFailed = False
+        self._sendErrors = 0
+        self.coalescedCount = 0
+        self.invalidCount = 0
+
+    def setup(self, settings: dict) -> None:
+        """Start the reader and writer threads, the port is opened by
+        the reader.
+
+        Args:
+            settings (dict): The settings dict for this HardwareDevice
+        """
+        self._port = settings.get("serialPort", "")
+        self._binaryFrames = settings.get("binaryFrames", False)
+        if not self._port:
+            logger.warning(f"No serial port set for {settings.get('name')}")
+            return
+        self._threads = [
+            threading.Thread(target=self._readLoop, daemon=True,
+                             name=f"SlipSerialReader({self._port})"),
+            threading.Thread(target=self._writeLoop, daemon=True,
+                             name=f"SlipSerialWriter({self._port})")]
+        for thread in self._threads:
+            thread.start()
+
+    def _encode(self, pinValues: array) -> bytes:
+        encoder = self._encoder
+        if not encoder or encoder.numValues != len(pinValues):
+            encoder = self._encoder = \
+                MotorFrameEncoder(len(pinValues)) if self._binaryFrames \
+                else PreEncodedIntMessage("/m", len(pinValues))
+        if self._binaryFrames:
+            return slip.encode(encoder.encode(pinValues))
+        return slip.encode(encoder.update(pinValues))
+
+    def sendPinValues(self, pinValues: array,
+                      deferred: bool = False) -> None:
+        """Hand the motor values to the writer thread, replacing values
+        that were not written yet. Never blocks on the port.
+
+        Args:
+            pinValues (array): The value per channel.
+            deferred (bool, optional): Unused, the writer thread always
+                batches. Defaults to False.
+        """
+        packet = self._encode(pinValues)
+        with self._pending:
+            if self._pendingFrame is not None:
+                self.coalescedCount += 1
+            self._pendingFrame = packet
+            self._pending.notify()
+
+    def _queuePacket(self, packet: bytes) -> None:
+        with self._pending:
+            self._pendingPackets.append(packet)
+            self._pending.notify()
+
+    def sendPing(self, seq: int) -> None:
+        """Queue a link telemetry ping for the writer thread.
+
+        Args:
+            seq (int): The sequence number the pong will carry.
+        """
+        ping = OscMessageBuilder("/patpatpat/ping")
+        ping.add_arg(seq)
+        self._queuePacket(slip.encode(ping.build().dgram))
+
+    @property
+    def sendErrors(self) -> int:
+        """The number of failed writes to the port."""
+        return self._sendErrors
+
+    def _open(self) -> bool:
+        try:
+            port = serial.Serial(self._port, self.BAUDRATE,
+                                 timeout=self.READ_TIMEOUT)
+        except (serial.SerialException, OSError) as E:
+            # only log when the port starts failing
+            if not self._openFailed:
+                logger.warning(f"Opening serial port {self._port} failed: {E}")
+            self._openFailed = True
+            return False
+        logger.debug(f"Opened serial port {self._port}")
+        self._openFailed = False
+        self._serial = port
+        return True
+
+    def _closePort(self) -> None:
+        if port := self._serial:
+            self._serial = None
+            port.close()
+
+    def _readLoop(self) -> None:
+        """Read and dispatch incoming packets until close()."""
+        buffer = bytearray()
+        while not self._stopped.is_set():
+            port = self._serial
+            if port is None:
+                if not self._open():
+                    self._stopped.wait(self.REOPEN_INTERVAL)
+                    continue
+                port = self._serial
+                buffer.clear()
+                # a connected device ignores it
+                self._queuePacket(self._discoverPacket)
+            try:
+                data = port.read(max(port.in_waiting, 1))
+            except (serial.SerialException, OSError, TypeError) as E:
+                if not self._stopped.is_set():
+                    logger.warning(f"Serial port {self._port} lost: {E}")
+                self._closePort()
+                continue
+            if data:
+                buffer += data
+                self._processBuffer(buffer)
+
+    def _processBuffer(self, buffer: bytearray) -> None:
+        """Dispatch and remove all complete packets from the buffer."""
+        while (end := buffer.find(slip.END)) != -1:
+            packet = bytes(buffer[:end])
+            del buffer[:end+1]
+            if packet:
+                self._handlePacket(packet)
+        if len(buffer) > self.MAX_PACKET_SIZE:
+            self.invalidCount += 1
+            buffer.clear()
+
+    def _handlePacket(self, packet: bytes) -> None:
+        try:
+            msg = OscMessage(slip.decode(packet))
+        except (slip.ProtocolError, ParseError):
+            # anything written to the port that is not slip framed osc
+            self.invalidCount += 1
+            return
+        params = tuple(msg.params)
+        if PongMessage.isType(msg.address, params):
+            self.pong.emit(PongMessage(*params, sourceAddr=self._port))
+        elif HeartbeatMessage.isType(msg.address, params):
+            self.heartbeat.emit(HeartbeatMessage(*params,
+                                                 sourceAddr=self._port))
+        elif DiscoveryResponseMessage.isType(msg.address, params):
+            self.discoveryResponse.emit(DiscoveryResponseMessage(
+                *params, sourceType=HardwareConnectionType.SLIPSERIAL,
+                sourceAddr=self._port))
+
+    def _writeLoop(self) -> None:
+        """Write all pending packets in one go until close()."""
+        pending = self._pending
+        while True:
+            with pending:
+                while not (self._pendingFrame or self._pendingPackets
+                           or self._stopped.is_set()):
+                    pending.wait()
+                if self._stopped.is_set():
+                    return
+                data = b"".join(self._pendingPackets)
+                if self._pendingFrame:
+                    data += self._pendingFrame
+                self._pendingPackets.clear()
+                self._pendingFrame = None
+            # while the port is gone there is no one to send to
+            if port := self._serial:
+                try:
+                    port.write(data)
+                except (serial.SerialException, OSError, TypeError):
+                    self._sendErrors += 1
 
     def receivedExtHeartbeat(self, msg: HeartbeatMessage) -> None:
         """Not required for this connection type."""
         pass
 
+    def receivedExtPong(self, msg: PongMessage) -> None:
+        """Not required for this connection type."""
+        pass
+
+    def close(self) -> None:
+        """Stop the threads and close the port."""
+        logger.debug(f"Stopping {__class__.__name__}")
+        self._stopped.set()
+        with self._pending:
+            self._pending.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self._closePort()
+
 
 class HardwareCommunicationAdapterFactory:
     """Factory class to build hardware communication adapters."""
 
     @staticmethod
-    def build_adapter(adapterType) -> type[OscCommunicationAdapterImpl] | \
+    def build_adapter(adapterType, binaryFrames: bool = False) -> \
+            type[OscCommunicationAdapterImpl] | \
+            type[BinaryFrameCommunicationAdapterImpl] | \
             type[SlipSerialCommunicationAdapterImpl] | None:
         """Static method to build the appropriate adapter based on the type.
 
         Args:
             adapterType (str): The type of adapter to build.
+            binaryFrames (bool, optional): If the device supports binary
+                motor frames. Defaults to False.
 
         Returns:
             type[OscCommunicationAdapterImpl] | 
+                type[BinaryFrameCommunicationAdapterImpl] |
                 type[SlipSerialCommunicationAdapterImpl] |
                 None: The built adapter or None if the type is not recognized.
         """
         match adapterType:
+            case HardwareConnectionType.OSC if binaryFrames:
+                return BinaryFrameCommunicationAdapterImpl
             case HardwareConnectionType.OSC:
                 return OscCommunicationAdapterImpl
             case HardwareConnectionType.SLIPSERIAL:
@@ -3,20 +3,31 @@ including discovery
 """
 
 import socket
+import time
+from collections import deque
+from collections.abc import Callable
+from functools import partial
+from math import ceil
 
-from PyQt6.QtCore import QObject, QThread, QTimer
+from PyQt6.QtCore import QObject
 from PyQt6.QtCore import pyqtSignal as QSignal
 from PyQt6.QtCore import pyqtSlot as QSlot
+from PyQt6.QtNetwork import QAbstractSocket, QNetworkInterface
 from pythonosc.dispatcher import Dispatcher
-from pythonosc.osc_server import BlockingOSCUDPServer
+from pythonosc.osc_message_builder import OscMessageBuilder
 from pythonosc.udp_client import SimpleUDPClient
 
 from modules.GlobalConfig import GlobalConfigSingleton
 from modules.HardwareDevice import HardwareDevice
-from modules.OscMessageTypes import DiscoveryResponseMessage, HeartbeatMessage
+from modules.MotorFrame import CAP_BINARY_FRAMES
+from modules.NetworkReactor import NetworkReactor, ReactorCall
+from modules.OscMessageTypes import (DiscoveryResponseMessage,
+                                     HeartbeatMessage, PongMessage)
+from modules.OutputBuffers import OutputFrame
+from modules.OutputEnvelope import OutputEnvelope
+from modules.SharedUdpSocket import SharedUdpSocket
 from utils.Enums import HardwareConnectionType
 from utils.Logger import LoggerClass
-from utils.threadToStr import threadAsStr
 
 logger = LoggerClass.getSubLogger(__name__)
 config = GlobalConfigSingleton.getInstance()
@@ -26,6 +37,7 @@ class HwManager(QObject):
     """Handles all hardware related tasks."""
 
     hwListChanged = QSignal(dict)
+    sendLatencyChanged = QSignal(float, float)
     _hwConfigChanged = QSignal(str)
     _hwConfigRemoved = QSignal(str)
 
@@ -35,11 +47,34 @@ class HwManager(QObject):
         self._configKey = "esps"
 
         self.hardwareDevices: dict[int, HardwareDevice] = {}
+        # heartbeats and discovery responses are looked up by mac
+        self._macIndex = DeviceMacIndex()
+        self._macIndex.rebuild(config.get(self._configKey))
+        self.hwListChanged.connect(self._updateMacIndex)
+        self.hwListChanged.connect(self._updateDiscoveryState)
+
+        # Send the motor values to the hardware from the network reactor
+        self.outputWorker = HwOutputWorker()
+        self.hwListChanged.connect(self.outputWorker.setDevices)
+        self.outputWorker.sendLatencyChanged.connect(self.sendLatencyChanged)
+        self.outputWorker.start()
+        self._handleProgramConfigChange("program.hwPacingPercent")
+        self._handleProgramConfigChange("program.outputRateHz")
 
         # Start osc receiver for discovery and heartbeat
         self.hwOscRx = HwOscRx()
         self.hwOscRx.onDiscoveryResponseMessage.connect(
             self._handleDiscoveryResponseMessage)
+        self.hwOscRx.onOscHeartbeatMessage.connect(
+            self._routeHeartbeatMessage)
+        self.hwOscRx.onPongMessage.connect(self._routePongMessage)
+
+        # link telemetry pings, off by default
+        self._handleProgramConfigChange("program.hwTelemetryIntervalMs")
+
+        # probes disconnected devices, independent of the broadcasts
+        self.hwOscReconnectProbe = HwOscReconnectProbe()
+        self.hwListChanged.connect(self._updateReconnectProbes)
 
         self.hwOscDiscoveryTx: HwOscDiscoveryTx | None = None
         self._handleProgramConfigChange("program.enableOscDiscovery")
@@ -52,25 +87,6 @@ class HwManager(QObject):
             r"esps\..*", self._hwConfigRemoved)
         self._hwConfigRemoved.connect(self._handleConfigRemoved)
 
-    def writeSpeed(self, hwId: int = 0, channelId: int = 0,
-                   value: float | int = 0) -> None:
-        """Write speed from motor into HardwareDevice's state buffer
-
-        Args:
-            hwId (int, optional): The destined HardwareDevice.
-                Defaults to 0.
-            channelId (int, optional): The destined HardwareDevice's
-                channel. Defaults to 0.
-            value (float | int, optional): The value to write.
-                Defaults to 0.
-        """
-        # logger.debug(f"writeSpeed({hwId}, {channelId}, {value})")
-        if hwId in self.hardwareDevices \
-                and channelId in self.hardwareDevices[hwId].pinStates:
-            self.hardwareDevices[hwId].pinStates[channelId] = value
-        else:
-            logger.debug("Specified HardwareDevice does not exist")
-
     def sendHwUpdateForId(self, hwId: int = 0) -> None:
         """Triggers a sendPinValues() on the destined Hardware.
 
@@ -79,14 +95,15 @@ class HwManager(QObject):
                 Defaults to 0.
         """
         if hwId in self.hardwareDevices:
-            self.hardwareDevices[hwId].sendPinValues()
+            self.outputWorker.callSoon(
+                self.hardwareDevices[hwId].sendPinValues)
         else:
             logger.debug("Specified HardwareDevice does not exist")
 
     def sendHwUpdate(self) -> None:
         """Triggers a sendPinValues() on all hardware."""
         for device in self.hardwareDevices.values():
-            device.sendPinValues()
+            self.outputWorker.callSoon(device.sendPinValues)
 
     def createAllHardwareDevicesFromConfig(self) -> None:
         """Creates all HardwareDevice objects from the config file."""
@@ -122,7 +139,21 @@ class HwManager(QObject):
             self.hwListChanged.emit(self.hardwareDevices)
 
     def _handleProgramConfigChange(self, path: str) -> None:
-        if path == "program.enableOscDiscovery":
+        if path == "program.hwKeepaliveMs":
+            for device in self.hardwareDevices.values():
+                device.setKeepaliveInterval(
+                    config.get("program.hwKeepaliveMs", 250))
+        elif path in ("program.hwPacingPercent", "program.mainTps"):
+            self.outputWorker.setPacing(
+                config.get("program.hwPacingPercent", 0),
+                config.get("program.mainTps", 30))
+        elif path == "program.outputRateHz":
+            self.outputWorker.setOutputRate(
+                config.get("program.outputRateHz", 0))
+        elif path == "program.hwTelemetryIntervalMs":
+            self.outputWorker.setPingInterval(
+                config.get("program.hwTelemetryIntervalMs", 0))
+        elif path == "program.enableOscDiscovery":
             """Handle start/stop of the osc discovery sender"""
             if config.get("program.enableOscDiscovery"):
                 if hasattr(self, "hwOscDiscoveryTx") \
@@ -131,6 +162,7 @@ class HwManager(QObject):
                     self.hwOscDiscoveryTx = None
                 self.hwOscDiscoveryTx = HwOscDiscoveryTx()
                 self.hwOscDiscoveryTx.start()
+                self._updateDiscoveryState()
             elif hasattr(self, "hwOscDiscoveryTx") and self.hwOscDiscoveryTx:
                 self.hwOscDiscoveryTx.stop()
                 self.hwOscDiscoveryTx = None
@@ -145,24 +177,86 @@ class HwManager(QObject):
             HardwareDevice: The new HardwareDevice instance
         """
         device = HardwareDevice(key)
-        self.hwOscRx.onOscHeartbeatMessage.connect(
-            device.hardwareCommunicationAdapter.receivedExtHeartbeat)
+        device.callOnOutputThread = self.outputWorker.callSoon
+        device.hardwareCommunicationAdapter.discoveryResponse.connect(
+            self._handleDiscoveryResponseMessage)
+        device.deviceConnectionChanged.connect(self._updateDiscoveryState)
+        device.deviceConnectionChanged.connect(self._updateReconnectProbes)
         return device
 
+    @QSlot()
+    def _updateReconnectProbes(self) -> None:
+        """Probe the last known ip of every disconnected osc device."""
+        if not hasattr(self, "hwOscReconnectProbe"):
+            return
+        self.hwOscReconnectProbe.setTargets([
+            device._lastIp for device in self.hardwareDevices.values()
+            if device._connectionType == HardwareConnectionType.OSC
+            and not device.currentConnectionState])
+
+    @QSlot()
+    def _updateDiscoveryState(self) -> None:
+        """Let the discovery back off while all osc devices are
+        connected."""
+        if not getattr(self, "hwOscDiscoveryTx", None):
+            return
+        oscDevices = [device for device in self.hardwareDevices.values()
+                      if device._connectionType == HardwareConnectionType.OSC]
+        self.hwOscDiscoveryTx.setComplete(
+            bool(oscDevices)
+            and all(device.currentConnectionState for device in oscDevices))
+
+    @QSlot(dict)
+    def _updateMacIndex(self, _: dict) -> None:
+        self._macIndex.rebuild(config.get(self._configKey))
+
+    @QSlot(object)
+    def _routeHeartbeatMessage(self, msg: HeartbeatMessage) -> None:
+        """Hand a heartbeat only to the device it belongs to.
+
+        Args:
+            msg (HeartbeatMessage): The received heartbeat.
+        """
+        if (id := self._macIndex.idForMac(msg.mac)) is not None \
+                and (device := self.hardwareDevices.get(id)):
+            device.hardwareCommunicationAdapter.receivedExtHeartbeat(msg)
+
+    @QSlot(object)
+    def _routePongMessage(self, msg: PongMessage) -> None:
+        """Hand a pong only to the device it belongs to.
+
+        Args:
+            msg (PongMessage): The received pong.
+        """
+        if (id := self._macIndex.idForMac(msg.mac)) is not None \
+                and (device := self.hardwareDevices.get(id)):
+            device.hardwareCommunicationAdapter.receivedExtPong(msg)
+
     def _handleDiscoveryResponseMessage(self, msg: DiscoveryResponseMessage) -> None:
         """Handle discovery response messages.
 
-        If the device already exists, it returns. If not, it creates a new
-        device from scratch.
+        If the device already exists, only the negotiated frame format is
+        updated. If not, it creates a new device from scratch.
 
         Args:
             msg (DiscoveryResponseMessage): The discovery response message.
         """
+        if msg.sourceType == HardwareConnectionType.SLIPSERIAL:
+            self._updateSerialDeviceMac(msg)
         # Check if device already exists and return if it does so
         if (id := self._checkDeviceExistance(msg.mac)) is not None:
             logger.debug(f"Device with mac {msg.mac} already exists in config "
                          f"as id {id} . Not creating a new one.")
             self.hardwareDevices[id].wasDiscovered = True
+            # a probed device is back, don't wait for it's heartbeat
+            self.hardwareDevices[id].processDiscoveryResponse(msg)
+            # the firmware might have been updated since it was added
+            binaryFrames = bool(msg.capabilities & CAP_BINARY_FRAMES)
+            configKey = self.hardwareDevices[id]._configKey
+            if config.get(f"{configKey}.binaryFrames", False) != binaryFrames:
+                logger.debug(f"Device {id} binary frame support changed "
+                             f"to {binaryFrames}")
+                config.set(f"{configKey}.binaryFrames", binaryFrames, True)
             return
         # If not this means it's a brand new device, create from scratch
         # Get a new device id
@@ -178,7 +272,8 @@ class HwManager(QObject):
             "wifiMac": msg.mac,
             "serialPort": msg.sourceAddr if
             msg.sourceType == HardwareConnectionType.SLIPSERIAL else "",
-            "numMotors": msg.numMotors
+            "numMotors": msg.numMotors,
+            "binaryFrames": bool(msg.capabilities & CAP_BINARY_FRAMES)
         }
         # Save new device to config
         config.set(f"esps.{newDeviceKey}", newDeviceData, wasChanged=True)
@@ -195,7 +290,8 @@ class HwManager(QObject):
             "lastIp": "169.254.1.50",
             "wifiMac": "FF:FF:FF:FF:FF:FF",
             "serialPort": "",
-            "numMotors": 1
+            "numMotors": 1,
+            "binaryFrames": False
         }
         # Save new device to config
         config.set(f"esps.{newDeviceKey}", newDeviceData, wasChanged=True)
@@ -210,9 +306,24 @@ class HwManager(QObject):
         Returns:
             int | None: If mac is found in config, it's id, otherwise None
         """
+        return self._macIndex.idForMac(mac)
+
+    def _updateSerialDeviceMac(self, msg: DiscoveryResponseMessage) -> None:
+        """Take over the mac of a device answering on a configured serial
+        port, the heartbeats are matched by it.
+
+        Args:
+            msg (DiscoveryResponseMessage): The discovery response message.
+        """
         hardwareDevices: dict = config.get("esps")
-        return next((device["id"] for device in hardwareDevices.values()
-                     if device["wifiMac"] == mac), None)
+        for key, device in hardwareDevices.items():
+            if device["connectionType"] == HardwareConnectionType.SLIPSERIAL \
+                    and device["serialPort"] == msg.sourceAddr \
+                    and device["wifiMac"] != msg.mac:
+                logger.debug(f"Device {device['id']} on {msg.sourceAddr} "
+                             f"changed mac to {msg.mac}")
+                config.set(f"esps.{key}.wifiMac", msg.mac, True)
+                return
 
     def _getNewHardwareId(self) -> int:
         """Calculates an available index for a new device
@@ -229,72 +340,620 @@ class HwManager(QObject):
         logger.debug(f"Stopping {__class__.__name__}")
         if hasattr(self, "hwOscDiscoveryTx") and self.hwOscDiscoveryTx:
             self.hwOscDiscoveryTx.stop()
+        if hasattr(self, "hwOscReconnectProbe"):
+            self.hwOscReconnectProbe.stop()
         if hasattr(self, "hwOscRx"):
             self.hwOscRx.close()
+        if hasattr(self, "outputWorker"):
+            self.outputWorker.stop()
 
         for device in self.hardwareDevices.values():
             device.close()
+        SharedUdpSocket.getInstance().close()
 
 
-class HwOscDiscoveryTx(QObject):
-    """Sends out hardware discovery broadcasts on all interfaces
+class DeviceMacIndex:
+    """Maps the mac of every configured hardware device to it's id.
+
+    The config stays the single source of truth, the index is rebuilt
+    from it whenever the devices change.
     """
 
-    def __init__(self, *args, **kwargs) -> None:
-        """Initializes the HwOscDiscoveryTx object.
+    def __init__(self) -> None:
+        self._ids: dict[str, int] = {}
+
+    def rebuild(self, devices: dict | None) -> None:
+        """Rebuild the index.
+
+        Args:
+            devices (dict | None): The "esps" config dict.
         """
+        self._ids = {device["wifiMac"]: device["id"]
+                     for device in (devices or {}).values()}
+
+    def idForMac(self, mac: str) -> int | None:
+        """Look up a device.
+
+        Args:
+            mac (str): The (wifi) mac of the hardware device.
+
+        Returns:
+            int | None: The id of the device or None if it is unknown.
+        """
+        return self._ids.get(mac)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __repr__(self) -> str:
+        return self.__class__.__name__ + ":" + ";"\
+            .join([f"{key}={str(val)}" for key, val in self.__dict__.items()])
+
+
+class HwOutputWorker(QObject):
+    """Sends the committed motor values to the hardware from the
+    NetworkReactor thread, so sends don't have to wait behind the ui.
+
+    Frames are handed over from the solver thread through a deque,
+    appending and popping from it is atomic so no lock is needed. The
+    reactor is woken up to drain it.
+
+    With pacing enabled the sends of a tick are spread over a part of
+    the tick period in 1ms slots instead of going out as one burst.
+    Devices of high priority groups are always sent first.
+
+    The frames only set the targets of the OutputEnvelope, which is
+    advanced right before every send. With an output rate set it is
+    also advanced and sent in between the ticks.
+
+    The manual sends of the ui are queued into the reactor as well, it
+    is the only thread encoding and sending the motor values. The link
+    telemetry pings are sent from here too.
+    """
+
+    sendLatencyChanged = QSignal(float, float)
+
+    def __init__(self, reactor: NetworkReactor | None = None,
+                 *args, **kwargs) -> None:
         logger.debug(f"Creating {__class__.__name__}")
         super().__init__(*args, **kwargs)
+        self._reactor = NetworkReactor.getInstance() \
+            if reactor is None else reactor
+        self._mailbox: deque[tuple[tuple[OutputFrame, ...], int]] = deque()
+        self._devices: dict[int, HardwareDevice] = {}
+        self._latencySum = 0
+        self._latencyMax = 0
+        self._latencyCount = 0
+        # the last known priority per hw id and the resulting send order
+        self._priorities: dict[int, int] = {}
+        self._sendOrder: list[tuple[int, HardwareDevice]] = []
+        # the devices of the current tick that are still to be sent
+        self._paced: deque[tuple[int, HardwareDevice]] = deque()
+        self._pacedTickEndNs = 0
+        self._pacedStartNs = 0
+        self._pacedSlot = 0
+        self._pacedSlotNs = 0.0
+        self._pacedPerSlot = 1
+        self._pacingWindowNs = 0
+        self.envelope = OutputEnvelope()
+        self._outputIntervalMs = 0
+        self._nextOutputTs = 0.0
+        self._pingIntervalMs = 0
+        # the pending timed calls on the reactor
+        self._statCall: ReactorCall | None = None
+        self._paceCall: ReactorCall | None = None
+        self._outputCall: ReactorCall | None = None
+        self._pingCall: ReactorCall | None = None
+
+    def post(self, frames: tuple[OutputFrame, ...], tickEndNs: int) -> None:
+        """Hand over the frames of a tick. Called from the solver thread.
 
-        self._interfaces = socket.getaddrinfo(
-            host=socket.gethostname(), port=None, family=socket.AF_INET)
-        self._sockets: list[SimpleUDPClient] = []
+        Args:
+            frames (tuple[OutputFrame, ...]): The committed frames.
+            tickEndNs (int): time.perf_counter_ns() at the end of the tick.
+        """
+        self._mailbox.append((frames, tickEndNs))
+        self._reactor.callSoon(self._drain)
 
-        self._timer = QTimer(self)
-        self._timer.timeout.connect(self.timerEvent)
+    def callSoon(self, callback: Callable[[], None]) -> None:
+        """Run a function on the reactor thread, thread safe.
+
+        Args:
+            callback (Callable[[], None]): The function to run.
+        """
+        self._reactor.callSoon(callback)
+
+    @QSlot(dict)
+    def setDevices(self, devices: dict[int, HardwareDevice]) -> None:
+        """Update the HardwareDevices to send to.
+
+        Args:
+            devices (dict[int, HardwareDevice]): The devices by id.
+        """
+        self._reactor.callSoon(partial(self._setDevices, dict(devices)))
+
+    def _setDevices(self, devices: dict[int, HardwareDevice]) -> None:
+        self._devices = devices
+        self._paced.clear()
+        self.envelope.retain(set(devices))
+        self._updateSendOrder()
+
+    def setPacing(self, percent: int, tps: int) -> None:
+        """Set the part of the tick period the sends are spread over.
+
+        Args:
+            percent (int): The percentage of the tick period, 0 sends
+                all devices at once. Capped at 90.
+            tps (int): The ticks per second of the solver.
+        """
+        percent = min(max(percent, 0), 90)
+        self._pacingWindowNs = int(1e9 / max(tps, 1) * percent / 100)
+
+    def setOutputRate(self, rateHz: int) -> None:
+        """Set the rate the envelope is sent at in between the ticks.
+
+        Args:
+            rateHz (int): The rate in Hz, 0 only sends with the ticks.
+        """
+        self._outputIntervalMs = round(1000 / rateHz) if rateHz > 0 else 0
+        self._reactor.callSoon(self._startOutputTimer)
+
+    def setPingInterval(self, intervalMs: int) -> None:
+        """Set the interval of the link telemetry pings.
+
+        Args:
+            intervalMs (int): The interval in ms, 0 stops pinging.
+        """
+        self._pingIntervalMs = max(intervalMs, 0)
+        self._reactor.callSoon(self._startPingTimer)
+
+    def _updateSendOrder(self) -> None:
+        """Sort the devices by priority, then by id."""
+        priorities = self._priorities
+        self._sendOrder = sorted(
+            self._devices.items(),
+            key=lambda item: (-priorities.get(item[0], 0), item[0]))
+
+    def start(self) -> None:
+        """Start the latency stats and the output rate timer."""
+        self._reactor.callSoon(self._start)
+
+    def _start(self) -> None:
+        logger.debug(f"start in {__class__.__name__}")
+        if self._statCall:
+            self._statCall.cancel()
+        self._statCall = self._reactor.callLater(1, self._calcLatency)
+        self._startOutputTimer()
+        self._startPingTimer()
+
+    def _startOutputTimer(self) -> None:
+        if self._outputCall:
+            self._outputCall.cancel()
+            self._outputCall = None
+        if self._outputIntervalMs and self._statCall:
+            self._nextOutputTs = time.monotonic()
+            self._scheduleEnvelope()
+
+    def _startPingTimer(self) -> None:
+        if self._pingCall:
+            self._pingCall.cancel()
+            self._pingCall = None
+        if self._pingIntervalMs and self._statCall:
+            self._pingCall = self._reactor.callLater(
+                self._pingIntervalMs / 1000, self._sendPings)
+
+    def _sendPings(self) -> None:
+        """Ping all devices and wait for the next round."""
+        self._pingCall = self._reactor.callLater(
+            self._pingIntervalMs / 1000, self._sendPings)
+        for _, device in self._sendOrder:
+            device.sendPing()
+
+    def _scheduleEnvelope(self) -> None:
+        """Time the next in between send at a fixed rate."""
+        interval = self._outputIntervalMs / 1000
+        now = time.monotonic()
+        self._nextOutputTs += interval
+        if self._nextOutputTs < now:
+            # fell behind, don't send a burst to catch up
+            self._nextOutputTs = now + interval
+        self._outputCall = self._reactor.callLater(
+            self._nextOutputTs - now, self._sendEnvelope)
+
+    def stop(self) -> None:
+        """Stop sending, returns once the reactor stopped using the
+        devices."""
+        self._reactor.callAndWait(self._stop)
+
+    def _stop(self) -> None:
+        logger.debug(f"stop in {__class__.__name__}")
+        for call in (self._statCall, self._paceCall, self._outputCall,
+                     self._pingCall):
+            if call:
+                call.cancel()
+        self._statCall = self._paceCall = self._outputCall = None
+        self._pingCall = None
+        self._mailbox.clear()
+        self._paced.clear()
+        self._devices = {}
+        self._sendOrder = []
+
+    def _drain(self) -> None:
+        """Write all pending frames to the devices and send them."""
+        if not self._mailbox:
+            return
+        if self._paced:
+            # the last tick is still being paced out, send the rest now
+            if self._paceCall:
+                self._paceCall.cancel()
+            self._sendNext(len(self._paced))
+        devices = self._devices
+        priorities = self._priorities
+        prioritiesChanged = False
+        tickEndNs = 0
+        # if we fell behind, all pending frames are merged into one send
+        while self._mailbox:
+            frames, tickEndNs = self._mailbox.popleft()
+            for frame in frames:
+                if frame.hwId in devices:
+                    self.envelope.setTargets(frame)
+                if priorities.get(frame.hwId, 0) != frame.priority:
+                    priorities[frame.hwId] = frame.priority
+                    prioritiesChanged = True
+        if prioritiesChanged:
+            self._updateSendOrder()
+
+        self._paced.extend(self._sendOrder)
+        self._pacedTickEndNs = tickEndNs
+        numDevices = len(self._paced)
+        if self._pacingWindowNs and numDevices > 1:
+            # the reactor waits in 1ms steps, so use 1ms slots at most
+            slots = min(numDevices, max(1, self._pacingWindowNs // 1000000))
+            self._pacedPerSlot = ceil(numDevices / slots)
+            self._pacedSlotNs = self._pacingWindowNs / slots
+            self._pacedStartNs = time.perf_counter_ns()
+            self._pacedSlot = 0
+            self._sendPacedSlot()
+        else:
+            self._sendNext(numDevices)
+
+        latency = time.perf_counter_ns() - tickEndNs
+        self._latencySum += latency
+        self._latencyMax = max(self._latencyMax, latency)
+        self._latencyCount += 1
+
+    def _sendNext(self, count: int) -> None:
+        """Queue the next devices of the tick and send them in one go.
+
+        Args:
+            count (int): The number of devices to send.
+        """
+        paced = self._paced
+        envelope = self.envelope
+        envelope.advance(time.perf_counter_ns())
+        sentDevices = []
+        for _ in range(min(count, len(paced))):
+            hwId, device = paced.popleft()
+            envelope.write(hwId, device.pinStates)
+            sentCount = device.sentCount
+            device.sendPinValues(deferred=True)
+            if device.sentCount != sentCount:
+                sentDevices.append(device)
+        SharedUdpSocket.getInstance().flush()
+        delay = time.perf_counter_ns() - self._pacedTickEndNs
+        for device in sentDevices:
+            device.recordQueueDelay(delay)
+
+    def _sendEnvelope(self) -> None:
+        """Send the moving envelope in between the ticks."""
+        self._scheduleEnvelope()
+        envelope = self.envelope
+        # a paced tick is still being sent, or nothing is moving
+        if self._paced or envelope.settled:
+            return
+        envelope.advance(time.perf_counter_ns())
+        for hwId, device in self._sendOrder:
+            envelope.write(hwId, device.pinStates)
+            device.sendPinValues(deferred=True)
+        SharedUdpSocket.getInstance().flush()
+
+    def _sendPacedSlot(self) -> None:
+        """Send the devices of the current slot and wait for the next."""
+        self._paceCall = None
+        self._sendNext(self._pacedPerSlot)
+        self._pacedSlot += 1
+        if self._paced:
+            nextSlotNs = self._pacedStartNs \
+                + self._pacedSlot * self._pacedSlotNs
+            self._paceCall = self._reactor.callLater(
+                max(0, (nextSlotNs - time.perf_counter_ns()) / 1e9),
+                self._sendPacedSlot)
+
+    def _calcLatency(self) -> None:
+        """Report the send latency relative to the end of the tick of
+        the last second in ms."""
+        self._statCall = self._reactor.callLater(1, self._calcLatency)
+        if not self._latencyCount:
+            return
+        mean = self._latencySum / self._latencyCount / 1e6
+        maximum = self._latencyMax / 1e6
+        # logger.debug(f"send latency mean={mean:.3f}ms max={maximum:.3f}ms")
+        self.sendLatencyChanged.emit(mean, maximum)
+        self._latencySum = self._latencyMax = self._latencyCount = 0
+
+
+class HwOscDiscoveryTx:
+    """Sends out hardware discovery broadcasts on all interfaces, from
+    the NetworkReactor thread.
+
+    Every interface that is up gets a directed broadcast to it's own
+    subnet, sent from the interface's address. Once all devices are
+    connected the interval doubles with every round up to MAX_INTERVAL,
+    a lost device brings it back to the start interval. The interfaces
+    are checked again every round, so a new network is picked up without
+    a restart.
+    """
+
+    # the port the devices reply to, plus one
+    SOURCE_PORT = 8871
+    DEVICE_PORT = 8888
+    MAX_INTERVAL = 60
+
+    def __init__(self, reactor: NetworkReactor | None = None) -> None:
+        """Initializes the HwOscDiscoveryTx object.
+
+        Args:
+            reactor (NetworkReactor | None, optional): Defaults to the
+                shared instance.
+        """
+        logger.debug(f"Creating {__class__.__name__}")
+        self._reactor = NetworkReactor.getInstance() \
+            if reactor is None else reactor
+
+        self._interval = 3
+        self.currentInterval = self._interval
+        self._complete = False
+        # local address -> client sending to it's directed broadcast
+        self._sockets: dict[str, SimpleUDPClient] = {}
+        self._broadcasts: dict[str, str] = {}
+        self._call: ReactorCall | None = None
+
+    @staticmethod
+    def scanInterfaces() -> dict[str, str]:
+        """Find the ipv4 broadcast address of every usable interface.
+
+        Returns:
+            dict[str, str]: The broadcast address per local address.
+        """
+        required = QNetworkInterface.InterfaceFlag.IsUp \
+            | QNetworkInterface.InterfaceFlag.IsRunning \
+            | QNetworkInterface.InterfaceFlag.CanBroadcast
+        broadcasts = {}
+        for interface in QNetworkInterface.allInterfaces():
+            if interface.flags() & required != required \
+                    or interface.flags() \
+                    & QNetworkInterface.InterfaceFlag.IsLoopBack:
+                continue
+            for entry in interface.addressEntries():
+                if entry.ip().protocol() \
+                        != QAbstractSocket.NetworkLayerProtocol.IPv4Protocol \
+                        or entry.broadcast().isNull():
+                    continue
+                broadcasts[entry.ip().toString()] = \
+                    entry.broadcast().toString()
+        return broadcasts
 
     def start(self, interval: int = 3) -> None:
-        """Starts the timer with the specified interval.
+        """Starts sending with the specified interval.
 
         Args:
             interval: The interval in seconds. Default is 3.
         """
+        self._reactor.callSoon(partial(self._start, interval))
+
+    def _start(self, interval: int) -> None:
         self._interval = interval
-        if self._timer.isActive():
-            self.stop()
+        if self._call:
+            self._stop()
+        self.currentInterval = self._interval
+        self._sendRound()
+
+    def stop(self) -> None:
+        """Stops sending and closes all sockets, returns once they are
+        closed."""
+        logger.debug(f"Stopping {__class__.__name__}")
+        self._reactor.callAndWait(self._stop)
+
+    def _stop(self) -> None:
+        if self._call:
+            self._call.cancel()
+            self._call = None
+        self._updateSockets({})
 
-        # We have no idea about the actual netmask, so 255... it is
-        for interface in self._interfaces:
+    def setComplete(self, complete: bool) -> None:
+        """Set if all configured devices are connected.
+
+        Args:
+            complete (bool): True starts the backoff, False sends right
+                away and goes back to the start interval.
+        """
+        self._reactor.callSoon(partial(self._setComplete, complete))
+
+    def _setComplete(self, complete: bool) -> None:
+        if complete == self._complete:
+            return
+        self._complete = complete
+        logger.debug(f"All devices connected: {complete}, "
+                     "adjusting discovery interval")
+        self.currentInterval = self._interval
+        if not complete and self._call:
+            self._sendRound()
+
+    def _updateSockets(self, broadcasts: dict[str, str]) -> None:
+        """Open a socket for every new interface and close the ones of
+        interfaces that are gone.
+
+        Args:
+            broadcasts (dict[str, str]): The broadcast address per
+                local address.
+        """
+        for address in list(self._sockets):
+            if self._broadcasts.get(address) != broadcasts.get(address):
+                self._sockets.pop(address)._sock.close()
+        for address, broadcast in broadcasts.items():
+            if address in self._sockets:
+                continue
             client = SimpleUDPClient(
-                "255.255.255.255", 8888,
+                broadcast, self.DEVICE_PORT,
                 allow_broadcast=True, family=socket.AF_INET)
-            client._sock.bind((interface[-1][0], 8871))
-            self._sockets.append(client)
-        self.timerEvent()
-        self._timer.start(self._interval*1000)
+            try:
+                # shared with the HwOscReconnectProbe
+                client._sock.setsockopt(
+                    socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                client._sock.bind((address, self.SOURCE_PORT))
+            except OSError as E:
+                logger.warning(f"Discovery on {address} failed: {E}")
+                client._sock.close()
+                continue
+            logger.debug(f"Sending discovery from {address} to {broadcast}")
+            self._sockets[address] = client
+        self._broadcasts = broadcasts
+
+    def _sendRound(self) -> None:
+        """Send out discovery messages and schedule the next round."""
+        if self._call:
+            self._call.cancel()
+        broadcasts = self.scanInterfaces()
+        if broadcasts != self._broadcasts:
+            # a new network might have new devices
+            self._updateSockets(broadcasts)
+            self.currentInterval = self._interval
+        # logger.debug("Sending out discovery broadcasts")
+        for address, client in self._sockets.items():
+            try:
+                client.send_message("/patpatpat/discover", [])
+            except OSError as E:
+                logger.debug(f"Discovery on {address} failed: {E}")
+        self._call = self._reactor.callLater(
+            self.currentInterval, self._sendRound)
+        if self._complete:
+            self.currentInterval = min(
+                self.currentInterval * 2, self.MAX_INTERVAL)
+
+
+class HwOscReconnectProbe:
+    """Sends unicast discovery requests to the last known ip of every
+    disconnected device, from the NetworkReactor thread.
+
+    A rebooted or roamed device answers the first one it gets, without
+    waiting for the next broadcast round. Connected firmware ignores
+    discovery requests, so probing a device that is just slow to send
+    heartbeats costs nothing.
+    """
+
+    INTERVAL_MS = 500
+
+    def __init__(self, reactor: NetworkReactor | None = None) -> None:
+        """Initializes the HwOscReconnectProbe object.
+
+        Args:
+            reactor (NetworkReactor | None, optional): Defaults to the
+                shared instance.
+        """
+        logger.debug(f"Creating {__class__.__name__}")
+        self._reactor = NetworkReactor.getInstance() \
+            if reactor is None else reactor
+
+        self._targets: list[tuple[str, int]] = []
+        self._dgram = OscMessageBuilder("/patpatpat/discover").build().dgram
+        self._sock: socket.socket | None = None
+        self._call: ReactorCall | None = None
+        self.sentCount = 0
+
+    def setTargets(self, ips: list[str]) -> None:
+        """Set the devices to probe, new ones are probed right away.
+
+        Args:
+            ips (list[str]): The last known ip of every disconnected
+                device, empty stops probing.
+        """
+        targets = [(ip, HwOscDiscoveryTx.DEVICE_PORT) for ip in ips if ip]
+        self._reactor.callSoon(partial(self._setTargets, targets))
+
+    def _setTargets(self, targets: list[tuple[str, int]]) -> None:
+        newTargets = set(targets).difference(self._targets)
+        self._targets = targets
+        if not targets:
+            self._cancel()
+            return
+        if newTargets:
+            self._send(newTargets)
+        if self._sock and not self._call:
+            self._call = self._reactor.callLater(
+                self.INTERVAL_MS / 1000, self._probe)
+
+    def _open(self) -> socket.socket | None:
+        """Open the socket, the devices reply to the source port + 1."""
+        if self._sock:
+            return self._sock
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        try:
+            # shared with the HwOscDiscoveryTx
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            sock.bind(("", HwOscDiscoveryTx.SOURCE_PORT))
+        except OSError as E:
+            logger.warning(f"Reconnect probes disabled: {E}")
+            sock.close()
+            self._cancel()
+            return None
+        self._sock = sock
+        return sock
+
+    def _send(self, targets) -> None:
+        if not (sock := self._open()):
+            return
+        for target in targets:
+            try:
+                sock.sendto(self._dgram, target)
+                self.sentCount += 1
+            except OSError as E:
+                logger.debug(f"Reconnect probe to {target[0]} failed: {E}")
+
+    def _probe(self) -> None:
+        """Probe all targets and wait for the next round."""
+        self._call = self._reactor.callLater(
+            self.INTERVAL_MS / 1000, self._probe)
+        self._send(self._targets)
+
+    def _cancel(self) -> None:
+        if self._call:
+            self._call.cancel()
+            self._call = None
 
     def stop(self) -> None:
-        """Stops the timer and closes all sockets."""
+        """Stop probing and close the socket, returns once it's closed."""
         logger.debug(f"Stopping {__class__.__name__}")
-        for client in self._sockets:
-            client._sock.shutdown(socket.SHUT_RDWR)
-            client._sock.close()
-        self._sockets = []
-        self._timer.stop()
+        self._reactor.callAndWait(self._stop)
 
-    @QSlot()
-    def timerEvent(self) -> None:
-        """Send out discovery messages when timer fires."""
-        # logger.debug("Sending out discovery broadcasts")
-        for client in self._sockets:
-            client.send_message("/patpatpat/discover", [])
+    def _stop(self) -> None:
+        self._cancel()
+        self._targets = []
+        if self._sock:
+            self._sock.close()
+            self._sock = None
 
 
-class HwOscRxWorker(QObject):
-    """The thread receiving osc messages from hardware devices."""
+class HwOscRx(QObject):
+    """The global Hardware Osc Receiver, the socket is served by the
+    NetworkReactor."""
 
     onDiscoveryResponseMessage = QSignal(object)
     onOscHeartbeatMessage = QSignal(object)
+    onPongMessage = QSignal(object)
+    PORT = 8872
+    # the os may cap it, linux to net.core.rmem_max
+    RX_BUFFER_SIZE = 1 << 20
 
     def __init__(self, *args, **kwargs) -> None:
         logger.debug(f"Creating {__class__.__name__}")
@@ -307,8 +966,26 @@ class HwOscRxWorker(QObject):
         self.dispatcher.map("/patpatpat/heartbeat",
                             self._handleHeartbeatMessage,
                             needs_reply_address=True)
+        self.dispatcher.map("/patpatpat/pong",
+                            self._handlePongMessage,
+                            needs_reply_address=True)
         self.dispatcher.set_default_handler(self._defaultHandler)
 
+        logger.info(f"Starting osc server on port {self.PORT}")
+        self._reactor = NetworkReactor.getInstance()
+        self._sock: socket.socket | None = None
+        try:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            # all devices reply to a discovery at once, don't drop them
+            self._sock.setsockopt(
+                socket.SOL_SOCKET, socket.SO_RCVBUF, self.RX_BUFFER_SIZE)
+            self._sock.bind(("", self.PORT))
+            self._reactor.addSocket(
+                self._sock, self.dispatcher.call_handlers_for_packet,
+                "hardware rx")
+        except OSError as E:
+            logger.exception(E)
+
     def _defaultHandler(self, topic: str, *args) -> None:
         logger.debug(f"Unknown osc message: {topic}, {str(args)}")
 
@@ -329,66 +1006,17 @@ class HwOscRxWorker(QObject):
             # logger.debug(msg)
             self.onOscHeartbeatMessage.emit(msg)
 
-    @QSlot()
-    def startOscServer(self) -> None:
-        logger.debug(
-            f"startOsc pid     ={threadAsStr(QThread.currentThread())}")
-        logger.debug(
-            f"startOsc pid_self={threadAsStr(self.thread())}")
-        logger.info(f"Starting osc server on port 8872")
-        try:
-            self._oscRx = BlockingOSCUDPServer(("", 8872), self.dispatcher)
-            self._oscRx.serve_forever()
-        except Exception as E:
-            logger.exception(E)
-        logger.debug("startOscServer done, cleaning up...")
-        self._oscRx.socket.close()
-        del self._oscRx  # dereferene so the gc can pick it up
-
-    def closeOscServer(self) -> None:
-        """Stops and closes the osc server."""
-
-        logger.debug(f"closeOscServer in {__class__.__name__}")
-        selfThread = self.thread()
-        logger.debug(f"pid_QThread.currentThread={threadAsStr(QThread.currentThread())} "
-                     f"pid_selfThread={threadAsStr(selfThread)} ")
-        if hasattr(self, "_oscRx"):
-            self._oscRx.shutdown()
-        if selfThread:
-            selfThread.quit()
-            selfThread.wait()
-
-
-class HwOscRx(QObject):
-    """The Thread Manager for the global Hardware Osc Receiver."""
-
-    onDiscoveryResponseMessage = QSignal(object)
-    onOscHeartbeatMessage = QSignal(object)
-
-    def __init__(self, *args, **kwargs) -> None:
-        logger.debug(f"Creating {__class__.__name__}")
-        super().__init__(*args, **kwargs)
-
-        self.worker = HwOscRxWorker()
-        self.workerThread = QThread()
-        self.workerThread.started.connect(self.worker.startOscServer)
-        self.worker.moveToThread(self.workerThread)
-
-        # relay signals
-        self.worker.onDiscoveryResponseMessage.connect(
-            self.onDiscoveryResponseMessage)
-        self.worker.onOscHeartbeatMessage.connect(
-            self.onOscHeartbeatMessage)
-
-        logger.debug("Starting heartbeat osc server and client")
-        self.workerThread.start(QThread.Priority.HighestPriority)
+    def _handlePongMessage(self, client: tuple, topic: str, *args) -> None:
+        if PongMessage.isType(topic, args):
+            self.onPongMessage.emit(PongMessage(*args, sourceAddr=client[0]))
 
     def close(self) -> None:
         """Closes everything heartbeat osc related."""
         logger.debug("Closing heartbeat osc")
-        self.worker.closeOscServer()
-        self.workerThread.quit()
-        self.workerThread.wait()
+        if self._sock:
+            self._reactor.removeSocket(self._sock)
+            self._sock.close()
+            self._sock = None
 
 
 if __name__ == "__main__":
@@ -0,0 +1,211 @@
+"""Link quality of a hardware device from ping/pong exchanges.
+
+The server sends /patpatpat/ping with a sequence number and keeps the
+send time. The device answers with /patpatpat/pong carrying the same
+sequence number, it's micros() clock and it's motor frame counters.
+
+The clock offset between server and device is taken from the sample
+with the lowest round trip time of the last WINDOW samples, assuming
+that one took the same time in both directions. With it the time every
+ping took to reach the device is estimated, so delays on the way to the
+motors show up apart from delays on the way back.
+
+Typical usage example:
+
+    telemetry = LinkTelemetry()
+    seq = telemetry.nextPing(time.perf_counter_ns())
+    ...
+    stats = telemetry.processPong(msg.seq, msg.deviceUs,
+                                  msg.framesReceived, msg.framesMissed,
+                                  msg.rxNs)
+"""
+
+from collections import deque
+from dataclasses import dataclass
+from statistics import fmean
+
+# the device clock is sent as wrapping 32 bit micros()
+_US_MASK = 0xFFFFFFFF
+_SEQ_MASK = 0x7FFFFFFF
+
+
+def nextPingSeq(seq: int) -> int:
+    """Get the sequence number following seq.
+
+    Args:
+        seq (int): The last sequence number.
+
+    Returns:
+        int: The next one, wrapping at 31 bit.
+    """
+    return (seq + 1) & _SEQ_MASK
+
+
+@dataclass(frozen=True, slots=True)
+class LinkStats:
+    """The link quality over the last samples.
+
+    Attributes:
+        rttMs (float): The mean round trip time.
+        jitterMs (float): The smoothed round trip time variation,
+            calculated like the interarrival jitter of RFC 3550.
+        oneWayMs (float): The mean estimated time from server to device.
+        loss (float | None): The fraction of motor frames that never
+            arrived, from the sequence gaps the device counted. None if
+            no numbered frames arrived, eg. without binary frames.
+        samples (int): The number of samples the stats are based on.
+    """
+
+    rttMs: float = 0.0
+    jitterMs: float = 0.0
+    oneWayMs: float = 0.0
+    loss: float | None = None
+    samples: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class _Sample:
+    sentNs: int
+    rttNs: int
+    deviceNs: int
+    framesReceived: int
+    framesMissed: int
+
+
+class LinkTelemetry:
+    """The ping bookkeeping and estimators of a single device."""
+
+    WINDOW = 16
+    # pings without pong are forgotten after this many newer ones
+    MAX_PENDING = 8
+
+    def __init__(self) -> None:
+        self._nextSeq = 0
+        self._pending: dict[int, int] = {}
+        self._samples: deque[_Sample] = deque(maxlen=self.WINDOW)
+        self._jitterNs = 0.0
+        self._lastRttNs: int | None = None
+        # the device clock unwrapped to 64 bit
+        self._lastDeviceUs: int | None = None
+        self._deviceUs = 0
+        self.lostPings = 0
+
+    def nextPing(self, sentNs: int) -> int:
+        """Get the sequence number of a new ping and remember it's send
+        time.
+
+        Args:
+            sentNs (int): time.perf_counter_ns() of the send.
+
+        Returns:
+            int: The sequence number to send.
+        """
+        seq = self._nextSeq
+        self._nextSeq = nextPingSeq(seq)
+        self.addPing(seq, sentNs)
+        return seq
+
+    def addPing(self, seq: int, sentNs: int) -> None:
+        """Remember the send time of a ping numbered by the sender.
+
+        Args:
+            seq (int): The sequence number that was sent.
+            sentNs (int): time.perf_counter_ns() of the send.
+        """
+        self._pending[seq] = sentNs
+        if len(self._pending) > self.MAX_PENDING:
+            del self._pending[next(iter(self._pending))]
+            self.lostPings += 1
+
+    def processPong(self, seq: int, deviceUs: int, framesReceived: int,
+                    framesMissed: int, rxNs: int) -> LinkStats | None:
+        """Add the sample of a received pong.
+
+        Args:
+            seq (int): The sequence number of the ping.
+            deviceUs (int): The device's micros() when it answered.
+            framesReceived (int): The motor frames the device applied.
+            framesMissed (int): The motor frames the device never got.
+            rxNs (int): time.perf_counter_ns() of the receive.
+
+        Returns:
+            LinkStats | None: The updated stats or None if the pong
+                doesn't belong to a pending ping.
+        """
+        if (sentNs := self._pending.pop(seq, None)) is None:
+            return None
+        rttNs = rxNs - sentNs
+        if self._lastRttNs is not None:
+            self._jitterNs += (abs(rttNs - self._lastRttNs)
+                               - self._jitterNs) / 16
+        self._lastRttNs = rttNs
+
+        if self._samples and framesReceived < self._samples[-1].framesReceived:
+            # the device restarted, the counters and clock start over
+            self._samples.clear()
+            self._lastDeviceUs = None
+        self._samples.append(_Sample(
+            sentNs, rttNs, self._unwrapDeviceUs(deviceUs) * 1000,
+            framesReceived, framesMissed))
+        return self.stats()
+
+    def _unwrapDeviceUs(self, deviceUs: int) -> int:
+        deviceUs &= _US_MASK
+        if self._lastDeviceUs is None:
+            self._deviceUs = deviceUs
+        else:
+            delta = (deviceUs - self._lastDeviceUs) & _US_MASK
+            if delta >= 1 << 31:
+                # an older pong, don't move the clock backwards
+                return self._deviceUs - ((self._lastDeviceUs - deviceUs)
+                                         & _US_MASK)
+            self._deviceUs += delta
+        self._lastDeviceUs = deviceUs
+        return self._deviceUs
+
+    def clockOffsetNs(self) -> int:
+        """Estimate device clock minus server clock.
+
+        Returns:
+            int: The offset in ns, 0 without samples.
+        """
+        if not self._samples:
+            return 0
+        best = min(self._samples, key=lambda s: s.rttNs)
+        return best.deviceNs - (best.sentNs + best.rttNs // 2)
+
+    def stats(self) -> LinkStats:
+        """Summarize the current window.
+
+        Returns:
+            LinkStats: The stats, empty without samples.
+        """
+        samples = self._samples
+        if not samples:
+            return LinkStats()
+        offsetNs = self.clockOffsetNs()
+        first, last = samples[0], samples[-1]
+        received = last.framesReceived - first.framesReceived
+        missed = last.framesMissed - first.framesMissed
+        return LinkStats(
+            fmean(s.rttNs for s in samples) / 1e6,
+            self._jitterNs / 1e6,
+            fmean(s.deviceNs - offsetNs - s.sentNs for s in samples) / 1e6,
+            missed / (received + missed) if received + missed > 0 else None,
+            len(samples))
+
+    def reset(self) -> None:
+        """Forget all samples, eg. after the device disconnected."""
+        self._pending.clear()
+        self._samples.clear()
+        self._jitterNs = 0.0
+        self._lastRttNs = None
+        self._lastDeviceUs = None
+
+    def __repr__(self) -> str:
+        return self.__class__.__name__ + ":" + ";"\
+            .join([f"{key}={str(val)}" for key, val in self.__dict__.items()])
+
+
+if __name__ == "__main__":
+    print("There is no point running this file directly")
@@ -0,0 +1,133 @@
+"""This module holds the contact receiver data and creates the per-tick
+measurement snapshots so groups sharing a receiver don't have to do the
+work twice.
+"""
+
+from dataclasses import dataclass
+
+from utils.Logger import LoggerClass
+
+logger = LoggerClass.getSubLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class MeasurementSnapshot:
+    """An immutable view on all contact receivers at the start of a tick.
+
+    The solvers decide on their own which ages are recent enough.
+
+    Attributes:
+        ts (float): The tick timestamp the snapshot was taken at.
+        values (tuple[float, ...]): The last received value per slot.
+        ages (tuple[float, ...]): Seconds since the last value per slot.
+    """
+
+    ts: float = 0.0
+    values: tuple[float, ...] = ()
+    ages: tuple[float, ...] = ()
+
+
+class MeasurementStage:
+    """Holds the last sample of every unique contact receiver. Samples
+    are stored in a flat list and referenced by a slot index that stays
+    stable as long as the receiver is registered.
+
+    Every sample is a (value, timestamp) tuple that is replaced as a
+    whole, so a snapshot never mixes data from different packets.
+    """
+
+    def __init__(self) -> None:
+        """Create a new, empty measurement stage."""
+        self._index: dict[str, int] = {}
+        self._samples: list[tuple[float, float]] = []
+        self._freeSlots: list[int] = []
+
+    def register(self, receiverId: str) -> int:
+        """Register a contact receiver and return it's slot index.
+
+        Args:
+            receiverId (str): The contact receiver id.
+
+        Returns:
+            int: The slot index of the receiver.
+        """
+        if receiverId in self._index:
+            return self._index[receiverId]
+        if self._freeSlots:
+            slot = self._freeSlots.pop()
+            self._samples[slot] = (0.0, 0.0)
+        else:
+            slot = len(self._samples)
+            self._samples.append((0.0, 0.0))
+        self._index[receiverId] = slot
+        return slot
+
+    def unregister(self, receiverId: str) -> None:
+        """Remove a contact receiver and free up it's slot.
+
+        Args:
+            receiverId (str): The contact receiver id.
+        """
+        if (slot := self._index.pop(receiverId, None)) is None:
+            return
+        self._samples[slot] = (0.0, 0.0)
+        self._freeSlots.append(slot)
+
+    def indexOf(self, receiverId: str) -> int:
+        """Return the slot index of a registered receiver.
+
+        Args:
+            receiverId (str): The contact receiver id.
+
+        Raises:
+            KeyError: If the receiver is not registered.
+
+        Returns:
+            int: The slot index.
+        """
+        return self._index[receiverId]
+
+    def write(self, receiverId: str, ts: float, value: float) -> bool:
+        """Store a new sample for a receiver. Called from the
+        receive path.
+
+        Args:
+            receiverId (str): The contact receiver id.
+            ts (float): The time the value was received.
+            value (float): The new value.
+
+        Returns:
+            bool: True if the receiver is registered, otherwise False.
+        """
+        if (slot := self._index.get(receiverId)) is None:
+            return False
+        self._samples[slot] = (value, ts)
+        return True
+
+    def snapshot(self, now: float) -> MeasurementSnapshot:
+        """Take a consistent snapshot of all slots. Run once per tick
+        before solving.
+
+        Args:
+            now (float): The tick timestamp in seconds.
+
+        Returns:
+            MeasurementSnapshot: The new snapshot.
+        """
+        # copying the list is a single operation for the interpreter
+        samples = tuple(self._samples)
+        return MeasurementSnapshot(
+            now,
+            tuple(value for value, _ in samples),
+            tuple(now - ts for _, ts in samples))
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __repr__(self) -> str:
+        return self.__class__.__name__ + ":" + ";"\
+            .join([f"{key}={str(val)}" for key, val in self.__dict__.items()])
+
+
+if __name__ == "__main__":
+    print("There is no point running this file directly")
@@ -1,8 +1,8 @@
 from math import ceil
 
 from PyQt6.QtCore import QObject
-from PyQt6.QtCore import pyqtSignal as QSignal
 
+from modules.OutputBuffers import DeviceOutputBuffer
 from modules.Points import Sphere3D
 from utils.Logger import LoggerClass
 
@@ -10,9 +10,11 @@ logger = LoggerClass.getSubLogger(__name__)
 
 
 class Motor(QObject):
-    """Represents a motor attached to an ESP Pin (Channel)"""
-    speedChanged = QSignal(int, int, float)
-    motorPwmChanged = QSignal(int, int, int)
+    """Represents a motor attached to an ESP Pin (Channel)
+
+    Set on every solver tick, so there are no signals for the ui, it
+    polls currentSpeed and currentPWM from it's own refresh timer.
+    """
 
     def __init__(self, settings: dict, parent: QObject | None = None) -> None:
         super().__init__(parent)
@@ -25,6 +27,22 @@ class Motor(QObject):
         self.point.xyz = settings["xyz"]
         self.currentSpeed: float = 0.0
         self.currentPWM: int = 0
+        self._output: DeviceOutputBuffer | None = None
+
+    @property
+    def espAddr(self) -> tuple[int, int]:
+        """The (hwId, channelId) the motor is attached to."""
+        return self._espAddr[0], self._espAddr[1]
+
+    def bindOutput(self, output: DeviceOutputBuffer | None) -> None:
+        """Bind the motor to it's HardwareDevice's output buffer.
+        The pwm value is written into the buffer directly from then on.
+
+        Args:
+            output (DeviceOutputBuffer | None): The buffer or None
+                to unbind.
+        """
+        self._output = output
 
     def setSpeed(self, newSpeed: float) -> None:
         """Takes a normalized speed from 0.0-1.0 and converts it to the
@@ -41,16 +59,20 @@ class Motor(QObject):
         motorPwm = min(ceil(self._maxPwm * newSpeed), self._maxPwm)
         pwm = self._minPwm if (motorPwm < self._minPwm
                                and motorPwm > 0) else motorPwm
+        self.currentSpeed = newSpeed
         self.setPwm(pwm)
-        self.speedChanged.emit(*self._espAddr, newSpeed)
 
-    def fadeOut(self):
+    def release(self) -> None:
+        """Set the motor to 0, the output envelope fades it out."""
+        self.currentSpeed = 0.0
         if self.currentPWM:
-            self.setPwm(max(self.currentPWM-6, 0))
+            self.setPwm(0)
 
     def setPwm(self, pwm: int) -> None:
         self.currentPWM = pwm
-        self.motorPwmChanged.emit(*self._espAddr, pwm)
+        if output := self._output:
+            output.values[self._espAddr[1]] = pwm
+            output.dirty = True
 
     def __repr__(self) -> str:
         return self.__class__.__name__ + ":" + ";"\
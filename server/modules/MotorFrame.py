@@ -0,0 +1,120 @@
+"""The compact binary motor frame protocol.
+
+A frame is a 5 byte header followed by one value per channel:
+
+    | magic 'P' | flags | seq (uint16) | count (uint8) | values... |
+
+All fields are big endian. If bit 0 of the flags is set the values are
+uint16, otherwise uint8. The sequence number increments with every
+frame and receivers drop frames older than the last one they applied.
+Devices advertise support with CAP_BINARY_FRAMES in the 4th argument of
+their discovery reply.
+
+Typical usage example:
+
+    encoder = MotorFrameEncoder(4)
+    sock.sendto(encoder.encode(pinStates), addr)
+"""
+
+import struct
+from collections.abc import Sequence
+
+FRAME_MAGIC = 0x50
+FLAG_WIDE = 0x01
+CAP_BINARY_FRAMES = 0x01
+HEADER = struct.Struct(">BBHB")
+
+
+class MotorFrameEncoder:
+    """Encodes motor values into preallocated binary frames."""
+
+    def __init__(self, numValues: int) -> None:
+        """Create the encoder for a fixed number of channels.
+
+        Args:
+            numValues (int): The number of channels, max 255.
+        """
+        self.numValues = numValues
+        self.seq = 0
+        self._narrow = struct.Struct(f">BBHB{numValues}B")
+        self._wide = struct.Struct(f">BBHB{numValues}H")
+        self._narrowFrame = bytearray(self._narrow.size)
+        self._wideFrame = bytearray(self._wide.size)
+
+    def encode(self, values: Sequence[int]) -> bytearray:
+        """Encode the next frame. uint8 values are used whenever all
+        values fit.
+
+        Args:
+            values (Sequence[int]): Exactly numValues ints.
+
+        Returns:
+            bytearray: The frame (not a copy, valid until the next call).
+        """
+        self.seq = (self.seq + 1) & 0xFFFF
+        if not values or max(values) <= 0xFF:
+            self._narrow.pack_into(self._narrowFrame, 0, FRAME_MAGIC, 0,
+                                   self.seq, self.numValues, *values)
+            return self._narrowFrame
+        self._wide.pack_into(self._wideFrame, 0, FRAME_MAGIC, FLAG_WIDE,
+                             self.seq, self.numValues, *values)
+        return self._wideFrame
+
+
+def decodeFrame(data: bytes) -> tuple[int, tuple[int, ...]] | None:
+    """Parse a binary motor frame.
+
+    Args:
+        data (bytes): The received datagram.
+
+    Returns:
+        tuple[int, tuple[int, ...]] | None: The sequence number and
+            values or None if the datagram is not a valid frame.
+    """
+    if len(data) < HEADER.size:
+        return None
+    magic, flags, seq, count = HEADER.unpack_from(data)
+    width = 2 if flags & FLAG_WIDE else 1
+    if magic != FRAME_MAGIC or len(data) != HEADER.size + count*width:
+        return None
+    values = struct.unpack_from(
+        f">{count}{'H' if width == 2 else 'B'}", data, HEADER.size)
+    return seq, values
+
+
+class SequenceFilter:
+    """Drops frames that arrive out of order, same as the firmware."""
+
+    def __init__(self) -> None:
+        self.lastSeq: int | None = None
+        self.dropped = 0
+        # the counters the firmware reports with the pong
+        self.received = 0
+        self.missed = 0
+
+    def accept(self, seq: int) -> bool:
+        """Check if a frame is newer than the last accepted one.
+
+        Args:
+            seq (int): The frame's sequence number.
+
+        Returns:
+            bool: True if the frame should be applied.
+        """
+        if self.lastSeq is not None \
+                and not 0 < (seq - self.lastSeq) & 0xFFFF < 0x8000:
+            self.dropped += 1
+            return False
+        if self.lastSeq is not None:
+            self.missed += ((seq - self.lastSeq) & 0xFFFF) - 1
+        self.received += 1
+        self.lastSeq = seq
+        return True
+
+    def reset(self) -> None:
+        """Accept any sequence number next, eg. after a timeout."""
+        self.lastSeq = None
+
+
+if __name__ == "__main__":
+    print("There is no point running this file directly")
@@ -0,0 +1,351 @@
+"""One thread for all network sockets of the program.
+
+Sockets are registered with a handler that is called with every
+datagram. A single thread waits on all of them with selectors (epoll on
+linux), reads everything that is ready and hands it to the handlers, so
+a burst of packets on several sockets costs one wakeup instead of one
+per socket and thread.
+
+The sending side runs on the same thread: functions queued with
+callSoon() and timed with callLater() run in between the receives, so
+the motor sends, the discovery broadcasts and the reconnect probes need
+neither their own thread nor a Qt timer.
+
+Everything is thread safe: calls are queued in a deque and the reactor
+is woken up through a socket pair. The datagrams, bytes and handler
+time are counted per socket and the calls with the time spent in them,
+as the single place to measure the network cost.
+
+Typical usage example:
+
+    reactor = NetworkReactor.getInstance()
+    reactor.addSocket(sock, self._handlePacket, "hw rx")
+    call = reactor.callLater(0.5, self._sendProbes)
+    ...
+    call.cancel()
+    reactor.removeSocket(sock)
+    sock.close()
+"""
+
+import heapq
+import itertools
+import selectors
+import socket
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import TypeVar
+
+from utils.Logger import LoggerClass
+
+logger = LoggerClass.getSubLogger(__name__)
+
+T = TypeVar('T', bound='NetworkReactor')
+
+type PacketHandler = Callable[[bytes, tuple[str, int]], None]
+
+
+@dataclass(slots=True)
+class SocketStats:
+    """The receive counters of a registered socket.
+
+    Attributes:
+        name (str): The name given on registration.
+        datagrams (int): The datagrams received.
+        bytes (int): The payload bytes received.
+        busyNs (int): The time spent in the handler.
+    """
+
+    name: str
+    datagrams: int = 0
+    bytes: int = 0
+    busyNs: int = 0
+
+
+class ReactorCall:
+    """A call scheduled with NetworkReactor.callLater().
+
+    Attributes:
+        when (float): The time.monotonic() the callback is due.
+        active (bool): False once it ran or was cancelled.
+    """
+
+    __slots__ = ("when", "callback", "active")
+
+    def __init__(self, when: float, callback: Callable[[], None]) -> None:
+        self.when = when
+        self.callback = callback
+        self.active = True
+
+    def cancel(self) -> None:
+        """Don't run the callback, thread safe. Does nothing if it
+        already ran."""
+        self.active = False
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}:when={self.when};active={self.active}"
+
+
+class NetworkReactor:
+    """Runs the handlers of all registered sockets and the queued and
+    timed calls on one thread."""
+
+    __instance = None
+    # enough for any osc packet of vrc or the hardware
+    MAX_DATAGRAM_SIZE = 65535
+    # a flooded socket must not hold back the timers and other sockets,
+    # the rest is read after the next select
+    MAX_DATAGRAMS_PER_WAKEUP = 64
+
+    @classmethod
+    def getInstance(cls: type[T]) -> T:
+        """Get the shared instance, created and started on first use.
+
+        Returns:
+            NetworkReactor: The shared instance.
+        """
+        if NetworkReactor.__instance is None:
+            NetworkReactor.__instance = cls()
+            NetworkReactor.__instance.start()
+        return NetworkReactor.__instance
+
+    def __init__(self) -> None:
+        logger.debug(f"Creating {__class__.__name__}")
+        self._selector = selectors.DefaultSelector()
+        self._wakeRx, self._wakeTx = socket.socketpair()
+        self._wakeRx.setblocking(False)
+        self._wakeTx.setblocking(False)
+        self._selector.register(self._wakeRx, selectors.EVENT_READ, None)
+        # appending and popping is atomic, so any thread may queue
+        self._calls: deque[Callable[[], None]] = deque()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        # only touched by the reactor thread
+        self._timers: list[tuple[float, int, ReactorCall]] = []
+        # keeps the order of equal times, ReactorCall isn't comparable
+        self._counter = itertools.count()
+        self.stats: dict[socket.socket, SocketStats] = {}
+        self.callCount = 0
+        self.callBusyNs = 0
+        self.wakeups = 0
+
+    def start(self) -> None:
+        """Start the reactor thread."""
+        self._thread = threading.Thread(target=self._run, daemon=True,
+                                        name="NetworkReactor")
+        self._thread.start()
+
+    def callSoon(self, callback: Callable[[], None]) -> None:
+        """Run a function on the reactor thread, thread safe.
+
+        Args:
+            callback (Callable[[], None]): The function to run.
+        """
+        self._calls.append(callback)
+        try:
+            self._wakeTx.send(b"\0")
+        except BlockingIOError:
+            # the reactor has plenty of wakeups pending already
+            pass
+        except OSError:
+            # closed, the call is dropped
+            pass
+
+    def callLater(self, delay: float,
+                  callback: Callable[[], None]) -> ReactorCall:
+        """Run a function on the reactor thread after some time, thread
+        safe.
+
+        Args:
+            delay (float): The delay in seconds.
+            callback (Callable[[], None]): The function to run.
+
+        Returns:
+            ReactorCall: The handle to cancel it.
+        """
+        call = ReactorCall(time.monotonic() + delay, callback)
+
+        def push() -> None:
+            heapq.heappush(self._timers,
+                           (call.when, next(self._counter), call))
+        if self._inReactor():
+            push()
+        else:
+            self.callSoon(push)
+        return call
+
+    def callAndWait(self, callback: Callable[[], None]) -> None:
+        """Run a function on the reactor thread and return once it ran.
+
+        Args:
+            callback (Callable[[], None]): The function to run.
+        """
+        if self._inReactor():
+            callback()
+            return
+        done = threading.Event()
+
+        def run() -> None:
+            try:
+                callback()
+            finally:
+                done.set()
+        self.callSoon(run)
+        done.wait()
+
+    def _inReactor(self) -> bool:
+        return self._thread is None or not self._thread.is_alive() \
+            or threading.current_thread() is self._thread
+
+    def addSocket(self, sock: socket.socket, handler: PacketHandler,
+                  name: str = "") -> None:
+        """Call a handler with every datagram received on a socket.
+
+        Args:
+            sock (socket.socket): A bound datagram socket, it's made
+                non-blocking.
+            handler (PacketHandler): Called on the reactor thread with
+                the data and the sender address.
+            name (str, optional): The name in the stats. Defaults to "".
+        """
+        sock.setblocking(False)
+        stats = SocketStats(name or str(sock.getsockname()))
+
+        def register() -> None:
+            self._selector.register(
+                sock, selectors.EVENT_READ, (handler, stats))
+            self.stats[sock] = stats
+        if self._inReactor():
+            register()
+        else:
+            self.callSoon(register)
+
+    def removeSocket(self, sock: socket.socket) -> None:
+        """Stop receiving on a socket, the caller closes it. Returns
+        once the reactor doesn't use it anymore.
+
+        Args:
+            sock (socket.socket): The registered socket.
+        """
+        def unregister() -> None:
+            if sock in self.stats:
+                self._selector.unregister(sock)
+                self._logStats(self.stats.pop(sock))
+        self.callAndWait(unregister)
+
+    def _run(self) -> None:
+        """Wait for and dispatch datagrams and calls until close()."""
+        logger.debug("Network reactor started")
+        select = self._selector.select
+        while not self._stopped.is_set():
+            events = select(self._runTimers())
+            self.wakeups += 1
+            for key, _ in events:
+                if key.data is None:
+                    self._runCalls()
+                else:
+                    self._receive(key.fileobj, *key.data)
+        logger.debug("Network reactor stopped")
+
+    def _call(self, callback: Callable[[], None]) -> None:
+        startNs = time.perf_counter_ns()
+        try:
+            callback()
+        except Exception as E:
+            logger.exception(E)
+        self.callBusyNs += time.perf_counter_ns() - startNs
+        self.callCount += 1
+
+    def _runCalls(self) -> None:
+        try:
+            while self._wakeRx.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+        calls = self._calls
+        while calls:
+            self._call(calls.popleft())
+
+    def _runTimers(self) -> float | None:
+        """Run the due timed calls.
+
+        Returns:
+            float | None: The seconds until the next one, None if there
+                is none.
+        """
+        timers = self._timers
+        while timers:
+            when, _, call = timers[0]
+            if not call.active:
+                heapq.heappop(timers)
+                continue
+            remaining = when - time.monotonic()
+            if remaining > 0:
+                return remaining
+            heapq.heappop(timers)
+            call.active = False
+            self._call(call.callback)
+        return None
+
+    def _receive(self, sock: socket.socket, handler: PacketHandler,
+                 stats: SocketStats) -> None:
+        """Handle what arrived on the socket, up to
+        MAX_DATAGRAMS_PER_WAKEUP datagrams."""
+        recvfrom = sock.recvfrom
+        for _ in range(self.MAX_DATAGRAMS_PER_WAKEUP):
+            try:
+                data, addr = recvfrom(self.MAX_DATAGRAM_SIZE)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as E:
+                # eg. windows reports an icmp unreachable of an earlier
+                # send this way, the socket stays usable
+                logger.debug(f"Receiving on {stats.name} failed: {E}")
+                return
+            startNs = time.perf_counter_ns()
+            try:
+                handler(data, addr)
+            except Exception as E:
+                logger.exception(E)
+            stats.busyNs += time.perf_counter_ns() - startNs
+            stats.datagrams += 1
+            stats.bytes += len(data)
+
+    @staticmethod
+    def _logStats(stats: SocketStats) -> None:
+        if stats.datagrams:
+            logger.debug(
+                f"{stats.name}: {stats.datagrams} datagrams, "
+                f"{stats.bytes} bytes, {stats.busyNs / 1e6:.1f}ms handling "
+                f"({stats.busyNs / stats.datagrams / 1e3:.1f}us each)")
+
+    def close(self) -> None:
+        """Stop the thread, the registered sockets are left open."""
+        logger.debug(f"Stopping {__class__.__name__}")
+        self._stopped.set()
+        self.callSoon(lambda: None)
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+        for stats in self.stats.values():
+            self._logStats(stats)
+        if self.callCount:
+            logger.debug(
+                f"{self.callCount} calls, {self.callBusyNs / 1e6:.1f}ms "
+                f"({self.callBusyNs / self.callCount / 1e3:.1f}us each)")
+        self.stats = {}
+        self._timers = []
+        self._selector.close()
+        self._wakeRx.close()
+        self._wakeTx.close()
+        if NetworkReactor.__instance is self:
+            NetworkReactor.__instance = None
+
+    def __repr__(self) -> str:
+        return self.__class__.__name__ + ":" + ";"\
+            .join([f"{key}={str(val)}" for key, val in self.__dict__.items()])
+
+
+if __name__ == "__main__":
+    print("There is no point running this file directly")
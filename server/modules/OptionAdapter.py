@@ -164,7 +164,9 @@ class OptionAdapter():
         for path, (uiElem, dataType) in self._uiElems.items():
             path = f"{configKey}.{path}"
             newValue = self._getUiOpt(uiElem, dataType)
-            keyChanged = newValue != dataType(config.get(path))
+            oldValue = config.get(path)
+            # options missing in older configs are always saved
+            keyChanged = oldValue is None or newValue != dataType(oldValue)
             if keyChanged:
                 changedKeys.append(path)
             if not onlyDiff:
@@ -2,6 +2,9 @@
 This module houses all possibel OSC connection messages as dataclasses
 """
 
+import struct
+import time
+from collections.abc import Sequence
 from dataclasses import dataclass, field
 from datetime import datetime
 
@@ -42,6 +45,8 @@ class DiscoveryResponseMessage:
         hostname (str): The hardware devices hostname
         numMotors (int): The max amount of output channels
             as configured in the hardware device
+        capabilities (int): Feature bits of the firmware, 0 for older
+            firmware that doesn't send them
         sourceType (str): The origin of the message, "OSC" or "SlipSerial"
         sourceAddr (str): The osc device ip or serial port name
         ts (int): The time the object was created (aka received)
@@ -50,13 +55,81 @@ class DiscoveryResponseMessage:
     mac: str = "00:00:00:00:00:00"
     hostname: str = ""
     numMotors: int = 0
+    capabilities: int = 0
     sourceType: str | HardwareConnectionType = ""
     sourceAddr: str = ""
     ts: datetime = field(default_factory=datetime.now)
 
     @staticmethod
     def isType(topic: str, params: tuple) -> bool:
-        return topic == "/patpatpat/noticeme/senpai" and len(params) == 3
+        return topic == "/patpatpat/noticeme/senpai" \
+            and len(params) in (3, 4)
+
+
+@dataclass(frozen=True)
+class PongMessage:
+    """An incoming answer to a /patpatpat/ping, see modules.LinkTelemetry.
+
+    Attributes:
+        mac (str): The (wifi) mac of the sending hardware device
+        seq (int): The sequence number of the ping
+        deviceUs (int): The device's micros() when it answered
+        framesReceived (int): The binary motor frames the device applied
+        framesMissed (int): The binary motor frames skipped by sequence
+            gaps
+        sourceAddr (str): The osc device ip or serial port name
+        rxNs (int): The time.perf_counter_ns() the object was created
+            (aka received)
+    """
+
+    mac: str = "00:00:00:00:00:00"
+    seq: int = 0
+    deviceUs: int = 0
+    framesReceived: int = 0
+    framesMissed: int = 0
+    sourceAddr: str = ""
+    rxNs: int = field(default_factory=time.perf_counter_ns)
+
+    @staticmethod
+    def isType(topic: str, params: tuple) -> bool:
+        return topic == "/patpatpat/pong" and len(params) == 5
+
+
+class PreEncodedIntMessage:
+    """An outgoing OSC message with a fixed address and a fixed number
+    of int32 arguments.
+
+    The address and type tags are encoded once, every update only
+    writes the new values into their fixed offsets of the datagram.
+
+    Attributes:
+        dgram (bytearray): The encoded datagram, ready to send.
+    """
+
+    def __init__(self, address: str, numValues: int) -> None:
+        self.numValues = numValues
+        header = _oscString(address) + _oscString("," + "i"*numValues)
+        self._offset = len(header)
+        self._struct = struct.Struct(f">{numValues}i")
+        self.dgram = bytearray(header) + bytearray(self._struct.size)
+
+    def update(self, values: Sequence[int]) -> bytearray:
+        """Write new values into the datagram.
+
+        Args:
+            values (Sequence[int]): Exactly numValues ints.
+
+        Returns:
+            bytearray: The updated datagram (not a copy).
+        """
+        self._struct.pack_into(self.dgram, self._offset, *values)
+        return self.dgram
+
+
+def _oscString(value: str) -> bytes:
+    """Encode an OSC string, null terminated and padded to 4 bytes."""
+    encoded = value.encode() + b"\x00"
+    return encoded + b"\x00" * (-len(encoded) % 4)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,213 @@
+"""This module holds the per-device output buffers the motors write their
+PWM values into. At the end of every tick all buffers are committed
+into frames that are handed to the hardware side in one go.
+"""
+
+from dataclasses import dataclass
+
+from utils.Logger import LoggerClass
+
+logger = LoggerClass.getSubLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class EnvelopeSettings:
+    """The envelope of a single motor.
+
+    Attributes:
+        attackMs (float): The time to rise over the full PWM range,
+            0 is instantaneous.
+        releaseMs (float): The time to fall over the full PWM range,
+            0 is instantaneous.
+        smoothingMs (float): The time constant of the low pass applied
+            to the target, 0 disables it.
+        minPwm (int): Values below are sent as 0, rises start here.
+        maxPwm (int): The motor's full PWM range.
+    """
+
+    attackMs: float = 0.0
+    releaseMs: float = 0.0
+    smoothingMs: float = 0.0
+    minPwm: int = 0
+    maxPwm: int = 255
+
+
+@dataclass(frozen=True, slots=True)
+class OutputFrame:
+    """The committed PWM values of one hardware device.
+
+    Attributes:
+        hwId (int): The id of the destined HardwareDevice.
+        channels (tuple[int, ...]): The channels that are driven by
+            motors, only these are written to the device.
+        values (tuple[int, ...]): The PWM value per channel.
+        priority (int): The highest priority of the groups driving
+            the device, higher is sent first.
+        envelope (tuple[EnvelopeSettings | None, ...]): The envelope
+            per channel, None passes the value through.
+    """
+
+    hwId: int
+    channels: tuple[int, ...]
+    values: tuple[int, ...]
+    priority: int = 0
+    envelope: tuple[EnvelopeSettings | None, ...] = ()
+
+
+class DeviceOutputBuffer:
+    """The preallocated PWM values of a single hardware device.
+
+    Motors get a reference to the buffer at setup and write their value
+    into their channel's slot directly.
+
+    Attributes:
+        values (list[int]): The PWM value per channel.
+        dirty (bool): True if a value was written since the last commit.
+        priority (int): The highest priority of all bound channels.
+        envelope (tuple[EnvelopeSettings | None, ...]): The envelope
+            per channel, only replaced when a channel is (un)bound.
+    """
+
+    def __init__(self, hwId: int) -> None:
+        self.hwId = hwId
+        self.values: list[int] = []
+        self.channels: tuple[int, ...] = ()
+        self.dirty = False
+        self.priority = 0
+        self.envelope: tuple[EnvelopeSettings | None, ...] = ()
+        self._envelopes: dict[int, EnvelopeSettings] = {}
+        self._refCount: dict[int, int] = {}
+        self._released: set[int] = set()
+        # number of bound channels per priority
+        self._priorities: dict[int, int] = {}
+
+    def bindChannel(self, channelId: int, priority: int = 0,
+                    envelope: EnvelopeSettings | None = None) -> None:
+        """Reserve a channel for a motor.
+
+        Args:
+            channelId (int): The channel the motor is attached to.
+            priority (int, optional): The priority of the motor's group.
+                Defaults to 0.
+            envelope (EnvelopeSettings | None, optional): The motor's
+                envelope. Defaults to None.
+        """
+        if channelId >= len(self.values):
+            # extend in place so motors keep a valid reference
+            self.values.extend([0] * (channelId+1-len(self.values)))
+        self._refCount[channelId] = self._refCount.get(channelId, 0) + 1
+        self._released.discard(channelId)
+        self.channels = tuple(sorted(self._refCount))
+        self._priorities[priority] = self._priorities.get(priority, 0) + 1
+        self.priority = max(self._priorities)
+        if envelope:
+            self._envelopes[channelId] = envelope
+        self._updateEnvelope()
+
+    def unbindChannel(self, channelId: int, priority: int = 0) -> None:
+        """Release a channel. Once no motor uses it anymore it is set to
+        0 with the next commit and then left alone.
+
+        Args:
+            channelId (int): The channel the motor was attached to.
+            priority (int, optional): The priority it was bound with.
+                Defaults to 0.
+        """
+        if channelId not in self._refCount:
+            return
+        if self._priorities.get(priority, 0) > 1:
+            self._priorities[priority] -= 1
+        else:
+            self._priorities.pop(priority, None)
+        self.priority = max(self._priorities, default=0)
+        self._refCount[channelId] -= 1
+        if not self._refCount[channelId]:
+            del self._refCount[channelId]
+            self._envelopes.pop(channelId, None)
+            self._updateEnvelope()
+            self.values[channelId] = 0
+            self._released.add(channelId)
+            self.channels = tuple(sorted(self._refCount))
+            self.dirty = True
+
+    def _updateEnvelope(self) -> None:
+        envelopes = self._envelopes
+        self.envelope = tuple(envelopes.get(channelId)
+                              for channelId in range(len(self.values)))
+
+    def commit(self) -> OutputFrame | None:
+        """Create a frame of the current values if anything was written.
+
+        Returns:
+            OutputFrame | None: The frame or None if nothing changed.
+        """
+        if not self.dirty:
+            return None
+        self.dirty = False
+        channels = self.channels
+        if self._released:
+            channels = tuple(sorted(self._released.union(channels)))
+            self._released.clear()
+        return OutputFrame(self.hwId, channels, tuple(self.values),
+                           self.priority, self.envelope)
+
+    def __repr__(self) -> str:
+        return self.__class__.__name__ + ":" + ";"\
+            .join([f"{key}={str(val)}" for key, val in self.__dict__.items()])
+
+
+class OutputBufferPool:
+    """Holds one DeviceOutputBuffer per hardware device id."""
+
+    def __init__(self) -> None:
+        self._buffers: dict[int, DeviceOutputBuffer] = {}
+
+    def bind(self, hwId: int, channelId: int, priority: int = 0,
+             envelope: EnvelopeSettings | None = None) -> DeviceOutputBuffer:
+        """Reserve a channel and return the device's buffer.
+
+        Args:
+            hwId (int): The id of the HardwareDevice.
+            channelId (int): The channel on the HardwareDevice.
+            priority (int, optional): The priority of the motor's group.
+                Defaults to 0.
+            envelope (EnvelopeSettings | None, optional): The motor's
+                envelope. Defaults to None.
+
+        Returns:
+            DeviceOutputBuffer: The buffer of the HardwareDevice.
+        """
+        if hwId not in self._buffers:
+            self._buffers[hwId] = DeviceOutputBuffer(hwId)
+        buffer = self._buffers[hwId]
+        buffer.bindChannel(channelId, priority, envelope)
+        return buffer
+
+    def unbind(self, hwId: int, channelId: int, priority: int = 0) -> None:
+        """Release a channel reserved with bind().
+
+        Args:
+            hwId (int): The id of the HardwareDevice.
+            channelId (int): The channel on the HardwareDevice.
+            priority (int, optional): The priority it was bound with.
+                Defaults to 0.
+        """
+        if buffer := self._buffers.get(hwId):
+            buffer.unbindChannel(channelId, priority)
+
+    def commit(self) -> tuple[OutputFrame, ...]:
+        """Commit all buffers, run once at the end of every tick.
+
+        Returns:
+            tuple[OutputFrame, ...]: The frames of all changed buffers.
+        """
+        return tuple(frame for buffer in tuple(self._buffers.values())
+                     if (frame := buffer.commit()))
+
+    def __repr__(self) -> str:
+        return self.__class__.__name__ + ":" + ";"\
+            .join([f"{key}={str(val)}" for key, val in self.__dict__.items()])
+
+
+if __name__ == "__main__":
+    print("There is no point running this file directly")
@@ -0,0 +1,199 @@
+"""The time based envelope the motor outputs pass through before they are
+sent to the hardware.
+
+The solvers only set target PWM values. Every motor channel follows its
+target with a linear attack and release rate, given as the time in ms
+for a change over the motor's full PWM range. The target can be smoothed
+by a one-pole low pass between ticks. The channels of all devices are
+kept in flat numpy arrays and advanced in one vectorized step, so the
+HwOutputWorker can run it at a higher rate than the solver.
+
+Typical usage example:
+
+    envelope = OutputEnvelope()
+    envelope.setTargets(frame)
+    envelope.advance(time.perf_counter_ns())
+    envelope.write(frame.hwId, device.pinStates)
+"""
+
+import time
+
+import numpy as np
+
+from modules.OutputBuffers import EnvelopeSettings, OutputFrame
+
+# the rate of channels without attack/release, in pwm per ms, big
+# enough to cover the full 16 bit range in 1ns
+_INSTANT = 1e12
+
+
+class OutputEnvelope:
+    """The envelope state of all output channels of all devices.
+
+    Attributes:
+        settled (bool): True if every channel reached it's target, no
+            advance() is needed until the next setTargets().
+    """
+
+    def __init__(self) -> None:
+        # the number of channels and envelope settings per hw id
+        self._sizes: dict[int, int] = {}
+        self._settings: dict[int, tuple[EnvelopeSettings | None, ...]] = {}
+        # the channels the last frame of a device drove
+        self._driven: dict[int, tuple[int, ...]] = {}
+        # the offset of every device's channels in the flat arrays and
+        # the number of channels it was laid out with
+        self._offsets: dict[int, int] = {}
+        self._laidOut: dict[int, int] = {}
+        self._target = np.zeros(0)
+        self._smoothed = np.zeros(0)
+        self._current = np.zeros(0)
+        self._attack = np.zeros(0)
+        self._release = np.zeros(0)
+        self._smoothing = np.zeros(0)
+        self._minPwm = np.zeros(0)
+        self._hasSmoothing = False
+        self._output: list[int] = []
+        self._lastNs = time.perf_counter_ns()
+        self.settled = True
+
+    def setTargets(self, frame: OutputFrame) -> None:
+        """Take the values of a committed frame as new targets.
+
+        Args:
+            frame (OutputFrame): The frame of one device.
+        """
+        hwId = frame.hwId
+        values = frame.values
+        if self._sizes.get(hwId, -1) < len(values) \
+                or self._settings.get(hwId) is not frame.envelope:
+            self._sizes[hwId] = max(self._sizes.get(hwId, 0), len(values))
+            self._settings[hwId] = frame.envelope
+            self._rebuild()
+        start = self._offsets[hwId]
+        target = self._target
+        for channelId in frame.channels:
+            target[start+channelId] = min(values[channelId], 0xFFFF)
+        self._driven[hwId] = frame.channels
+        self.settled = False
+
+    def retain(self, hwIds: set[int]) -> None:
+        """Drop the state of all devices that are not in hwIds.
+
+        Args:
+            hwIds (set[int]): The ids of the existing devices.
+        """
+        removed = self._sizes.keys() - hwIds
+        if not removed:
+            return
+        for hwId in removed:
+            del self._sizes[hwId]
+            self._settings.pop(hwId, None)
+            self._driven.pop(hwId, None)
+        self._rebuild()
+
+    def advance(self, nowNs: int) -> None:
+        """Move all channels towards their target.
+
+        Args:
+            nowNs (int): time.perf_counter_ns() of the step.
+        """
+        # at least 1ns, so instant channels move even without elapsed time
+        dt = max(nowNs - self._lastNs, 1) / 1e6
+        self._lastNs = nowNs
+        if self.settled:
+            return
+        target = self._target
+        smoothed = self._smoothed
+        current = self._current
+
+        if self._hasSmoothing:
+            smoothed += (target - smoothed) * self._smoothingAlpha(dt)
+        else:
+            smoothed[:] = target
+        # rises start at minPwm, below it the motors don't spin anyway
+        np.copyto(current, self._minPwm,
+                  where=(current < self._minPwm) & (smoothed >= self._minPwm))
+        current += np.clip(smoothed - current,
+                           -self._release * dt, self._attack * dt)
+
+        if np.all(np.abs(target - current) < 0.5):
+            smoothed[:] = target
+            current[:] = target
+            self.settled = True
+        self._updateOutput()
+
+    def write(self, hwId: int, pinStates) -> None:
+        """Copy the current output of the driven channels of a device.
+
+        Args:
+            hwId (int): The id of the HardwareDevice.
+            pinStates (array): The device's pin states.
+        """
+        if (start := self._offsets.get(hwId)) is None:
+            return
+        output = self._output
+        numChannels = len(pinStates)
+        for channelId in self._driven.get(hwId, ()):
+            if channelId < numChannels:
+                pinStates[channelId] = output[start+channelId]
+
+    def _smoothingAlpha(self, dt: float) -> np.ndarray:
+        smoothing = self._smoothing
+        return np.where(smoothing > 0,
+                        -np.expm1(-dt / np.maximum(smoothing, 1e-9)), 1.0)
+
+    def _updateOutput(self) -> None:
+        output = np.rint(self._current)
+        output[output < self._minPwm] = 0
+        self._output = output.astype(np.int64).tolist()
+
+    def _rebuild(self) -> None:
+        """Re-layout the flat arrays, keeping the state of all devices."""
+        offsets = {}
+        size = 0
+        for hwId, numChannels in self._sizes.items():
+            offsets[hwId] = size
+            size += numChannels
+
+        state = [np.zeros(size) for _ in range(3)]
+        params = [np.zeros(size) for _ in range(4)]
+        for hwId, start in offsets.items():
+            numChannels = self._sizes[hwId]
+            if (oldStart := self._offsets.get(hwId)) is not None:
+                # added channels start at 0
+                count = min(self._laidOut[hwId], numChannels)
+                for new, old in zip(state, (self._target, self._smoothed,
+                                            self._current)):
+                    new[start:start+count] = old[oldStart:oldStart+count]
+            settings = self._settings.get(hwId, ())
+            for channelId in range(numChannels):
+                envelope = settings[channelId] \
+                    if channelId < len(settings) else None
+                i = start + channelId
+                if envelope is None:
+                    params[0][i] = params[1][i] = _INSTANT
+                    continue
+                maxPwm = max(envelope.maxPwm, 1)
+                params[0][i] = maxPwm / envelope.attackMs \
+                    if envelope.attackMs > 0 else _INSTANT
+                params[1][i] = maxPwm / envelope.releaseMs \
+                    if envelope.releaseMs > 0 else _INSTANT
+                params[2][i] = envelope.smoothingMs
+                params[3][i] = envelope.minPwm
+
+        self._offsets = offsets
+        self._laidOut = dict(self._sizes)
+        self._target, self._smoothed, self._current = state
+        self._attack, self._release, self._smoothing, self._minPwm = params
+        self._hasSmoothing = bool((self._smoothing > 0).any())
+        self.settled = False
+        self._updateOutput()
+
+    def __repr__(self) -> str:
+        return self.__class__.__name__ + ":" + ";"\
+            .join([f"{key}={str(val)}" for key, val in self.__dict__.items()])
+
+
+if __name__ == "__main__":
+    print("There is no point running this file directly")
@@ -3,8 +3,10 @@ from typing import TypeVar
 from PyQt6.QtCore import QObject, QThread
 
 from modules.ContactGroup import ContactGroupManager
+from modules.DeadlineScheduler import DeadlineScheduler
 from modules.GlobalConfig import GlobalConfigSingleton
 from modules.HwManager import HwManager
+from modules.NetworkReactor import NetworkReactor
 from modules.VrcConnector import VrcConnectorImpl
 from utils.Logger import LoggerClass
 from utils.threadToStr import threadAsStr
@@ -43,16 +45,14 @@ class ServerSingleton(QObject):
 
         self.contactGroupManager = ContactGroupManager()
 
-        self.vrcOscConnector.onVrcContact.connect(
-            self.contactGroupManager.onVrcContact)
+        self.vrcOscConnector.contactSink = \
+            self.contactGroupManager.contacts.append
         self.contactGroupManager.registerAvatarPoint.connect(
             self.vrcOscConnector.addToFilter)
         self.contactGroupManager.unregisterAvatarPoint.connect(
             self.vrcOscConnector.removeFromFilter)
-        self.contactGroupManager.motorPwmChanged.connect(
-            self.hwManager.writeSpeed)
-        self.contactGroupManager.solverDone.connect(
-            self.hwManager.sendHwUpdate)
+        self.contactGroupManager.outputSink = \
+            self.hwManager.outputWorker.post
 
         self.hwManager.createAllHardwareDevicesFromConfig()
         self.contactGroupManager.createAllContactGroupsFromConfig()
@@ -72,6 +72,9 @@ class ServerSingleton(QObject):
         if hasattr(self, "hwManager"):
             self.hwManager.close()
 
+        NetworkReactor.getInstance().close()
+        DeadlineScheduler.getInstance().close()
+
 
 if __name__ == "__main__":
     print("There is no point running this file directly")
@@ -0,0 +1,136 @@
+"""A single non-blocking UDP socket shared by all OSC hardware adapters.
+
+While a tick is sent the datagrams of all devices are queued and sent in
+one go with flush(). Queued datagrams are not copied, the adapters
+reuse one encode buffer per device and only change it after the flush.
+Send errors are counted per destination instead of being logged on
+every send.
+
+Typical usage example:
+
+    sender = SharedUdpSocket.getInstance()
+    sender.queue(dgram, ("10.0.0.5", 8888))
+    sender.flush()
+"""
+
+import socket
+from collections import deque
+from collections.abc import Buffer
+from typing import TypeVar
+
+from utils.Logger import LoggerClass
+
+logger = LoggerClass.getSubLogger(__name__)
+
+T = TypeVar('T', bound='SharedUdpSocket')
+type Address = tuple[str, int]
+
+
+class SharedUdpSocket:
+    """The send socket for all hardware devices.
+
+    Attributes:
+        sentCount (int): The number of datagrams sent successfully.
+        errorCounts (dict[Address, int]): The failed sends per destination.
+    """
+
+    __instance = None
+
+    @classmethod
+    def getInstance(cls: type[T]) -> T:
+        """Get the shared instance, created on first use.
+
+        Returns:
+            SharedUdpSocket: The shared instance.
+        """
+        if not SharedUdpSocket.__instance:
+            SharedUdpSocket.__instance = cls()
+        return SharedUdpSocket.__instance
+
+    def __init__(self) -> None:
+        logger.debug(f"Creating {__class__.__name__}")
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.setblocking(False)
+        # appending and popping is atomic, so any thread may queue
+        self._pending: deque[tuple[Buffer, Address]] = deque()
+        self._lastErrno: dict[Address, int | None] = {}
+        self.sentCount = 0
+        self.errorCounts: dict[Address, int] = {}
+
+    def sendto(self, data: Buffer, addr: Address) -> bool:
+        """Send a datagram right away.
+
+        Args:
+            data (Buffer): The datagram.
+            addr (Address): The destination ip and port.
+
+        Returns:
+            bool: True if the datagram was handed to the os.
+        """
+        try:
+            self._sock.sendto(data, addr)
+        except OSError as E:
+            self._countError(addr, E)
+            return False
+        self.sentCount += 1
+        if self._lastErrno:
+            # the destination recovered, log it's next error again
+            self._lastErrno.pop(addr, None)
+        return True
+
+    def queue(self, data: Buffer, addr: Address) -> None:
+        """Queue a datagram for the next flush(). The data is not copied,
+        the caller must not change it's buffer before the flush.
+
+        Args:
+            data (Buffer): The datagram.
+            addr (Address): The destination ip and port.
+        """
+        self._pending.append((data, addr))
+
+    def flush(self) -> int:
+        """Send all queued datagrams.
+
+        Returns:
+            int: The number of datagrams sent successfully.
+        """
+        pending = self._pending
+        sent = 0
+        while pending:
+            data, addr = pending.popleft()
+            sent += self.sendto(data, addr)
+        return sent
+
+    def errorCount(self, addr: Address) -> int:
+        """Get the number of failed sends to a destination.
+
+        Args:
+            addr (Address): The destination ip and port.
+
+        Returns:
+            int: The number of failed sends.
+        """
+        return self.errorCounts.get(addr, 0)
+
+    def _countError(self, addr: Address, error: OSError) -> None:
+        self.errorCounts[addr] = self.errorCounts.get(addr, 0) + 1
+        # only log when a destination starts failing or fails differently
+        if self._lastErrno.get(addr) != error.errno:
+            self._lastErrno[addr] = error.errno
+            logger.warning(f"Sending to {addr[0]}:{addr[1]} failed: {error}")
+
+    def close(self) -> None:
+        """Close the socket, the next getInstance() creates a new one."""
+        logger.debug(f"Stopping {__class__.__name__}")
+        self._pending.clear()
+        self._sock.close()
+        if SharedUdpSocket.__instance is self:
+            SharedUdpSocket.__instance = None
+
+    def __repr__(self) -> str:
+        return self.__class__.__name__ + ":" + ";"\
+            .join([f"{key}={str(val)}" for key, val in self.__dict__.items()])
+
+
+if __name__ == "__main__":
+    print("There is no point running this file directly")
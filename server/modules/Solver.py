@@ -1,6 +1,7 @@
-import time
+from dataclasses import dataclass
 from statistics import mean
 
+import numpy as np
 from multilateration import Engine, Point
 from PyQt6.QtCore import QObject
 from PyQt6.QtCore import pyqtSignal as QSignal
@@ -8,8 +9,13 @@ from PyQt6.QtCore import pyqtSlot as QSlot
 from PyQt6.QtGui import QVector3D
 
 from modules.AvatarPoint import AvatarPointSphere
+from modules.BatchedMlat import motorSpeeds, solveBatch
 from modules.GlobalConfig import GlobalConfigSingleton
+from modules.Measurements import MeasurementSnapshot, MeasurementStage
 from modules.Motor import Motor
+from modules.SolverCache import SolverResultCache
+from modules.SurfacePrimitives import fitPrimitive
+from modules.ValidationVolume import VoxelValidationVolume
 from utils.Enums import SolverType, VisualizerType
 from utils.Logger import LoggerClass
 
@@ -17,23 +23,53 @@ logger = LoggerClass.getSubLogger(__name__)
 config = GlobalConfigSingleton.getInstance()
 
 
+@dataclass(frozen=True)
+class SolverResult:
+    """The outcome of a single solver run.
+
+    Attributes:
+        point (QVector3D | None): The solved point if the solver
+            computes one.
+        speeds (tuple[float, ...] | None): The speed for each motor or
+            None if the motors should keep their current value.
+    """
+
+    point: QVector3D | None = None
+    speeds: tuple[float, ...] | None = None
+
+
 class ISolver(QObject):
     """The interface/base class."""
     newPointSolved = QSignal(QVector3D, int)
+    # max age of the contact data in seconds before motors fade out
+    maxDataAge: float = 0.2
+    # max time in seconds the motors hold their value without a result
+    maxHoldTime: float = 0.15
 
     def __init__(self, motors: list[Motor],
                  avatarPoints: list[AvatarPointSphere],
-                 configKey: str) -> None:
+                 configKey: str,
+                 measurements: MeasurementStage) -> None:
         super().__init__()
         self._avatarPoints = avatarPoints
         self._motors = motors
         self._configKey = configKey
+        self._measurements = measurements
+        self._slots = [measurements.indexOf(p.receiverId)
+                       for p in avatarPoints]
+        self.resultCache = SolverResultCache()
+        self._lastResultTs = 0.0
         self._loadConfig()
 
     def _loadConfig(self) -> None:
         self._config = config.get(f"{self._configKey}.solver")
         if not self._config:
             logger.error("Failed to load config for solver")
+            self._config = {}
+        # cached results depend on the config (eg. strength), drop them
+        self.resultCache.configure(
+            self._config.get("cacheResolution", 0.01),
+            self._config.get("cacheSize", 64))
 
     def getType(self) -> VisualizerType:
         """Return the type of visualizer it is"""
@@ -53,10 +89,97 @@ class ISolver(QObject):
         config.set(f"{self._configKey}.solver.strength", strength)
         self._loadConfig()
 
-    def solve(self) -> None:
-        """A generic solve method to be reimplemented."""
+    def solve(self, snapshot: MeasurementSnapshot) -> None:
+        """Run the solver on the contact data of the current tick.
+
+        Results for measurements that were already seen recently are
+        served from the result cache instead of solving again.
+
+        Args:
+            snapshot (MeasurementSnapshot): The tick's contact data.
+        """
+        if not self._validatePointDataAge(snapshot):
+            self.release()
+            return
+
+        values = snapshot.values
+        measurements = tuple(values[slot] for slot in self._slots)
+        if (result := self.resultCache.get(measurements)) is None:
+            result = self._solve(measurements)
+            self.resultCache.put(measurements, result)
+        self._applyResult(result, snapshot.ts)
+
+    def _solve(self, measurements: tuple[float, ...]) -> SolverResult:
+        """A generic solve method to be reimplemented.
+
+        Args:
+            measurements (tuple[float, ...]): The last value of each
+                avatar point in the same order as self._avatarPoints.
+
+        Returns:
+            SolverResult: The solved point and/or motor speeds.
+        """
         raise NotImplementedError
 
+    def _applyResult(self, result: SolverResult, ts: float) -> None:
+        """Write a (possibly cached) result out to the motors. Without
+        speeds the motors hold their value for up to maxHoldTime.
+
+        Args:
+            result (SolverResult): The result to apply.
+            ts (float): The timestamp of the tick.
+        """
+        if result.point is not None:
+            self.newPointSolved.emit(result.point, 0)
+        if result.speeds is not None:
+            self._lastResultTs = ts
+            for motor, speed in zip(self._motors, result.speeds):
+                motor.setSpeed(speed)
+        elif ts - self._lastResultTs > self.maxHoldTime:
+            self.release()
+
+    def release(self) -> None:
+        """Set all motors to 0, the output envelope fades them out."""
+        for motor in self._motors:
+            motor.release()
+
+    def _speedsForPoint(self, point: QVector3D) -> tuple[float, ...]:
+        """Calculate the speed of every motor for a solved point.
+
+        Args:
+            point (QVector3D): The solved contact point.
+
+        Returns:
+            tuple[float, ...]: The speed for each motor.
+        """
+        strengthFactor = self._config.get("strength", 100)/100.0
+        speeds = []
+        for motor in self._motors:
+            # calculate the distance and normalize it
+            distance = point.distanceToPoint(motor.point)/motor.point.radius
+            # at this point we have a %(0-1) for how far the contact is
+            # from the motor where:
+            # 0=both points touching, 1=edge of range, >1 out of range
+
+            if self._contactOnly:
+                # full speed ahead on contact if configured
+                speed = strengthFactor if distance <= 1.0 else 0
+            else:
+                # little deadband near the motors center
+                distance = max(distance, 0.1)
+
+                # invert value, clamp it and apply strength factor
+                speed = max(1.0-distance, 0)*strengthFactor
+
+            speeds.append(speed)
+        return tuple(speeds)
+
+    def _validatePointDataAge(self, snapshot: MeasurementSnapshot) -> bool:
+        """Check that all received points are fresh"""
+        ages = snapshot.ages
+        maxAge = self.maxDataAge
+        return all(ages[slot] < maxAge for slot in self._slots)
+
     def __repr__(self) -> str:
         return self.__class__.__name__ + ":" + ";"\
             .join([f"{key}={str(val)}" for key, val in self.__dict__.items()])
@@ -76,19 +199,16 @@ class SingleN2NSolver(ISolver):
         self._mode = self._config.get("SINGLEN2N_minMaxMode", "Max")
         self._modeModule = mean if self._mode == "Mean" \
             else max if self._mode == "Max" else min
+        self.resultCache.clear()
 
     def getType(self) -> SolverType:
         return SolverType.SINGLEN2N
 
-    def solve(self) -> None:
-        if not self._validatePointDataAge():
-            for motor in self._motors:
-                motor.fadeOut()
-            return
-
+    def _solve(self, measurements: tuple[float, ...]) -> SolverResult:
         # Get min or max value of all contact receiver points
         distance = self._modeModule(
-            ((1.0-point.lastValue)*point.radius for point in self._avatarPoints))
+            ((1.0-value)*point.radius for value, point
+             in zip(measurements, self._avatarPoints)))
 
         # Calculate speeds
         strengthFactor = self._config.get("strength", 100)/100.0
@@ -97,14 +217,8 @@ class SingleN2NSolver(ISolver):
         else:
             speed = max(1.0-distance, 0)*strengthFactor
 
-        # Write speed to motors
-        for motor in self._motors:
-            motor.setSpeed(speed)
-
-    def _validatePointDataAge(self) -> bool:
-        """Check that all received points are fresh"""
-        maxAge = time.time()-0.2
-        return all(p.lastValueTs > maxAge for p in self._avatarPoints)
+        # Write speed to all motors
+        return SolverResult(speeds=(speed,)*len(self._motors))
 
 
 class MlatSolver(ISolver):
@@ -112,6 +226,7 @@ class MlatSolver(ISolver):
     to calculate the 3d position of an object by using the distance from
     multiple contact receivers
     """
+    maxDataAge = 0.15
 
     def __init__(self, *args) -> None:
         logger.debug(f"Creating {__class__.__name__}")
@@ -125,28 +240,29 @@ class MlatSolver(ISolver):
         for avatarPoint in self._avatarPoints:
             self.mlatEngine.add_anchor(avatarPoint.receiverId, avatarPoint.xyz)
 
-        # find center point for validation
-        self._centerPoint = min(self._avatarPoints, key=lambda p: p.y())
+        # precompute the volume solved points are validated against
+        self._enableVolumeCheck = self._config.get(
+            "MLAT_enableVolumeCheck",
+            self._config.get("MLAT_enableHalfSphereCheck", False))
+        self.validationVolume = VoxelValidationVolume(
+            [(p.xyz, p.radius) for p in self._avatarPoints],
+            self._config.get("MLAT_volumeResolution", 32))
+        self.resultCache.clear()
 
     def getType(self) -> SolverType:
         return SolverType.MLAT
 
-    def solve(self) -> None:
-        if not self._validatePointDataAge():
-            for motor in self._motors:
-                motor.fadeOut()
-            return
-
+    def _solve(self, measurements: tuple[float, ...]) -> SolverResult:
         # Add inverted and scaled point measures to solver
-        for avatarPoint in self._avatarPoints:
-            scaledDistance = (1.0-avatarPoint.lastValue)*avatarPoint.radius
+        for value, avatarPoint in zip(measurements, self._avatarPoints):
+            scaledDistance = (1.0-value)*avatarPoint.radius
             self.mlatEngine.add_measure_id(
                 avatarPoint.receiverId, scaledDistance)
 
         # Try to solve
         if not (solveResult := self.mlatEngine.solve()):
             logger.debug("Could not solve")
-            return
+            return SolverResult()
 
         # logger.debug(f"Sucessfully solved to {str(solveResult)}")
 
@@ -154,61 +270,172 @@ class MlatSolver(ISolver):
         solvedPoint = self._QVector3DfromMlatPoint(solveResult)
 
         # run validation of computed point if enabled
-        if self._config.get("MLat_enableHalfSphereCheck", False) \
-                and not self._runHalfSphereCheck(solvedPoint):
+        if self._enableVolumeCheck and not self.validationVolume.contains(
+                (solveResult.x, solveResult.y, solveResult.z)):
             logger.debug(f"Validation failed for {solvedPoint}")
-            return
+            return SolverResult()
 
-        self.newPointSolved.emit(solvedPoint, 0)
         logger.debug(solvedPoint)
 
-        strengthFactor = self._config.get("strength", 100)/100.0
-        for motor in self._motors:
-            # calculate the distance and normalize it
-            distance = solvedPoint.distanceToPoint(
-                motor.point)/motor.point.radius
-            # at this point we have a %(0-1) for how far the contact is
-            # from the motor where:
-            # 0=both points touching, 1=edge of range, >1 out of range
+        return SolverResult(solvedPoint, self._speedsForPoint(solvedPoint))
 
-            if self._contactOnly:
-                # full speed ahead on contact if configured
-                speed = strengthFactor if distance <= 1.0 else 0
-            else:
-                # little deadband near the motors center
-                distance = max(distance, 0.1)
+    def _QVector3DfromMlatPoint(self, point: Point):
+        return QVector3D(point.x, point.y, point.z)
 
-                # invert value, clamp it and apply strength factor
-                speed = max(1.0-distance, 0)*strengthFactor
 
-            motor.setSpeed(speed)
+class SurfaceSolver(ISolver):
+    """This solver constrains the contact point to a primitive (sphere,
+    capsule or ellipsoid) fitted to the contact receivers. On the surface
+    only the direction of the contact is unknown, which is solved in
+    closed form. This needs fewer receivers than free-space MLat and the
+    point can never end up inside the body part.
+    """
 
-    def _validatePointDataAge(self) -> bool:
-        """Check that all received points are fresh"""
-        maxAge = time.time()-0.15
-        return all(p.lastValueTs > maxAge for p in self._avatarPoints)
+    def __init__(self, *args) -> None:
+        logger.debug(f"Creating {__class__.__name__}")
+        super().__init__(*args)
 
-    def _QVector3DfromMlatPoint(self, point: Point):
-        return QVector3D(point.x, point.y, point.z)
+    def setup(self) -> None:
+        self._contactOnly = self._config.get("contactOnly", False)
+        self._anchors = np.array([p.xyz for p in self._avatarPoints],
+                                 dtype=np.float64).reshape(-1, 3)
+        self._radii = np.array([p.radius for p in self._avatarPoints],
+                               dtype=np.float64)
+        self.surface = fitPrimitive(
+            self._config.get("SURFACE_shape", "Sphere"), self._anchors)
+        logger.debug(f"Fitted surface {self.surface}")
+        self.resultCache.clear()
+
+    def getType(self) -> SolverType:
+        return SolverType.SURFACE
+
+    def _solve(self, measurements: tuple[float, ...]) -> SolverResult:
+        values = np.asarray(measurements, dtype=np.float64)
+        active = values > 0
+        # nothing in range of any receiver means nothing is touching
+        if not active.any():
+            return SolverResult(speeds=(0.0,)*len(self._motors))
+
+        anchors = self._anchors[active]
+        distances = (1.0-values[active])*self._radii[active]
+        weights = values[active]
+        hint = (anchors*weights[:, None]).sum(axis=0) / weights.sum()
+        center, radius = self.surface.localSphere(hint)
+
+        # on a sphere |c + R*u - a|² = d² is linear in the direction u:
+        # (a-c)·u = (R² + |a-c|² - d²) / 2R
+        offsets = anchors - center
+        b = (radius**2 + np.sum(offsets**2, axis=1) - distances**2) \
+            / (2*radius)
+        direction, _, rank, _ = np.linalg.lstsq(offsets, b, rcond=None)
+        if rank < 3:
+            # too few receivers, take the unit length solution that is
+            # closest to the weighted receiver position
+            hintDirection = hint - center
+            rowSpace = np.linalg.svd(offsets)[2][:rank]
+            free = hintDirection - rowSpace.T @ (rowSpace @ hintDirection)
+            if (freeLength := np.linalg.norm(free)) > 1e-12:
+                direction = direction + free/freeLength * np.sqrt(
+                    max(1.0 - direction @ direction, 0.0))
+
+        point = self.surface.project(center + radius*direction)
+        solvedPoint = QVector3D(*point.tolist())
+        return SolverResult(solvedPoint, self._speedsForPoint(solvedPoint))
+
+
+class MlatBatch:
+    """Solves many MlatSolvers together in one vectorized pass.
+
+    The anchors, measurements and motors of all solvers are stacked into
+    padded arrays once. Every tick the measurements are gathered from
+    the snapshot, solved with modules.BatchedMlat and the results are
+    scattered back to each solver's motors.
+    """
+
+    def __init__(self, solvers: list[MlatSolver]) -> None:
+        """Build the padded problem arrays.
 
-    def _runHalfSphereCheck(self, point: QVector3D) -> bool:
-        """Validate that the calculcated point makes somewhat sense"""
-        # distance from center point to calculcated point<=center radius
-        # and the point's y is not below the center y
-        center = self._centerPoint
-        return center.distanceToPoint(point) <= center.radius*1.3 \
-            and point.y() >= center.y()
+        Args:
+            solvers (list[MlatSolver]): The already set up solvers.
+        """
+        logger.debug(f"Creating {__class__.__name__} for "
+                     f"{len(solvers)} solvers")
+        self.solvers = solvers
+        self._solverIds = {id(s) for s in solvers}
+        groups = len(solvers)
+        numAnchors = max((len(s._avatarPoints) for s in solvers), default=1)
+        numMotors = max((len(s._motors) for s in solvers), default=1)
+
+        self._slots = np.zeros((groups, numAnchors), dtype=np.intp)
+        self._anchorMask = np.zeros((groups, numAnchors), dtype=np.bool_)
+        self._anchors = np.zeros((groups, numAnchors, 3))
+        self._radii = np.zeros((groups, numAnchors))
+        self._motorPositions = np.zeros((groups, max(numMotors, 1), 3))
+        self._motorRadii = np.ones((groups, max(numMotors, 1)))
+        self._maxDataAge = np.zeros(groups)
+        for g, solver in enumerate(solvers):
+            numPoints = len(solver._avatarPoints)
+            self._slots[g, :numPoints] = solver._slots
+            self._anchorMask[g, :numPoints] = True
+            for i, point in enumerate(solver._avatarPoints):
+                self._anchors[g, i] = point.xyz
+                self._radii[g, i] = point.radius
+            for i, motor in enumerate(solver._motors):
+                self._motorPositions[g, i] = motor.point.xyz
+                self._motorRadii[g, i] = motor.point.radius
+            self._maxDataAge[g] = solver.maxDataAge
+
+    def __contains__(self, solver: object) -> bool:
+        return id(solver) in self._solverIds
+
+    def solve(self, snapshot: MeasurementSnapshot) -> None:
+        """Solve all solvers of this batch for the current tick.
+
+        Args:
+            snapshot (MeasurementSnapshot): The tick's contact data.
+        """
+        if not self.solvers or not snapshot.values:
+            return
+        values = np.asarray(snapshot.values)[self._slots]
+        ages = np.asarray(snapshot.ages)[self._slots]
+        fresh = ((ages < self._maxDataAge[:, None])
+                 | ~self._anchorMask).all(axis=1)
+
+        distances = (1.0-values)*self._radii
+        points, ok = solveBatch(self._anchors, distances, self._anchorMask)
+        strength = np.array(
+            [s._config.get("strength", 100)/100.0 for s in self.solvers])
+        contactOnly = np.array([s._contactOnly for s in self.solvers])
+        speeds = motorSpeeds(points, self._motorPositions,
+                             self._motorRadii, strength, contactOnly)
+
+        for g, solver in enumerate(self.solvers):
+            if not fresh[g]:
+                solver.release()
+                continue
+            point = points[g].tolist()
+            if not ok[g] or (solver._enableVolumeCheck
+                             and not solver.validationVolume.contains(point)):
+                solver._applyResult(SolverResult(), snapshot.ts)
+                continue
+            solver._applyResult(SolverResult(
+                QVector3D(*point),
+                tuple(speeds[g, :len(solver._motors)].tolist())),
+                snapshot.ts)
 
 
 class SolverFactory:
     @staticmethod
     def fromType(solverType: SolverType) -> \
-            type[SingleN2NSolver] | type[MlatSolver] | None:
+            type[SingleN2NSolver] | type[MlatSolver] \
+            | type[SurfaceSolver] | None:
         match solverType:
             case SolverType.SINGLEN2N:
                 return SingleN2NSolver
             case SolverType.MLAT:
                 return MlatSolver
+            case SolverType.SURFACE:
+                return SurfaceSolver
 
 
 if __name__ == "__main__":
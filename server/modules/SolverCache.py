@@ -0,0 +1,110 @@
+"""A small LRU cache that sits in front of a solver and memoizes it's
+results keyed on the quantized contact receiver measurements.
+
+Typical usage example:
+
+    cache = SolverResultCache(resolution=0.01, maxSize=64)
+    if (result := cache.get(measurements)) is None:
+        result = expensiveSolve(measurements)
+        cache.put(measurements, result)
+"""
+
+from collections import OrderedDict
+from typing import Any, Sequence
+
+
+class SolverResultCache:
+    """LRU cache for solver results.
+
+    Attributes:
+        hits (int): Number of lookups that were served from the cache.
+        misses (int): Number of lookups that were not in the cache.
+    """
+
+    def __init__(self, resolution: float = 0.01, maxSize: int = 64) -> None:
+        """Create a new cache.
+
+        Args:
+            resolution (float, optional): The step size the measurements
+                are quantized to before being used as key. A value <= 0
+                disables the cache. Defaults to 0.01.
+            maxSize (int, optional): Max amount of cached results.
+                Defaults to 64.
+        """
+        self._entries: OrderedDict[tuple[int, ...], Any] = OrderedDict()
+        self.configure(resolution, maxSize)
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, resolution: float, maxSize: int) -> None:
+        """Change the cache parameters. This also clears the cache.
+
+        Args:
+            resolution (float): The quantization step size.
+            maxSize (int): Max amount of cached results.
+        """
+        self._resolution = resolution
+        self._maxSize = max(maxSize, 0)
+        self.enabled = resolution > 0 and self._maxSize > 0
+        self.clear()
+
+    def _makeKey(self, measurements: Sequence[float]) -> tuple[int, ...]:
+        """Quantize the measurements into a hashable key."""
+        res = self._resolution
+        return tuple(round(value / res) for value in measurements)
+
+    def get(self, measurements: Sequence[float]) -> Any:
+        """Look up a cached result.
+
+        Args:
+            measurements (Sequence[float]): The raw measurement vector.
+
+        Returns:
+            Any: The cached result or None if there is none.
+        """
+        if not self.enabled:
+            return None
+        key = self._makeKey(measurements)
+        if (result := self._entries.get(key)) is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, measurements: Sequence[float], result: Any) -> None:
+        """Store a result for the given measurements.
+
+        Args:
+            measurements (Sequence[float]): The raw measurement vector.
+            result (Any): The result to store, must not be None.
+        """
+        if not self.enabled or result is None:
+            return
+        key = self._makeKey(measurements)
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._maxSize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached results (e.g. after geometry or strength
+        changes)."""
+        self._entries.clear()
+
+    @property
+    def hitRate(self) -> float:
+        """The ratio of hits to total lookups."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return self.__class__.__name__ + ":" + ";"\
+            .join([f"{key}={str(val)}" for key, val in self.__dict__.items()])
+
+
+if __name__ == "__main__":
+    print("There is no point running this file directly")
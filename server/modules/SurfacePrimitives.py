@@ -0,0 +1,202 @@
+"""Analytic body primitives the surface solver constrains points to.
+
+Every primitive is fitted once to the contact receiver positions and
+can then project any point onto it's surface in closed form.
+
+Typical usage example:
+
+    surface = fitPrimitive("Capsule", [p.xyz for p in avatarPoints])
+    center, radius = surface.localSphere(hint)
+    point = surface.project(center + radius * direction)
+"""
+
+from typing import Sequence
+
+import numpy as np
+
+from utils.Logger import LoggerClass
+
+logger = LoggerClass.getSubLogger(__name__)
+
+
+class SurfacePrimitive:
+    """The interface/base class for all primitives."""
+
+    def localSphere(self, hint: np.ndarray) -> tuple[np.ndarray, float]:
+        """Return the sphere that best matches the surface near a point.
+
+        Args:
+            hint (np.ndarray): A point near the expected contact.
+
+        Returns:
+            tuple[np.ndarray, float]: The center and radius.
+        """
+        raise NotImplementedError
+
+    def project(self, point: np.ndarray) -> np.ndarray:
+        """Move a point onto the surface.
+
+        Args:
+            point (np.ndarray): The point to project.
+
+        Returns:
+            np.ndarray: The point on the surface.
+        """
+        raise NotImplementedError
+
+    def surfacePoints(self, count: int = 400) -> list[tuple[float, ...]]:
+        """Sample points on the surface, used for visualization.
+
+        Args:
+            count (int, optional): Approximate number of points.
+                Defaults to 400.
+
+        Returns:
+            list[tuple[float, ...]]: The sampled points.
+        """
+        # fibonacci sphere around the primitive, projected onto it
+        i = np.arange(count) + 0.5
+        polar = np.arccos(1.0 - 2.0*i/count)
+        azimuth = np.pi * (1.0 + 5**0.5) * i
+        directions = np.stack([np.cos(azimuth)*np.sin(polar),
+                               np.sin(azimuth)*np.sin(polar),
+                               np.cos(polar)], axis=-1)
+        scale = 2.0 * self.boundingRadius
+        return [tuple(self.project(self.center + scale*d).tolist())
+                for d in directions]
+
+    def __repr__(self) -> str:
+        return self.__class__.__name__ + ":" + ";"\
+            .join([f"{key}={str(val)}" for key, val in self.__dict__.items()])
+
+
+class SpherePrimitive(SurfacePrimitive):
+    def __init__(self, center: Sequence[float], radius: float) -> None:
+        self.center = np.asarray(center, dtype=np.float64)
+        self.radius = float(radius)
+        self.boundingRadius = self.radius
+
+    def localSphere(self, hint: np.ndarray) -> tuple[np.ndarray, float]:
+        return self.center, self.radius
+
+    def project(self, point: np.ndarray) -> np.ndarray:
+        return self.center + self.radius * _direction(point - self.center)
+
+
+class CapsulePrimitive(SurfacePrimitive):
+    def __init__(self, start: Sequence[float], end: Sequence[float],
+                 radius: float) -> None:
+        self.start = np.asarray(start, dtype=np.float64)
+        self.end = np.asarray(end, dtype=np.float64)
+        self.radius = float(radius)
+        self.center = (self.start + self.end) / 2
+        self._axis = self.end - self.start
+        self._length = float(np.linalg.norm(self._axis))
+        if self._length > 0:
+            self._axis = self._axis / self._length
+        self.boundingRadius = self._length/2 + self.radius
+
+    def _axisPoint(self, point: np.ndarray) -> np.ndarray:
+        """Return the closest point on the capsule's center segment."""
+        t = np.clip(np.dot(point - self.start, self._axis),
+                    0.0, self._length)
+        return self.start + t*self._axis
+
+    def localSphere(self, hint: np.ndarray) -> tuple[np.ndarray, float]:
+        return self._axisPoint(hint), self.radius
+
+    def project(self, point: np.ndarray) -> np.ndarray:
+        axisPoint = self._axisPoint(point)
+        return axisPoint + self.radius * _direction(point - axisPoint)
+
+
+class EllipsoidPrimitive(SurfacePrimitive):
+    def __init__(self, center: Sequence[float], axes: np.ndarray,
+                 semiAxes: Sequence[float]) -> None:
+        """Create an ellipsoid.
+
+        Args:
+            center (Sequence[float]): The center point.
+            axes (np.ndarray): (3, 3) orthonormal axes as rows.
+            semiAxes (Sequence[float]): The semi-axis length per axis.
+        """
+        self.center = np.asarray(center, dtype=np.float64)
+        self.axes = np.asarray(axes, dtype=np.float64)
+        self.semiAxes = np.asarray(semiAxes, dtype=np.float64)
+        self.boundingRadius = float(self.semiAxes.max())
+
+    def localSphere(self, hint: np.ndarray) -> tuple[np.ndarray, float]:
+        # geometric mean keeps the volume of the ellipsoid
+        return self.center, float(np.prod(self.semiAxes)**(1/3))
+
+    def project(self, point: np.ndarray) -> np.ndarray:
+        # radial projection, scale the offset onto the surface
+        offset = _direction(point - self.center)
+        scale = np.linalg.norm((self.axes @ offset) / self.semiAxes)
+        return self.center + offset/scale
+
+
+def _direction(vector: np.ndarray) -> np.ndarray:
+    """Normalize a vector, falls back to +Y for zero length vectors."""
+    length = np.linalg.norm(vector)
+    if length < 1e-12:
+        return np.array([0.0, 1.0, 0.0])
+    return vector / length
+
+
+def fitPrimitive(shape: str,
+                 points: Sequence[Sequence[float]]) -> SurfacePrimitive:
+    """Fit a primitive to points that lie roughly on it's surface.
+
+    Args:
+        shape (str): "Sphere", "Capsule" or "Ellipsoid".
+        points (Sequence[Sequence[float]]): The receiver positions.
+
+    Raises:
+        ValueError: If the shape is unknown or no points are given.
+
+    Returns:
+        SurfacePrimitive: The fitted primitive.
+    """
+    if not len(points):
+        raise ValueError("Can't fit a surface without any points")
+    pts = np.asarray(points, dtype=np.float64)
+    centroid = pts.mean(axis=0)
+    # principal axes as rows, sorted by decreasing spread
+    axes = np.linalg.svd(pts - centroid)[2]
+
+    match shape:
+        case "Sphere":
+            # algebraic fit: |p|² = 2c·p + k, k = r² - |c|²
+            A = np.hstack([2*pts, np.ones((len(pts), 1))])
+            b = np.sum(pts**2, axis=1)
+            solution, _, rank, _ = np.linalg.lstsq(A, b, rcond=None)
+            if rank == 4:
+                center = solution[:3]
+                radius = np.sqrt(solution[3] + center @ center)
+            else:
+                logger.warning("Receivers are coplanar, sphere fit "
+                               "falls back to their centroid")
+                center = centroid
+                radius = np.linalg.norm(pts - centroid, axis=1).mean()
+            return SpherePrimitive(center, max(float(radius), 1e-3))
+        case "Capsule":
+            axis = axes[0]
+            t = (pts - centroid) @ axis
+            radial = (pts - centroid) - np.outer(t, axis)
+            radius = max(float(np.linalg.norm(radial, axis=1).mean()), 1e-3)
+            # the caps take up one radius on each end
+            halfLength = max((t.max()-t.min())/2 - radius, 0.0)
+            middle = centroid + (t.max()+t.min())/2*axis
+            return CapsulePrimitive(middle - halfLength*axis,
+                                    middle + halfLength*axis, radius)
+        case "Ellipsoid":
+            extent = np.abs((pts - centroid) @ axes.T).max(axis=0)
+            # flat point sets would give a degenerate ellipsoid
+            semiAxes = np.maximum(extent, extent.max()*0.1 + 1e-3)
+            return EllipsoidPrimitive(centroid, axes, semiAxes)
+    raise ValueError(f"Unknown surface shape '{shape}'")
+
+
+if __name__ == "__main__":
+    print("There is no point running this file directly")
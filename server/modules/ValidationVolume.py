@@ -0,0 +1,105 @@
+"""A precomputed voxel volume used to validate solved points.
+
+Typical usage example:
+
+    volume = VoxelValidationVolume([((0, 0, 0), 1.0), ((1, 0, 0), 0.5)])
+    if volume.contains((0.2, 0.1, 0.0)):
+        ...
+"""
+
+from typing import Sequence
+
+import numpy as np
+
+from utils.Logger import LoggerClass
+
+logger = LoggerClass.getSubLogger(__name__)
+
+
+class VoxelValidationVolume:
+    """An occupancy grid of the union of all anchor spheres.
+
+    The grid is computed once and checking a point afterwards is a
+    constant-time lookup, independent of the amount of anchors.
+    """
+
+    def __init__(self, spheres: Sequence[tuple[Sequence[float], float]],
+                 resolution: int = 32, inflation: float = 1.0) -> None:
+        """Build the occupancy grid.
+
+        Args:
+            spheres (Sequence[tuple[Sequence[float], float]]): The
+                (xyz, radius) of every anchor.
+            resolution (int, optional): Number of voxels along each
+                axis. Defaults to 32.
+            inflation (float, optional): Factor applied to every radius.
+                Defaults to 1.0.
+        """
+        isEmpty = not spheres
+        self._resolution = 1 if isEmpty else max(int(resolution), 1)
+        if isEmpty:
+            spheres = [((0.0, 0.0, 0.0), 0.0)]
+
+        centers = np.array([s[0] for s in spheres], dtype=np.float64)
+        radii = np.array([s[1] for s in spheres],
+                         dtype=np.float64) * inflation
+        self._min = (centers - radii[:, None]).min(axis=0)
+        extent = (centers + radii[:, None]).max(axis=0) - self._min
+        self._cellSize = np.maximum(extent, 1e-9) / self._resolution
+
+        # test every voxel center against every sphere
+        axes = [self._min[i] + (np.arange(self._resolution) + 0.5)
+                * self._cellSize[i] for i in range(3)]
+        voxels = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1)
+        distances = np.linalg.norm(
+            voxels[..., None, :] - centers, axis=-1)
+        self._grid = (distances <= radii).any(axis=-1) & (not isEmpty)
+
+        # a flat bytes object is the fastest thing to index from python
+        self._occupancy = self._grid.tobytes()
+        self._strideX = self._resolution * self._resolution
+        self._invCellSize = tuple(1.0 / self._cellSize)
+        self._origin = tuple(self._min)
+        logger.debug(f"Built validation volume with "
+                     f"{int(self._grid.sum())} occupied voxels")
+
+    def contains(self, point: Sequence[float]) -> bool:
+        """Check if a point lies inside the volume.
+
+        Args:
+            point (Sequence[float]): The xyz of the point.
+
+        Returns:
+            bool: True if the point is inside, otherwise False.
+        """
+        res = self._resolution
+        ix = int((point[0] - self._origin[0]) * self._invCellSize[0])
+        iy = int((point[1] - self._origin[1]) * self._invCellSize[1])
+        iz = int((point[2] - self._origin[2]) * self._invCellSize[2])
+        if not (0 <= ix < res and 0 <= iy < res and 0 <= iz < res):
+            return False
+        return bool(self._occupancy[ix*self._strideX + iy*res + iz])
+
+    def surfacePoints(self) -> list[tuple[float, float, float]]:
+        """Return the centers of all voxels on the volume's boundary.
+
+        Returns:
+            list[tuple[float, float, float]]: The voxel center points.
+        """
+        padded = np.pad(self._grid, 1)
+        interior = padded[1:-1, 1:-1, 1:-1].copy()
+        for axis in range(3):
+            for shift in (-1, 1):
+                interior &= np.roll(padded, shift, axis=axis)[1:-1, 1:-1, 1:-1]
+        surface = np.argwhere(self._grid & ~interior)
+        centers = self._min + (surface + 0.5) * self._cellSize
+        return [tuple(c) for c in centers.tolist()]
+
+    def __repr__(self) -> str:
+        return self.__class__.__name__ + ":" + ";"\
+            .join([f"{key}={str(val)}" for key, val in self.__dict__.items()
+                   if key not in ("_grid", "_occupancy")])
+
+
+if __name__ == "__main__":
+    print("There is no point running this file directly")
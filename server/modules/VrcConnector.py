@@ -1,27 +1,34 @@
-from datetime import datetime
-from time import time
+import socket
+from collections.abc import Callable
+from time import monotonic, time
 
-from PyQt6.QtCore import QObject, QThread, QTimer
+from PyQt6.QtCore import QObject
 from PyQt6.QtCore import pyqtSignal as QSignal
 from PyQt6.QtCore import pyqtSlot as QSlot
 from pythonosc import osc_packet
 from pythonosc.dispatcher import Dispatcher
 from pythonosc.osc_message_builder import ArgValue
-from pythonosc.osc_server import BlockingOSCUDPServer
 from pythonosc.udp_client import SimpleUDPClient
 
+from modules.DeadlineScheduler import LivenessWatch
 from modules.GlobalConfig import GlobalConfigSingleton
+from modules.NetworkReactor import NetworkReactor
 from utils.Logger import LoggerClass
-from utils.threadToStr import threadAsStr
 
 logger = LoggerClass.getSubLogger(__name__)
 config = GlobalConfigSingleton.getInstance()
 
 
 class IVrcConnector():
-    """The interface for server <-> vrc communication."""
+    """The interface for server <-> vrc communication.
 
-    onVrcContact = QSignal(float, str, list)
+    Attributes:
+        contactSink (Callable[[tuple[float, str, list]], None] | None):
+            Called from the network reactor with the timestamp, osc
+            path and parameters of every contact, must not block.
+    """
+
+    contactSink: Callable[[tuple[float, str, list]], None] | None = None
     onVrcConnectionStateChanged = QSignal(bool)
 
     def connect(self):
@@ -61,37 +68,28 @@ class VrcConnectionWorker(QObject):
         self._oscTxIp = config.get("program.vrcOscReceiveAddress", "127.0.0.1")
         self._oscTxPort = config.get("program.vrcOscReceivePort", 9001)
 
-    @QSlot()
     def startOscServer(self) -> None:
-        logger.debug(
-            f"startOsc pid     ={threadAsStr(QThread.currentThread())}")
-        logger.debug(
-            f"startOsc pid_self={threadAsStr(self.thread())}")
+        """Open the receive socket, it's served by the NetworkReactor."""
         logger.debug(f"Starting osc server on port {str(self._oscRxPort)}")
+        self._reactor = NetworkReactor.getInstance()
         try:
-            self._oscRx = BlockingOSCUDPServer(
-                ("", self._oscRxPort), self.dispatcher)
-            self._oscRx.serve_forever()
-        except Exception as E:
+            self._oscRx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._oscRx.bind(("", self._oscRxPort))
+            self._reactor.addSocket(
+                self._oscRx, self.dispatcher.call_handlers_for_packet,
+                "vrc rx")
+        except OSError as E:
             logger.exception(E)
-        logger.debug("startOsc done, cleaning up...")
-        self._oscRx.socket.close()
-        del self._oscRx  # dereferene so the gc can pick it up
+            self._oscRx.close()
+            del self._oscRx
 
-    @QSlot()
     def closeOscServer(self) -> None:
-        """Restarts the thread that is running us
-        self.thread returns the thread, but the thread is not the actual
-        thread but instead the thread's manager running in the main thread"""
+        """Stop receiving and close the socket."""
         logger.debug(f"closeOscServer in {__class__.__name__}")
-        selfThread = self.thread()
-        logger.debug(f"pid_QThread.currentThread={threadAsStr(QThread.currentThread())} "
-                     f"pid_selfThread={threadAsStr(selfThread)} ")
         if hasattr(self, "_oscRx"):
-            self._oscRx.shutdown()
-        if selfThread:
-            selfThread.quit()
-            selfThread.wait()
+            self._reactor.removeSocket(self._oscRx)
+            self._oscRx.close()
+            del self._oscRx  # dereferene so the gc can pick it up
 
     def startOscSender(self) -> None:
         self._oscTx = SimpleUDPClient(self._oscTxIp, self._oscTxPort)
@@ -107,20 +105,19 @@ class VrcConnectionWorker(QObject):
 
 
 class VrcConnectorImpl(IVrcConnector, QObject):
+    # seconds without any osc message until vrc counts as disconnected
+    DATA_TIMEOUT = 3.0
+    _dataReceived = QSignal()
+
     def __init__(self, *args, **kwargs) -> None:
         super().__init__()
-        self._lastVrcMessage: datetime | None = None
         self.currentDataState = False
+        # written by the network reactor, read by the watch
+        self._dataWatch = LivenessWatch(self.DATA_TIMEOUT,
+                                        self._setDataState)
+        self._dataReceived.connect(self._handleDataReceived)
         self.worker = VrcConnectionWorker(self)
         self.worker.loadSettings()
-        self.workerThread = QThread()
-
-        self.workerThread.started.connect(self.worker.startOscServer)
-        self.worker.moveToThread(self.workerThread)
-
-        self._timer = QTimer(self)
-        self._timer.timeout.connect(self._timerEvent)
-        self._timer.start(1000)
 
         config.configRootUpdateDone.connect(self._oscGeneralConfigChanged)
 
@@ -129,29 +126,24 @@ class VrcConnectorImpl(IVrcConnector, QObject):
         logger.info(f"osc from {str(client)}: addr={addr} msg={str(params)}")
 
     @QSlot()
-    def _timerEvent(self) -> None:
-        """Handle calculation of the connection to vrc based on if data
-        is beeing received (with a timeout).
+    def _handleDataReceived(self) -> None:
+        """The first message after a disconnect came in."""
+        self._dataWatch.seen(self._dataWatch.lastSeen)
+
+    def _setDataState(self, state: bool) -> None:
+        """Called by the data watch when data starts coming in and
+        exactly DATA_TIMEOUT after the last message.
         This is not used for the Contact Groups.
         """
-        # TODO: This could be improved to trigger instantly when data comes in
-        if not self.currentDataState and self._lastVrcMessage and \
-                (datetime.now() - self._lastVrcMessage).total_seconds() <= 3:
-            self.currentDataState = True
-            logger.debug("VRC connection state changed to "
-                         f"{self.currentDataState}")
-            self.onVrcConnectionStateChanged.emit(self.currentDataState)
-        elif self.currentDataState and self._lastVrcMessage and \
-                (datetime.now() - self._lastVrcMessage).total_seconds() > 3:
-            self.currentDataState = False
-            logger.debug("VRC connection state changed to "
-                         f"{self.currentDataState}")
-            self.onVrcConnectionStateChanged.emit(self.currentDataState)
+        self.currentDataState = state
+        logger.debug("VRC connection state changed to "
+                     f"{self.currentDataState}")
+        self.onVrcConnectionStateChanged.emit(self.currentDataState)
 
     def connect(self) -> None:
-        """Start worker thread and osc sender"""
+        """Start osc receiver and sender"""
         logger.debug("Starting vrc osc server and client")
-        self.workerThread.start()
+        self.worker.startOscServer()
         self.worker.startOscSender()
 
     def close(self) -> None:
@@ -159,8 +151,6 @@ class VrcConnectorImpl(IVrcConnector, QObject):
         logger.debug("Closing vrc osc server and client")
         self.worker.closeOscSender()
         self.worker.closeOscServer()
-        self.workerThread.quit()
-        self.workerThread.wait()
 
     def restart(self) -> None:
         """Close and restart sockets."""
@@ -224,31 +214,32 @@ class VrcOscDispatcher(Dispatcher):
                                  client_address: tuple[str, int]) -> None:
         """Handles incoming OSC packets.
 
-        Parses the incoming OSC packet and emits a signal if the message
-        address starts with "/avatar/parameters/". Logs a debug message
-        for each incoming OSC message and if the OSC packet could not
-        be parsed.
+        Parses the incoming OSC packet and hands the message to the
+        contact sink if the address starts with "/avatar/parameters/".
+        Logs an error if the OSC packet could not be parsed.
 
         Args:
             data (bytes): The incoming OSC packet data.
         """
         try:
             packet = osc_packet.OscPacket(data)
+            sink = self._connector.contactSink
             for msg in packet.messages:
                 if msg.message.address.startswith("/avatar/parameters/") \
-                        and msg.message.address[19:] in self.matchTopics:
+                        and msg.message.address[19:] in self.matchTopics \
+                        and sink:
                     # pid = threadAsStr(QThread.currentThread())
                     # logger.debug(
                     # f"pid={pid} incoming osc: "
                     # f"addr={msg.message.address} "
                     # f"msg={str(msg.message.params)}"
                     # )
-                    self._connector.onVrcContact.emit(
-                        time(),
-                        msg.message.address,
-                        msg.message.params
-                    )
-            self._connector._lastVrcMessage = datetime.now()
+                    sink((time(), msg.message.address, msg.message.params))
+            # only wake the main thread when the state changes
+            watch = self._connector._dataWatch
+            watch.lastSeen = monotonic()
+            if not watch.alive:
+                self._connector._dataReceived.emit()
         except osc_packet.ParseError:
             logger.error("Could not parse osc message")
 
@@ -0,0 +1,34 @@
+import pytest
+
+
+class TestBatchedMlat:
+    def test_solveBatch(self):
+        """Test that padded problems of different sizes are solved"""
+        import numpy as np
+
+        from modules.BatchedMlat import solveBatch
+        anchors = np.array([
+            [[0, 0, 0], [1, 0, 0], [0, 1, 0], [0, 0, 1]],
+            [[0, 0, 0], [2, 0, 0], [0, 2, 0], [0, 0, 0]],
+        ], dtype=np.float64)
+        mask = np.array([[True]*4, [True, True, True, False]])
+        targets = np.array([[0.3, 0.2, 0.1], [0.5, 0.7, 0.0]])
+        distances = np.linalg.norm(anchors - targets[:, None, :], axis=-1)
+        points, ok = solveBatch(anchors, distances, mask)
+        assert ok.all()
+        assert points[0] == pytest.approx(targets[0], abs=1e-6)
+        assert points[1][:2] == pytest.approx(targets[1][:2], abs=1e-6)
+
+    def test_motorSpeeds(self):
+        """Test the proportional and contact only speed modes"""
+        import numpy as np
+
+        from modules.BatchedMlat import motorSpeeds
+        points = np.zeros((2, 3))
+        motorPositions = np.array([[[0, 0, 0], [0.5, 0, 0]]] * 2,
+                                  dtype=np.float64)
+        radii = np.ones((2, 2))
+        speeds = motorSpeeds(points, motorPositions, radii,
+                             np.array([1.0, 0.5]), np.array([False, True]))
+        assert speeds[0] == pytest.approx([0.9, 0.5])
+        assert speeds[1] == pytest.approx([0.5, 0.5])
@@ -0,0 +1,86 @@
+import time
+
+import pytest
+
+
+class TestDeadlineScheduler:
+    @pytest.fixture()
+    def scheduler(self):
+        """Yield a scheduler of it's own, with a Qt application for the
+        timer"""
+        from PyQt6.QtCore import QCoreApplication
+
+        from modules.DeadlineScheduler import DeadlineScheduler
+        app = QCoreApplication.instance() or QCoreApplication([])
+        scheduler = DeadlineScheduler()
+        yield scheduler
+        scheduler.close()
+        app.processEvents()
+
+    @staticmethod
+    def processEventsUntil(condition, timeout=1.0):
+        from PyQt6.QtCore import QCoreApplication
+        endTime = time.monotonic() + timeout
+        while not condition() and time.monotonic() < endTime:
+            QCoreApplication.processEvents()
+
+    def test_runDue(self, scheduler):
+        """Test that due callbacks run in order and cancelled ones don't"""
+        ran = []
+        now = time.monotonic() + 100
+        scheduler.schedule(now + 2, lambda: ran.append(2))
+        scheduler.schedule(now + 1, lambda: ran.append(1))
+        cancelled = scheduler.schedule(now + 1, lambda: ran.append(0))
+        scheduler.schedule(now + 3, lambda: ran.append(3))
+        cancelled.cancel()
+        assert len(scheduler) == 3
+
+        assert scheduler.runDue(now + 2) == 2
+        assert ran == [1, 2]
+        assert len(scheduler) == 1
+
+    def test_manyDeadlines(self, scheduler):
+        """Test that rescheduling thousands of deadlines keeps the heap
+        small"""
+        now = time.monotonic() + 100
+        deadlines = [scheduler.schedule(now + i, lambda: None)
+                     for i in range(5000)]
+        for _ in range(2):
+            for i, deadline in enumerate(deadlines):
+                deadline.cancel()
+                deadlines[i] = scheduler.schedule(
+                    deadline.when + 0.5, lambda: None)
+        assert len(scheduler) == 5000
+        assert scheduler.runDue(now + 1000) == 1000
+        assert len(scheduler._heap) < 5000
+
+    def test_fireAtExpiry(self, scheduler):
+        """Test that the timer runs a deadline at it's expiry"""
+        firedAt = []
+        due = time.monotonic() + 0.05
+        scheduler.schedule(due, lambda: firedAt.append(time.monotonic()))
+        # an earlier one re-arms the timer
+        scheduler.schedule(due - 0.03, lambda: None)
+        self.processEventsUntil(lambda: firedAt)
+        assert firedAt and 0 <= firedAt[0] - due < 0.02
+
+    def test_livenessWatch(self, scheduler):
+        """Test that activity only keeps a watch alive for timeout"""
+        from modules.DeadlineScheduler import LivenessWatch
+        changes = []
+        watch = LivenessWatch(0.05, changes.append, scheduler)
+        watch.seen()
+        assert changes == [True] and watch.alive
+        startTime = watch.lastSeen
+        for _ in range(3):
+            time.sleep(0.02)
+            watch.seen()
+        # only one deadline is pending however often it's seen
+        assert len(scheduler) == 1
+        self.processEventsUntil(lambda: len(changes) == 2)
+        assert changes == [True, False]
+        assert time.monotonic() - startTime >= 0.11
+
+        watch.seen()
+        watch.close()
+        assert len(scheduler) == 0
@@ -0,0 +1,74 @@
+import threading
+import time
+
+
+class RecordingHandler:
+    """Stands in for the FileHelper, records every write"""
+
+    def __init__(self, fail=False):
+        self.writes = []
+        self.fail = fail
+        self.written = threading.Event()
+
+    def write(self, data):
+        self.writes.append((time.monotonic(), data))
+        self.written.set()
+        return not self.fail
+
+
+class TestConfigWriter:
+    def test_coalesce(self):
+        """Test that a burst of changes is written once after the
+        interval and the latest data is written"""
+        from modules.GlobalConfig import ConfigWriter
+        handler = RecordingHandler()
+        options = {"strength": 0}
+        writer = ConfigWriter(handler, lambda: dict(options), 50)
+        try:
+            for strength in range(1, 21):
+                options["strength"] = strength
+                writer.markDirty()
+            assert handler.written.wait(1)
+            handler.written.clear()
+            # the first write goes out right away, the next waits
+            options["strength"] = 21
+            startTime = time.monotonic()
+            writer.markDirty()
+            assert handler.written.wait(1)
+            assert handler.writes[-1][0] - handler.writes[0][0] >= 0.045
+            assert handler.writes[-1][0] - startTime > 0.01
+            assert handler.writes[-1][1] == {"strength": 21}
+            assert writer.flushCount == 2
+            assert writer.coalescedCount >= 19
+        finally:
+            assert writer.close()
+        # nothing was pending
+        assert writer.flushCount == 2
+
+    def test_close(self):
+        """Test that close writes pending changes and later changes are
+        written right away"""
+        from modules.GlobalConfig import ConfigWriter
+        handler = RecordingHandler()
+        writer = ConfigWriter(handler, lambda: {"a": 1}, 60000)
+        writer.markDirty()
+        assert handler.written.wait(1)
+        writer.markDirty()
+        assert len(handler.writes) == 1
+        assert writer.close()
+        assert len(handler.writes) == 2
+        writer.markDirty()
+        assert len(handler.writes) == 3
+
+    def test_failedWrite(self):
+        """Test that failed writes are counted and retried"""
+        from modules.GlobalConfig import ConfigWriter
+        handler = RecordingHandler(fail=True)
+        writer = ConfigWriter(handler, lambda: {}, 10)
+        writer.markDirty()
+        time.sleep(0.1)
+        assert writer.failedCount >= 2
+        handler.fail = False
+        # the failed change is still pending
+        assert writer.close()
+        assert writer.flushCount == writer.failedCount + 1
@@ -0,0 +1,178 @@
+class TestDeviceMacIndex:
+    @staticmethod
+    def devicesConfig(count):
+        """An "esps" config with count devices"""
+        return {f"esp{i}": {
+            "id": i,
+            "wifiMac": "02:50:50:{:02X}:{:02X}:{:02X}".format(
+                (i >> 16) & 0xFF, (i >> 8) & 0xFF, i & 0xFF)
+        } for i in range(count)}
+
+    def test_lookup(self):
+        """Test that every mac of several hundred devices finds it's id"""
+        from modules.HwManager import DeviceMacIndex
+        devices = self.devicesConfig(500)
+        index = DeviceMacIndex()
+        index.rebuild(devices)
+        assert len(index) == 500
+        for device in devices.values():
+            assert index.idForMac(device["wifiMac"]) == device["id"]
+        assert index.idForMac("AA:AA:AA:AA:AA:AA") is None
+
+    def test_rebuild(self):
+        """Test that removed and changed devices are updated"""
+        from modules.HwManager import DeviceMacIndex
+        devices = self.devicesConfig(300)
+        index = DeviceMacIndex()
+        index.rebuild(devices)
+        removedMac = devices.pop("esp7")["wifiMac"]
+        devices["esp8"]["wifiMac"] = "AA:AA:AA:AA:AA:AA"
+        index.rebuild(devices)
+        assert index.idForMac(removedMac) is None
+        assert index.idForMac("AA:AA:AA:AA:AA:AA") == 8
+        assert len(index) == 299
+        index.rebuild(None)
+        assert len(index) == 0
+
+
+class TestHwOscDiscoveryTx:
+    def test_backoff(self, monkeypatch):
+        """Test that the interval doubles while complete, up to the max,
+        and that a lost device resets it and sends right away"""
+        import time
+
+        from modules.HwManager import HwOscDiscoveryTx
+        from modules.NetworkReactor import NetworkReactor
+        scans = []
+        monkeypatch.setattr(HwOscDiscoveryTx, "scanInterfaces",
+                            staticmethod(lambda: scans.append(1) or {}))
+        # not started, so the calls run right away on this thread
+        reactor = NetworkReactor()
+        discovery = HwOscDiscoveryTx(reactor)
+
+        def scheduledIn():
+            return round(discovery._call.when - time.monotonic())
+        discovery._start(3)
+        try:
+            discovery._setComplete(True)
+            intervals = []
+            for _ in range(7):
+                discovery._sendRound()
+                intervals.append(scheduledIn())
+            assert intervals == [3, 6, 12, 24, 48, 60, 60]
+            assert sum(call.active for _, _, call in reactor._timers) == 1
+
+            rounds = len(scans)
+            discovery._setComplete(False)
+            assert len(scans) == rounds + 1
+            assert scheduledIn() == 3
+        finally:
+            discovery.stop()
+            reactor.close()
+
+    def test_scanInterfaces(self):
+        """Test that only ipv4 broadcast capable interfaces are found"""
+        from ipaddress import IPv4Address
+
+        from modules.HwManager import HwOscDiscoveryTx
+        for address, broadcast in HwOscDiscoveryTx.scanInterfaces().items():
+            assert not IPv4Address(address).is_loopback
+            assert IPv4Address(broadcast) >= IPv4Address(address)
+
+
+class TestHwOscReconnectProbe:
+    def test_probe(self, monkeypatch):
+        """Test that new targets are probed right away from the port the
+        devices reply to - 1 and an empty list stops probing"""
+        import socket
+
+        from pythonosc.osc_message import OscMessage
+
+        from modules.HwManager import HwOscDiscoveryTx, HwOscReconnectProbe
+        from modules.NetworkReactor import NetworkReactor
+        device = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        device.bind(("127.0.0.1", 0))
+        device.settimeout(1)
+        monkeypatch.setattr(HwOscDiscoveryTx, "DEVICE_PORT",
+                            device.getsockname()[1])
+        reactor = NetworkReactor()
+        reactor.start()
+        probe = HwOscReconnectProbe(reactor)
+        try:
+            probe.setTargets(["127.0.0.1", ""])
+            data, addr = device.recvfrom(1024)
+            assert OscMessage(data).address == "/patpatpat/discover"
+            assert addr[1] == HwOscDiscoveryTx.SOURCE_PORT
+            # known targets wait for the next round
+            probe.setTargets(["127.0.0.1"])
+            reactor.callAndWait(lambda: None)
+            assert probe.sentCount == 1 and probe._call.active
+            probe.setTargets([])
+            reactor.callAndWait(lambda: None)
+            assert probe._call is None
+        finally:
+            probe.stop()
+            reactor.close()
+            device.close()
+
+
+class TestHwOutputWorker:
+    def test_callSoon(self):
+        """Test that queued calls run on the reactor thread in order"""
+        import threading
+
+        from modules.HwManager import HwOutputWorker
+        from modules.NetworkReactor import NetworkReactor
+        reactor = NetworkReactor()
+        reactor.start()
+        worker = HwOutputWorker(reactor)
+        calls = []
+        done = threading.Event()
+        try:
+            for i in range(3):
+                worker.callSoon(lambda i=i: calls.append(
+                    (i, threading.current_thread().name)))
+            worker.callSoon(done.set)
+            assert done.wait(1)
+            assert calls == [(i, "NetworkReactor") for i in range(3)]
+        finally:
+            worker.stop()
+            reactor.close()
+
+    def test_pings(self):
+        """Test that the pings are sent from the reactor thread at the
+        set interval and stop with the worker"""
+        import threading
+        import time
+
+        from modules.HwManager import HwOutputWorker
+        from modules.NetworkReactor import NetworkReactor
+
+        class Device:
+            def __init__(self):
+                self.threads = []
+                self.pinged = threading.Event()
+
+            def sendPing(self):
+                self.threads.append(threading.current_thread().name)
+                if len(self.threads) == 3:
+                    self.pinged.set()
+
+        reactor = NetworkReactor()
+        reactor.start()
+        worker = HwOutputWorker(reactor)
+        device = Device()
+        try:
+            worker.setDevices({1: device})
+            worker.setPingInterval(10)
+            worker.start()
+            assert device.pinged.wait(1)
+            worker.setPingInterval(0)
+            reactor.callAndWait(lambda: None)
+            pings = len(device.threads)
+            time.sleep(0.03)
+            assert len(device.threads) == pings
+            assert set(device.threads) == {"NetworkReactor"}
+        finally:
+            worker.stop()
+            reactor.close()
@@ -0,0 +1,63 @@
+import pytest
+
+
+class TestLinkTelemetry:
+    # device clock minus server clock
+    OFFSET_NS = 123_456_789_000
+
+    def exchange(self, telemetry, sentNs, upNs, downNs,
+                 received=0, missed=0):
+        """Ping at sentNs, the device answers after upNs, the pong
+        arrives downNs later"""
+        seq = telemetry.nextPing(sentNs)
+        deviceUs = (sentNs + upNs + self.OFFSET_NS) // 1000
+        return telemetry.processPong(seq, deviceUs & 0xFFFFFFFF, received,
+                                     missed, sentNs + upNs + downNs)
+
+    def test_offsetAndLatency(self):
+        """Test that the fastest exchange gives the clock offset and the
+        one-way time is estimated with it"""
+        from modules.LinkTelemetry import LinkTelemetry
+        telemetry = LinkTelemetry()
+        now = 10**12
+        # a symmetric 1ms/1ms exchange, then slow ones on the way down
+        self.exchange(telemetry, now, 1_000_000, 1_000_000)
+        for i in range(1, 5):
+            stats = self.exchange(telemetry, now + i * 10**8,
+                                  1_000_000, 5_000_000)
+        assert telemetry.clockOffsetNs() == pytest.approx(
+            self.OFFSET_NS, abs=1000)
+        assert stats.rttMs == pytest.approx((2 + 4*6) / 5)
+        assert stats.oneWayMs == pytest.approx(1, abs=0.01)
+        assert stats.jitterMs > 0
+        assert stats.loss is None
+
+    def test_loss(self):
+        """Test that loss is taken from the counter deltas of the window
+        and restarts with the device"""
+        from modules.LinkTelemetry import LinkTelemetry
+        telemetry = LinkTelemetry()
+        now = 10**12
+        self.exchange(telemetry, now, 1000, 1000, 1000, 50)
+        stats = self.exchange(telemetry, now + 10**8, 1000, 1000, 1090, 60)
+        assert stats.loss == pytest.approx(0.1)
+        # the counters went back, the device restarted
+        stats = self.exchange(telemetry, now + 2 * 10**8, 1000, 1000, 5, 0)
+        assert stats.samples == 1 and stats.loss is None
+
+    def test_unmatchedAndWrap(self):
+        """Test that unknown pongs are ignored and the device clock is
+        unwrapped"""
+        from modules.LinkTelemetry import LinkTelemetry
+        telemetry = LinkTelemetry()
+        assert telemetry.processPong(42, 0, 0, 0, 0) is None
+        # the 32 bit micros() wrap after ~71.6 minutes
+        now = (1 << 32) * 1000 - self.OFFSET_NS - 5 * 10**8
+        for i in range(10):
+            stats = self.exchange(telemetry, now + i * 10**8,
+                                  1_000_000, 1_000_000)
+        assert stats.oneWayMs == pytest.approx(1, abs=0.01)
+        assert stats.rttMs == pytest.approx(2)
+        for _ in range(LinkTelemetry.MAX_PENDING + 2):
+            telemetry.nextPing(now)
+        assert telemetry.lostPings == 2
@@ -10,12 +10,14 @@ class TestLoggerClass:
         except Exception:
             assert False
 
-    def test_gettingRootLogger(self):
+    def test_gettingRootLogger(self, tmp_path):
         """Tests that we get a valid Logger object"""
         import logging
 
         from utils.Logger import LoggerClass
-        assert isinstance(LoggerClass.getRootLogger(), logging.Logger)
+        # the log file of the test run stays out of the repo
+        assert isinstance(LoggerClass.getRootLogger(
+            filename=(tmp_path / "test.log").as_posix()), logging.Logger)
 
     def test_gettingSubLogger(self):
         """Tests that we get a valid Logger object"""
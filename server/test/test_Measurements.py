@@ -0,0 +1,42 @@
+import pytest
+
+
+class TestMeasurementStage:
+    @pytest.fixture()
+    def stage(self):
+        from modules.Measurements import MeasurementStage
+        stage = MeasurementStage()
+        stage.register("a")
+        stage.register("b")
+        yield stage
+
+    def test_register(self, stage):
+        """Test that slots are stable and shared per receiver"""
+        assert stage.register("a") == stage.indexOf("a") == 0
+        assert stage.indexOf("b") == 1
+        assert len(stage) == 2
+
+    def test_snapshot(self, stage):
+        """Test that snapshots are immutable and consistent"""
+        from dataclasses import FrozenInstanceError
+        assert stage.write("a", 10.0, 0.7)
+        assert not stage.write("unknown", 10.0, 0.1)
+        snapshot = stage.snapshot(10.2)
+        assert snapshot.ts == 10.2
+        assert snapshot.values == (0.7, 0.0)
+        assert snapshot.ages[0] == pytest.approx(0.2)
+        assert snapshot.ages[1] == pytest.approx(10.2)
+
+        stage.write("a", 10.3, 0.1)
+        assert snapshot.values[0] == 0.7
+        with pytest.raises(FrozenInstanceError):
+            snapshot.ts = 0
+
+    def test_slotReuse(self, stage):
+        """Test that freed slots are reset and reused"""
+        stage.write("a", 10.0, 0.7)
+        stage.unregister("a")
+        with pytest.raises(KeyError):
+            stage.indexOf("a")
+        assert stage.register("c") == 0
+        assert stage.snapshot(10.0).values[0] == 0.0
@@ -0,0 +1,44 @@
+class TestMotorFrame:
+    def test_roundtrip(self):
+        """Test that encoded frames decode to the same values"""
+        from modules.MotorFrame import MotorFrameEncoder, decodeFrame
+        encoder = MotorFrameEncoder(4)
+
+        frame = encoder.encode([0, 1, 128, 255])
+        assert len(frame) == 5 + 4
+        assert decodeFrame(frame) == (1, (0, 1, 128, 255))
+
+        """Values above 255 switch to uint16"""
+        frame = encoder.encode([0, 1, 256, 4095])
+        assert len(frame) == 5 + 8
+        assert decodeFrame(frame) == (2, (0, 1, 256, 4095))
+
+    def test_invalid(self):
+        """Test that foreign or truncated datagrams are rejected"""
+        from modules.MotorFrame import MotorFrameEncoder, decodeFrame
+        frame = bytes(MotorFrameEncoder(2).encode([1, 2]))
+        assert decodeFrame(frame[:-1]) is None
+        assert decodeFrame(b"/m\x00\x00,ii\x00") is None
+        assert decodeFrame(b"") is None
+
+    def test_sequenceFilter(self):
+        """Test that old frames are dropped, also across the wraparound"""
+        from modules.MotorFrame import SequenceFilter
+        seqFilter = SequenceFilter()
+        assert seqFilter.accept(10)
+        assert seqFilter.accept(11)
+        assert not seqFilter.accept(11)
+        assert not seqFilter.accept(9)
+        assert seqFilter.accept(0x7000)
+        assert seqFilter.accept(0xC000)
+        assert seqFilter.accept(0xFFFF)
+        assert seqFilter.accept(0)
+        assert not seqFilter.accept(0xFFFE)
+        assert seqFilter.dropped == 3
+        # the skipped numbers in between the accepted frames
+        assert seqFilter.received == 6
+        assert seqFilter.missed == (0x7000 - 12) + (0xC000 - 0x7001) \
+            + (0xFFFF - 0xC001)
+
+        seqFilter.reset()
+        assert seqFilter.accept(5)
@@ -0,0 +1,153 @@
+import socket
+import threading
+
+import pytest
+
+
+class TestNetworkReactor:
+    @pytest.fixture()
+    def reactor(self):
+        """Yield a started reactor of it's own"""
+        from modules.NetworkReactor import NetworkReactor
+        reactor = NetworkReactor()
+        reactor.start()
+        yield reactor
+        reactor.close()
+
+    @staticmethod
+    def boundSocket():
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind(("127.0.0.1", 0))
+        return sock
+
+    def test_receive(self, reactor):
+        """Test that the datagrams of several sockets reach their handler
+        on the reactor thread and are counted"""
+        received = {"a": [], "b": []}
+        threads = set()
+        done = threading.Event()
+
+        def handler(name):
+            def handle(data, addr):
+                threads.add(threading.current_thread().name)
+                received[name].append(data)
+                if sum(map(len, received.values())) == 30:
+                    done.set()
+            return handle
+
+        sockets = {name: self.boundSocket() for name in received}
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            for name, sock in sockets.items():
+                reactor.addSocket(sock, handler(name), name)
+            for i in range(15):
+                for sock in sockets.values():
+                    sender.sendto(bytes([i]), sock.getsockname())
+            assert done.wait(2)
+            assert received["a"] == [bytes([i]) for i in range(15)]
+            assert threads == {"NetworkReactor"}
+            stats = reactor.stats[sockets["b"]]
+            assert stats.name == "b" and stats.datagrams == 15 \
+                and stats.bytes == 15
+
+            # nothing is delivered once removed
+            reactor.removeSocket(sockets["a"])
+            sender.sendto(b"x", sockets["a"].getsockname())
+            sender.sendto(b"y", sockets["b"].getsockname())
+            ran = threading.Event()
+            reactor.callSoon(ran.set)
+            assert ran.wait(2)
+            assert received["a"][-1] == bytes([14])
+        finally:
+            sender.close()
+            for sock in sockets.values():
+                reactor.removeSocket(sock)
+                sock.close()
+
+    def test_handlerError(self, reactor):
+        """Test that a failing handler doesn't stop the reactor"""
+        received = threading.Event()
+
+        def handle(data, addr):
+            if data == b"fail":
+                raise ValueError(data)
+            received.set()
+
+        sock = self.boundSocket()
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            reactor.addSocket(sock, handle)
+            sender.sendto(b"fail", sock.getsockname())
+            sender.sendto(b"ok", sock.getsockname())
+            assert received.wait(2)
+        finally:
+            sender.close()
+            reactor.removeSocket(sock)
+            sock.close()
+
+    def test_callLater(self, reactor):
+        """Test that timed calls run in order on the reactor thread and
+        cancelled ones don't run"""
+        import time
+        calls = []
+        done = threading.Event()
+
+        def record(name):
+            return lambda: calls.append(
+                (name, threading.current_thread().name, time.monotonic()))
+
+        startTime = time.monotonic()
+        reactor.callLater(0.03, record("c"))
+        reactor.callLater(0.01, record("a"))
+        reactor.callLater(0.02, record("b")).cancel()
+        reactor.callLater(0.02, record("b2"))
+        reactor.callLater(0.04, done.set)
+        assert done.wait(2)
+        assert [name for name, _, _ in calls] == ["a", "b2", "c"]
+        assert {thread for _, thread, _ in calls} == {"NetworkReactor"}
+        assert calls[0][2] - startTime >= 0.01
+        assert reactor.callCount >= 4
+
+    def test_callAndWait(self, reactor):
+        """Test that callAndWait returns after the call ran on the
+        reactor thread"""
+        threads = []
+        reactor.callAndWait(
+            lambda: threads.append(threading.current_thread().name))
+        assert threads == ["NetworkReactor"]
+
+    def test_flood(self, reactor):
+        """Test that timers still fire while a socket is saturated"""
+        import time
+        stop = threading.Event()
+        received = threading.Event()
+
+        def handle(data, addr):
+            received.set()
+            # slower than the sender
+            time.sleep(0.0005)
+
+        sock = self.boundSocket()
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+        def flood():
+            deadline = time.monotonic() + 2
+            while not stop.is_set() and time.monotonic() < deadline:
+                sender.sendto(b"x" * 100, sock.getsockname())
+
+        flooder = threading.Thread(target=flood, daemon=True)
+        try:
+            reactor.addSocket(sock, handle)
+            flooder.start()
+            assert received.wait(1)
+            fired = threading.Event()
+            startTime = time.monotonic()
+            reactor.callLater(0.01, fired.set)
+            assert fired.wait(0.5)
+            assert time.monotonic() - startTime < 0.2
+        finally:
+            stop.set()
+            flooder.join()
+            sender.close()
+            reactor.removeSocket(sock)
+            sock.close()
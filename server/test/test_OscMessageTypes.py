@@ -85,3 +85,17 @@ class TestOscMessageTypes:
         """Test if object is mutable"""
         with pytest.raises(FrozenInstanceError):
             m.numMotors = 123
+
+
+class TestPreEncodedIntMessage:
+    def test_update(self):
+        """Test that the patched datagram matches pythonosc's encoding"""
+        from pythonosc.osc_message_builder import OscMessageBuilder
+
+        from modules.OscMessageTypes import PreEncodedIntMessage
+        message = PreEncodedIntMessage("/m", 3)
+        for values in ([0, 0, 0], [1, 255, 4095]):
+            builder = OscMessageBuilder("/m")
+            for value in values:
+                builder.add_arg(value)
+            assert message.update(values) == builder.build().dgram
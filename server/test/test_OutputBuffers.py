@@ -0,0 +1,47 @@
+class TestOutputBufferPool:
+    def test_commit(self):
+        """Test that only written buffers are committed"""
+        from modules.OutputBuffers import OutputBufferPool
+        pool = OutputBufferPool()
+        buffer = pool.bind(0, 2)
+        assert pool.bind(0, 0) is buffer
+        pool.bind(1, 0)
+        assert buffer.values == [0, 0, 0]
+
+        buffer.values[2] = 150
+        buffer.dirty = True
+        frames = pool.commit()
+        assert len(frames) == 1
+        assert frames[0].hwId == 0 and frames[0].channels == (0, 2)
+        assert frames[0].values == (0, 0, 150)
+        assert pool.commit() == ()
+
+    def test_unbind(self):
+        """Test that released channels are zeroed exactly once"""
+        from modules.OutputBuffers import OutputBufferPool
+        pool = OutputBufferPool()
+        buffer = pool.bind(0, 1)
+        pool.bind(0, 1)
+        buffer.values[1] = 200
+        pool.unbind(0, 1)
+        assert buffer.channels == (1,) and buffer.values[1] == 200
+
+        pool.unbind(0, 1)
+        frames = pool.commit()
+        assert frames[0].channels == (1,) and frames[0].values == (0, 0)
+        buffer.dirty = True
+        assert pool.commit()[0].channels == ()
+
+    def test_priority(self):
+        """Test that a buffer takes the highest priority of it's channels"""
+        from modules.OutputBuffers import OutputBufferPool
+        pool = OutputBufferPool()
+        buffer = pool.bind(0, 0)
+        pool.bind(0, 1, 1)
+        assert buffer.priority == 1
+
+        buffer.dirty = True
+        assert pool.commit()[0].priority == 1
+        pool.unbind(0, 1, 1)
+        assert buffer.priority == 0
+        assert pool.commit()[0].priority == 0
@@ -0,0 +1,94 @@
+MS = 1_000_000
+
+
+class TestOutputEnvelope:
+    def test_instant(self):
+        """Test that channels without envelope pass their targets through"""
+        from modules.OutputBuffers import OutputFrame
+        from modules.OutputEnvelope import OutputEnvelope
+        envelope = OutputEnvelope()
+        envelope.setTargets(OutputFrame(0, (1,), (0, 200)))
+        envelope.advance(0)
+        pinStates = [7, 7]
+        envelope.write(0, pinStates)
+        assert pinStates == [7, 200]
+        assert envelope.settled
+
+    def test_attackRelease(self):
+        """Test that ramps take the configured time over the full range"""
+        from modules.OutputBuffers import EnvelopeSettings, OutputFrame
+        from modules.OutputEnvelope import OutputEnvelope
+        settings = (EnvelopeSettings(100, 50, 0, 0, 200),)
+        envelope = OutputEnvelope()
+        envelope.advance(0)
+        envelope.setTargets(OutputFrame(3, (0,), (200,), 0, settings))
+        pinStates = [0]
+
+        envelope.advance(50 * MS)
+        envelope.write(3, pinStates)
+        assert abs(pinStates[0] - 100) <= 1 and not envelope.settled
+        envelope.advance(100 * MS)
+        envelope.write(3, pinStates)
+        assert pinStates[0] == 200 and envelope.settled
+
+        envelope.setTargets(OutputFrame(3, (0,), (0,), 0, settings))
+        envelope.advance(125 * MS)
+        envelope.write(3, pinStates)
+        assert abs(pinStates[0] - 100) <= 1
+        envelope.advance(150 * MS)
+        envelope.write(3, pinStates)
+        assert pinStates[0] == 0
+
+    def test_minPwm(self):
+        """Test that rises jump to minPwm and values below it are 0"""
+        from modules.OutputBuffers import EnvelopeSettings, OutputFrame
+        from modules.OutputEnvelope import OutputEnvelope
+        settings = (EnvelopeSettings(1000, 1000, 0, 70, 255),)
+        envelope = OutputEnvelope()
+        envelope.advance(0)
+        envelope.setTargets(OutputFrame(0, (0,), (255,), 0, settings))
+        pinStates = [0]
+        envelope.advance(1)
+        envelope.write(0, pinStates)
+        assert pinStates[0] == 70
+
+        envelope.setTargets(OutputFrame(0, (0,), (0,), 0, settings))
+        envelope.advance(10 * MS)
+        envelope.write(0, pinStates)
+        assert pinStates[0] == 0
+
+    def test_retain(self):
+        """Test that removed devices keep the others' state"""
+        from modules.OutputBuffers import OutputFrame
+        from modules.OutputEnvelope import OutputEnvelope
+        envelope = OutputEnvelope()
+        envelope.setTargets(OutputFrame(0, (0,), (10,)))
+        envelope.setTargets(OutputFrame(1, (0, 1), (20, 30)))
+        envelope.advance(0)
+        envelope.retain({1})
+        pinStates = [0, 0]
+        envelope.write(0, pinStates)
+        assert pinStates == [0, 0]
+        envelope.write(1, pinStates)
+        assert pinStates == [20, 30]
+
+    def test_grow(self):
+        """Test that a device gaining channels keeps it's state and the
+        new channels start at 0 instead of the next device's state"""
+        from modules.OutputBuffers import EnvelopeSettings, OutputFrame
+        from modules.OutputEnvelope import OutputEnvelope
+        slow = EnvelopeSettings(1000, 1000, 0, 0, 200)
+        envelope = OutputEnvelope()
+        envelope.setTargets(OutputFrame(0, (0,), (10,)))
+        envelope.setTargets(OutputFrame(1, (0,), (50,)))
+        envelope.setTargets(OutputFrame(2, (0, 1), (200, 150)))
+        envelope.advance(0)
+
+        envelope.setTargets(OutputFrame(1, (0, 1), (50, 0), 0,
+                                        (slow, slow)))
+        envelope.advance(1)
+        pinStates = [0, 0]
+        envelope.write(1, pinStates)
+        assert pinStates == [50, 0]
+        envelope.write(2, pinStates)
+        assert pinStates == [200, 150]
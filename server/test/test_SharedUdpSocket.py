@@ -0,0 +1,48 @@
+import socket
+
+import pytest
+
+
+class TestSharedUdpSocket:
+    @pytest.fixture()
+    def receiver(self):
+        """Yield a bound loopback socket to send to"""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.bind(("127.0.0.1", 0))
+        sock.settimeout(1)
+        yield sock
+        sock.close()
+
+    def test_queueFlush(self, receiver):
+        """Test that queued datagrams are sent on flush, as they are
+        when flushed"""
+        from modules.SharedUdpSocket import SharedUdpSocket
+        sender = SharedUdpSocket.getInstance()
+        assert SharedUdpSocket.getInstance() is sender
+
+        first = bytearray(b"first")
+        sender.queue(first, receiver.getsockname())
+        sender.queue(b"second", receiver.getsockname())
+        # not copied, the buffer is sent as it is at the flush
+        first[:] = b"FIRST"
+        assert sender.flush() == 2
+        assert sender.flush() == 0
+        assert receiver.recv(100) == b"FIRST"
+        assert receiver.recv(100) == b"second"
+
+        sender.close()
+        assert SharedUdpSocket.getInstance() is not sender
+        SharedUdpSocket.getInstance().close()
+
+    def test_errorCount(self, receiver):
+        """Test that failed sends are counted per destination"""
+        from modules.SharedUdpSocket import SharedUdpSocket
+        sender = SharedUdpSocket.getInstance()
+        # broadcasts are not allowed without SO_BROADCAST
+        broadcast = ("255.255.255.255", 8888)
+        assert not sender.sendto(b"x", broadcast)
+        assert not sender.sendto(b"x", broadcast)
+        assert sender.sendto(b"x", receiver.getsockname())
+        assert sender.errorCount(broadcast) == 2
+        assert sender.errorCount(receiver.getsockname()) == 0
+        sender.close()
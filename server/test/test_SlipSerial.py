@@ -0,0 +1,108 @@
+import os
+import sys
+import time
+
+import pytest
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32",
+                                reason="needs a pseudo-terminal")
+
+
+class TestSlipSerialCommunicationAdapter:
+    @pytest.fixture()
+    def pty(self):
+        """Yield the master fd and the port name of a pseudo-terminal
+        standing in for the device"""
+        import tty
+        master, slave = os.openpty()
+        tty.setraw(slave)
+        yield master, os.ttyname(slave)
+        os.close(slave)
+        os.close(master)
+
+    @staticmethod
+    def readPackets(fd, count):
+        """Read from the device side until count slip packets arrived"""
+        from pythonosc import slip
+        buffer = b""
+        endTime = time.monotonic() + 2
+        while buffer.count(slip.END) < 2*count \
+                and time.monotonic() < endTime:
+            buffer += os.read(fd, 1024)
+        return [slip.decode(slip.END + packet + slip.END)
+                for packet in buffer.split(slip.END) if packet]
+
+    @staticmethod
+    def waitFor(received, count):
+        from PyQt6.QtCore import QCoreApplication
+        app = QCoreApplication.instance() or QCoreApplication([])
+        endTime = time.monotonic() + 2
+        while len(received) < count and time.monotonic() < endTime:
+            app.processEvents()
+            time.sleep(0.01)
+
+    def test_sendReceive(self, pty):
+        """Test the discovery on open, motor values and heartbeats"""
+        from array import array
+
+        from pythonosc import slip
+        from pythonosc.osc_message import OscMessage
+        from pythonosc.osc_message_builder import OscMessageBuilder
+
+        from modules.HardwareDevice import SlipSerialCommunicationAdapterImpl
+        master, port = pty
+        adapter = SlipSerialCommunicationAdapterImpl()
+        heartbeats = []
+        responses = []
+        adapter.heartbeat.connect(heartbeats.append)
+        adapter.discoveryResponse.connect(responses.append)
+        adapter.setup({"serialPort": port, "numMotors": 3})
+        try:
+            packets = self.readPackets(master, 1)
+            assert OscMessage(packets[0]).address == "/patpatpat/discover"
+
+            adapter.sendPinValues(array("H", [0, 0xC0, 0xDB]))
+            msg = OscMessage(self.readPackets(master, 1)[0])
+            assert msg.address == "/m" and msg.params == [0, 0xC0, 0xDB]
+
+            reply = OscMessageBuilder("/patpatpat/noticeme/senpai")
+            for arg in ["AA:BB:CC:DD:EE:FF", "ppp-serial", 3, 1]:
+                reply.add_arg(arg)
+            heartbeat = OscMessageBuilder("/patpatpat/heartbeat")
+            for arg in ["AA:BB:CC:DD:EE:FF", 12, 4.2, 0]:
+                heartbeat.add_arg(arg)
+            # debug output in between must not break the framing
+            os.write(master, b"Sent discovery reply\r\n"
+                     + slip.encode(reply.build().dgram)
+                     + slip.encode(heartbeat.build().dgram))
+            self.waitFor(heartbeats, 1)
+            assert responses[0].mac == "AA:BB:CC:DD:EE:FF"
+            assert responses[0].sourceAddr == port
+            assert heartbeats[0].uptime == 12
+            assert heartbeats[0].sourceAddr == port
+            assert adapter.invalidCount == 1
+        finally:
+            adapter.close()
+
+    def test_coalesce(self, pty):
+        """Test that only the latest unwritten motor values are kept"""
+        from array import array
+
+        from pythonosc.osc_message import OscMessage
+
+        from modules.HardwareDevice import SlipSerialCommunicationAdapterImpl
+        master, port = pty
+        adapter = SlipSerialCommunicationAdapterImpl()
+        adapter.setup({"serialPort": port})
+        try:
+            # wait for the discovery, the port is open after it
+            self.readPackets(master, 1)
+            # hold the writer, so the values pile up
+            with adapter._pending:
+                for value in range(5):
+                    adapter.sendPinValues(array("H", [value]))
+            msg = OscMessage(self.readPackets(master, 1)[0])
+            assert msg.params == [4]
+            assert adapter.coalescedCount == 4
+        finally:
+            adapter.close()
@@ -0,0 +1,42 @@
+import pytest
+
+
+class TestSolverResultCache:
+    @pytest.fixture()
+    def cache(self):
+        from modules.SolverCache import SolverResultCache
+        yield SolverResultCache(resolution=0.1, maxSize=2)
+
+    def test_hitAndMiss(self, cache):
+        """Test that quantized measurements hit and counters update"""
+        assert cache.get((0.5, 0.2)) is None
+        cache.put((0.5, 0.2), "result")
+        assert cache.get((0.51, 0.19)) == "result"
+        assert cache.hits == 1 and cache.misses == 1
+        assert cache.hitRate == 0.5
+
+    def test_lruEviction(self, cache):
+        """Test that the least recently used entry is dropped"""
+        cache.put((0.1,), "a")
+        cache.put((0.2,), "b")
+        cache.get((0.1,))
+        cache.put((0.3,), "c")
+        assert len(cache) == 2
+        assert cache.get((0.2,)) is None
+        assert cache.get((0.1,)) == "a"
+
+    def test_invalidation(self, cache):
+        """Test that clear and configure drop all entries"""
+        cache.put((0.1,), "a")
+        cache.clear()
+        assert cache.get((0.1,)) is None
+        cache.put((0.1,), "a")
+        cache.configure(0.2, 2)
+        assert not len(cache)
+
+    def test_disabled(self):
+        """Test that a resolution of 0 disables caching"""
+        from modules.SolverCache import SolverResultCache
+        cache = SolverResultCache(resolution=0)
+        cache.put((0.1,), "a")
+        assert cache.get((0.1,)) is None and cache.misses == 0
@@ -0,0 +1,32 @@
+import pytest
+
+
+class TestSurfacePrimitives:
+    def test_fitSphere(self):
+        """Test that points on a sphere give back that sphere"""
+        import numpy as np
+
+        from modules.SurfacePrimitives import fitPrimitive
+        points = [(1, 0, 0), (-1, 0, 0), (0, 1, 0), (0, 0, 1), (0, 0, -1)]
+        surface = fitPrimitive("Sphere", np.array(points) + (1, 2, 3))
+        assert surface.center == pytest.approx((1, 2, 3))
+        assert surface.radius == pytest.approx(1.0)
+        assert surface.project(np.array([1.0, 2.0, 10.0])) \
+            == pytest.approx((1, 2, 4))
+
+    def test_projectOnSurface(self):
+        """Test that every shape projects points onto it's surface"""
+        import numpy as np
+
+        from modules.SurfacePrimitives import fitPrimitive
+        rng = np.random.default_rng(0)
+        points = rng.normal(size=(20, 3)) * (0.5, 2.0, 0.5)
+        for shape in ("Sphere", "Capsule", "Ellipsoid"):
+            surface = fitPrimitive(shape, points)
+            for point in rng.normal(size=(10, 3)):
+                projected = surface.project(point)
+                # projecting a second time must not move the point
+                assert surface.project(projected) == pytest.approx(projected)
+
+        with pytest.raises(ValueError):
+            fitPrimitive("Cube", points)
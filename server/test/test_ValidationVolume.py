@@ -0,0 +1,31 @@
+import pytest
+
+
+class TestVoxelValidationVolume:
+    @pytest.fixture()
+    def volume(self):
+        from modules.ValidationVolume import VoxelValidationVolume
+        yield VoxelValidationVolume([((0, 0, 0), 1.0), ((2, 0, 0), 0.5)],
+                                    resolution=40)
+
+    def test_contains(self, volume):
+        """Test points inside and outside of the anchor spheres"""
+        assert volume.contains((0, 0, 0))
+        assert volume.contains((0.5, 0.5, 0))
+        assert volume.contains((2.2, 0, 0))
+        assert not volume.contains((1.2, 0.8, 0))
+        assert not volume.contains((5, 5, 5))
+        assert not volume.contains((-2, 0, 0))
+
+    def test_surfacePoints(self, volume):
+        """Test that the surface points lie near the sphere shells"""
+        points = volume.surfacePoints()
+        assert points
+        assert all(volume.contains(p) for p in points)
+
+    def test_empty(self):
+        """Test that an empty volume contains nothing"""
+        from modules.ValidationVolume import VoxelValidationVolume
+        volume = VoxelValidationVolume([])
+        assert not volume.contains((0, 0, 0))
+        assert volume.surfacePoints() == []
@@ -0,0 +1,306 @@
+# type: ignore
+# a simulator for patpatpat hardware devices, so the server can be tested
+# without real boards
+# help for command line options are available via -h
+# every virtual device behaves like firmware/src/main.cpp: it answers
+# discovery requests, sends heartbeats while it receives data, applies
+# /m osc messages and binary motor frames and stops all motors after
+# 1000ms without a packet
+# each device listens on port 8888 of it's own loopback address
+# (127.0.0.2, 127.0.0.3, ...). discovery broadcasts don't reach loopback
+# addresses, so unconnected devices announce themselves to the server
+# every 3 seconds instead, just like they would reply to a discovery
+# hundreds of devices can run in one process, the arrival time of every
+# motor frame is recorded (time.perf_counter_ns) and summarized as
+# arrival interval jitter on exit. tools/hwLoadTest.py uses this to
+# load-test the HwManager
+# link telemetry pings are answered with a pong carrying a device clock
+# that is offset from the server's, --loss drops a share of the binary
+# frames so the server's loss estimate can be checked
+
+import logging
+import random
+import selectors
+import socket
+import statistics
+import sys
+import time
+from argparse import ArgumentParser
+from ipaddress import IPv4Address
+from pathlib import Path
+
+from pythonosc.osc_message import OscMessage
+from pythonosc.osc_message_builder import OscMessageBuilder
+
+# make the server modules importable when started from anywhere
+SERVER_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SERVER_DIR))
+
+from modules.MotorFrame import (CAP_BINARY_FRAMES, FRAME_MAGIC,  # noqa: E402
+                                SequenceFilter, decodeFrame)
+
+DEVICE_PORT = 8888
+SERVER_PORT = 8872
+HEARTBEAT_INTERVAL = 3.997
+ANNOUNCE_INTERVAL = 3.0
+IDLE_CUTOFF = 1.0
+POLL_INTERVAL = 0.01
+
+# setup command line argument parser
+parser = ArgumentParser(prog="deviceSimulator",
+                        description="Simulate patpatpat hardware devices")
+parser.add_argument("-n", "--devices", required=False, type=int, default=1,
+                    help="Number of virtual devices")
+parser.add_argument("-m", "--motors", required=False, type=int, default=4,
+                    help="Number of motors per device")
+parser.add_argument("-s", "--server", required=False, type=str,
+                    default="127.0.0.1", help="The ip of the server")
+parser.add_argument("--firstIp", required=False, type=str,
+                    default="127.0.0.2",
+                    help="The loopback address of the first device")
+parser.add_argument("--osc", required=False, action="store_true",
+                    help="Don't advertise binary frame support")
+parser.add_argument("--loss", required=False, type=float, default=0.0,
+                    help="Share of binary frames every device drops")
+parser.add_argument("-t", "--timeout", required=False, type=int, default=0,
+                    help="Stop after this many seconds (0 = run forever)")
+parser.add_argument("-v", "--verbose", required=False, action="store_true",
+                    help="Log every received frame and per device stats")
+
+
+def simulatedMac(index: int) -> str:
+    """The locally administered mac of the index-th virtual device."""
+    return "02:50:50:{:02X}:{:02X}:{:02X}".format(
+        (index >> 16) & 0xFF, (index >> 8) & 0xFF, index & 0xFF)
+
+
+class VirtualDevice:
+    """A single simulated hardware device."""
+
+    def __init__(self, index: int, ip: str, numMotors: int,
+                 serverIp: str, binaryFrames: bool = True,
+                 loss: float = 0.0) -> None:
+        self.index = index
+        self.ip = ip
+        self.mac = simulatedMac(index)
+        self.hostname = f"sim-{index:06x}"
+        self.capabilities = CAP_BINARY_FRAMES if binaryFrames else 0
+        self.motors = [0] * numMotors
+        self.server = (serverIp, SERVER_PORT)
+
+        self.startTime = time.monotonic()
+        self.lastPacketRecv = 0.0
+        self.lastHeartbeatSent = 0.0
+        self.lastAnnounce = 0.0
+        self.hasConnection = False
+        self.sequence = SequenceFilter()
+        self.loss = loss
+        self._random = random.Random(index)
+        # micros() starts at boot, not in sync with the server
+        self.clockOffsetUs = self._random.randrange(1 << 32)
+        self.frames = 0
+        self.cutoffs = 0
+        # perf_counter_ns and first motor value of every applied frame
+        self.arrivals: list[int] = []
+        self.marks: list[int] = []
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.sock.bind((ip, DEVICE_PORT))
+
+    def handleDatagram(self, data: bytes, addr: tuple, now: float,
+                       arrivalNs: int = 0) -> None:
+        """Handle a received datagram like the firmware's loop() does."""
+        if data[:1] == bytes((FRAME_MAGIC,)):
+            if (frame := decodeFrame(data)) is None \
+                    or self._random.random() < self.loss:
+                return
+            seq, values = frame
+            if not self.sequence.accept(seq):
+                logging.debug(f"{self.hostname} dropped frame {seq}")
+                return
+            self._applyMotors(values, now, arrivalNs)
+            return
+
+        try:
+            msg = OscMessage(data)
+        except Exception:
+            logging.warning(f"{self.hostname} received invalid osc message")
+            return
+        self.lastPacketRecv = now
+        if msg.address == "/m":
+            self._applyMotors(msg.params, now, arrivalNs)
+        elif msg.address == "/patpatpat/discover":
+            if not self.hasConnection:
+                # the firmware replies to port + 1 of the sender
+                self.server = (addr[0], addr[1] + 1)
+                self.sendDiscoveryReply(now)
+        elif msg.address == "/patpatpat/ping" and msg.params:
+            self.sendPong(msg.params[0])
+
+    def _applyMotors(self, values: tuple, now: float,
+                     arrivalNs: int) -> None:
+        for i, value in enumerate(values[:len(self.motors)]):
+            self.motors[i] = value
+        self.lastPacketRecv = now
+        self.hasConnection = True
+        self.frames += 1
+        self.arrivals.append(arrivalNs)
+        self.marks.append(values[0] if values else 0)
+        logging.debug(f"{self.hostname} motors={self.motors}")
+
+    def sendDiscoveryReply(self, now: float) -> None:
+        builder = OscMessageBuilder("/patpatpat/noticeme/senpai")
+        builder.add_arg(self.mac)
+        builder.add_arg(self.hostname)
+        builder.add_arg(len(self.motors))
+        builder.add_arg(self.capabilities)
+        self.sock.sendto(builder.build().dgram, self.server)
+        self.lastAnnounce = now
+        self.sendHeartbeat(now)
+
+    def sendHeartbeat(self, now: float) -> None:
+        builder = OscMessageBuilder("/patpatpat/heartbeat")
+        builder.add_arg(self.mac)
+        builder.add_arg(int(now - self.startTime))
+        builder.add_arg(4.2)
+        builder.add_arg(-40)
+        self.sock.sendto(builder.build().dgram, self.server)
+        self.lastHeartbeatSent = now
+
+    def sendPong(self, seq: int) -> None:
+        micros = (time.perf_counter_ns() // 1000 + self.clockOffsetUs) \
+            & 0xFFFFFFFF
+        builder = OscMessageBuilder("/patpatpat/pong")
+        builder.add_arg(self.mac)
+        builder.add_arg(seq)
+        # sent as int32, like the firmware's cast
+        builder.add_arg(micros - (1 << 32) if micros >= 1 << 31 else micros)
+        builder.add_arg(self.sequence.received)
+        builder.add_arg(self.sequence.missed)
+        self.sock.sendto(builder.build().dgram, self.server)
+
+    def poll(self, now: float) -> None:
+        """Run the time based parts of the firmware's loop()."""
+        if self.hasConnection \
+                and now - self.lastHeartbeatSent >= HEARTBEAT_INTERVAL:
+            self.sendHeartbeat(now)
+        if self.hasConnection and now - self.lastPacketRecv > IDLE_CUTOFF:
+            self.hasConnection = False
+            self.sequence.reset()
+            self.motors = [0] * len(self.motors)
+            self.cutoffs += 1
+            logging.info(f"{self.hostname} idle cutoff, motors stopped")
+        if not self.hasConnection \
+                and now - self.lastAnnounce >= ANNOUNCE_INTERVAL:
+            self.sendDiscoveryReply(now)
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+def intervalStats(arrivals: list[int]) -> dict[str, float] | None:
+    """Summarize the intervals between frame arrivals in ms.
+
+    Args:
+        arrivals (list[int]): perf_counter_ns of every frame.
+
+    Returns:
+        dict[str, float] | None: mean, stdev (the jitter), p99 and max
+            of the intervals or None with less than 3 frames.
+    """
+    if len(arrivals) < 3:
+        return None
+    intervals = sorted((b - a) / 1e6 for a, b in zip(arrivals, arrivals[1:]))
+    return {
+        "mean": statistics.fmean(intervals),
+        "stdev": statistics.stdev(intervals),
+        "p99": intervals[int(0.99 * (len(intervals)-1))],
+        "max": intervals[-1]
+    }
+
+
+class Simulator:
+    """Runs many VirtualDevices in a single thread."""
+
+    def __init__(self, devices: list[VirtualDevice]) -> None:
+        self.devices = devices
+        self._running = False
+        self._selector = selectors.DefaultSelector()
+        for device in devices:
+            self._selector.register(device.sock, selectors.EVENT_READ, device)
+
+    def run(self, timeout: float = 0) -> None:
+        """Process packets until timeout seconds passed (0 = forever) or
+        stop() was called. Can be run in it's own thread."""
+        endTime = time.monotonic() + timeout if timeout else float("inf")
+        lastPoll = 0.0
+        self._running = True
+        while self._running and (now := time.monotonic()) < endTime:
+            for key, _ in self._selector.select(POLL_INTERVAL):
+                device = key.data
+                try:
+                    while True:
+                        data, addr = device.sock.recvfrom(2048)
+                        arrivalNs = time.perf_counter_ns()
+                        device.handleDatagram(data, addr, time.monotonic(),
+                                              arrivalNs)
+                except (BlockingIOError, ConnectionResetError):
+                    pass
+            # with hundreds of devices polling on every packet adds up
+            if now - lastPoll >= POLL_INTERVAL:
+                lastPoll = now
+                for device in self.devices:
+                    device.poll(now)
+
+    def stop(self) -> None:
+        """Make run() return, thread safe."""
+        self._running = False
+
+    def close(self) -> None:
+        self._selector.close()
+        for device in self.devices:
+            device.close()
+
+
+def main() -> None:
+    args = parser.parse_args()
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO)
+
+    firstIp = IPv4Address(args.firstIp)
+    devices = [VirtualDevice(i, str(firstIp + i), args.motors,
+                             args.server, not args.osc, args.loss)
+               for i in range(args.devices)]
+    logging.info(f"Started {len(devices)} devices on "
+                 f"{devices[0].ip}-{devices[-1].ip}:{DEVICE_PORT}")
+    simulator = Simulator(devices)
+    try:
+        simulator.run(args.timeout)
+    except KeyboardInterrupt:
+        logging.info("Starting shutdown")
+    finally:
+        stats = []
+        for device in devices:
+            stats.append(intervalStats(device.arrivals))
+            logging.debug(f"{device.hostname} frames={device.frames} "
+                          f"dropped={device.sequence.dropped} "
+                          f"cutoffs={device.cutoffs} interval={stats[-1]}")
+        stats = [s for s in stats if s]
+        logging.info(
+            f"{sum(d.frames for d in devices)} frames, "
+            f"{sum(d.sequence.dropped for d in devices)} dropped, "
+            f"{sum(d.cutoffs for d in devices)} idle cutoffs")
+        if stats:
+            logging.info(
+                "interval mean={:.2f}ms jitter mean={:.3f}ms "
+                "worst={:.3f}ms p99 max={:.2f}ms".format(
+                    statistics.fmean(s["mean"] for s in stats),
+                    statistics.fmean(s["stdev"] for s in stats),
+                    max(s["stdev"] for s in stats),
+                    max(s["p99"] for s in stats)))
+        simulator.close()
+
+
+if __name__ == "__main__":
+    main()
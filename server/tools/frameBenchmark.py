@@ -0,0 +1,73 @@
+# type: ignore
+# a utility to compare the motor frame encodings
+# help for command line options are available via -h
+# run it from the server directory: python tools/frameBenchmark.py
+# for a range of channel counts it reports the bytes on air per frame
+# (udp payload + ip/udp headers) and the encode time of the old pythonosc
+# path, the pre-encoded osc message and the binary motor frame
+
+import random
+import sys
+import timeit
+from argparse import ArgumentParser
+from array import array
+from pathlib import Path
+
+# make the server modules importable when started from anywhere
+SERVER_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SERVER_DIR))
+
+from modules.MotorFrame import MotorFrameEncoder  # noqa: E402
+from modules.OscMessageTypes import PreEncodedIntMessage  # noqa: E402
+
+# ipv4 + udp header
+UDP_OVERHEAD = 28
+
+# setup command line argument parser
+parser = ArgumentParser(prog="frameBenchmark",
+                        description="Compare OSC and binary motor frames")
+parser.add_argument("-c", "--channels", required=False, type=int,
+                    nargs="+", default=[2, 4, 7, 16, 32],
+                    help="The channel counts to test")
+parser.add_argument("--maxPwm", required=False, type=int, default=255,
+                    help="Max random pwm value, >255 forces uint16 frames")
+parser.add_argument("-n", "--iterations", required=False, type=int,
+                    default=20000, help="Encodes per measurement")
+
+
+def oscBuilderEncode(values) -> bytes:
+    """The encoding SimpleUDPClient.send_message("/m", ...) did."""
+    from pythonosc.osc_message_builder import OscMessageBuilder
+    builder = OscMessageBuilder("/m")
+    for value in values:
+        builder.add_arg(value)
+    return builder.build().dgram
+
+
+def main() -> None:
+    args = parser.parse_args()
+    rnd = random.Random(1)
+
+    print(f"{'channels':>8} {'osc bytes':>10} {'frame bytes':>12} "
+          f"{'builder us':>11} {'pre-enc us':>11} {'frame us':>9}")
+    for channels in args.channels:
+        values = array("H", [rnd.randint(0, args.maxPwm)
+                             for _ in range(channels)])
+        message = PreEncodedIntMessage("/m", channels)
+        encoder = MotorFrameEncoder(channels)
+
+        oscBytes = len(message.update(values)) + UDP_OVERHEAD
+        frameBytes = len(encoder.encode(values)) + UDP_OVERHEAD
+        assert bytes(message.update(values)) == oscBuilderEncode(values)
+
+        timings = [timeit.timeit(func, number=args.iterations)
+                   / args.iterations * 1e6 for func in (
+                       lambda: oscBuilderEncode(values),
+                       lambda: message.update(values),
+                       lambda: encoder.encode(values))]
+        print(f"{channels:>8} {oscBytes:>10} {frameBytes:>12} "
+              f"{timings[0]:>11.2f} {timings[1]:>11.2f} {timings[2]:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+# type: ignore
+# a utility to load-test the HwManager with many simulated hardware devices
+# help for command line options are available via -h
+# run it from the server directory: python tools/hwLoadTest.py -n 200
+# a temporary config with n devices on 127.0.0.2, 127.0.0.3, ... is
+# created and the devices are simulated by tools/deviceSimulator.py in a
+# second thread. Once all devices are connected, frames are posted to the
+# HwOutputWorker at the main tick rate just like the ContactGroupManager
+# does. Channel 0 carries the tick counter, so every arrival can be matched
+# to the tick it was posted in to get the end-to-end latency, the missed
+# frames and the jitter of the arrival intervals per device
+# with --pacing the sends are spread over a part of the tick, --priority
+# marks the last devices as high priority, their latency is shown apart
+# with --telemetry the devices are pinged and the server's link estimates
+# are shown, --loss makes the simulated devices drop binary frames
+# the loopback addresses other than 127.0.0.1 only work on linux
+
+import json
+import logging
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from argparse import ArgumentParser
+from bisect import bisect_right
+from ipaddress import IPv4Address
+from pathlib import Path
+
+# make the server modules importable when started from anywhere
+SERVER_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SERVER_DIR))
+
+from deviceSimulator import (Simulator, VirtualDevice,  # noqa: E402
+                             intervalStats, simulatedMac)
+
+# the tick counter is sent modulo this, so frames stay 8 bit
+MARK_MODULO = 256
+
+# setup command line argument parser
+parser = ArgumentParser(prog="hwLoadTest",
+                        description="Load-test the HwManager with "
+                        "simulated hardware devices")
+parser.add_argument("-c", "--config", required=False, type=str,
+                    default=str(SERVER_DIR / "config.conf"),
+                    help="The config file to take the program settings from")
+parser.add_argument("-n", "--devices", required=False, type=int,
+                    default=100, help="Number of simulated devices")
+parser.add_argument("-m", "--motors", required=False, type=int, default=4,
+                    help="Number of motors per device")
+parser.add_argument("-r", "--rate", required=False, type=int, default=0,
+                    help="Ticks per second (0 = program.mainTps)")
+parser.add_argument("-d", "--duration", required=False, type=float,
+                    default=10, help="Measurement duration in seconds")
+parser.add_argument("--firstIp", required=False, type=str,
+                    default="127.0.0.2",
+                    help="The loopback address of the first device")
+parser.add_argument("--osc", required=False, action="store_true",
+                    help="Send OSC /m messages instead of binary frames")
+parser.add_argument("--pacing", required=False, type=int, default=0,
+                    help="Spread the sends over this percentage of the tick")
+parser.add_argument("--priority", required=False, type=int, default=0,
+                    help="Number of devices (from the end) with high priority")
+parser.add_argument("--telemetry", required=False, type=int, default=0,
+                    help="Ping the devices at this interval in ms")
+parser.add_argument("--loss", required=False, type=float, default=0.0,
+                    help="Share of binary frames every device drops")
+parser.add_argument("-o", "--output", required=False, type=str,
+                    help="Store the results as json in this file")
+
+
+def createConfig(args, workDir: Path) -> Path:
+    """Write a copy of the config with only the simulated devices."""
+    options = json.loads(Path(args.config).read_text())
+    options["program"]["enableOscDiscovery"] = False
+    options["program"]["hwPacingPercent"] = args.pacing
+    options["program"]["hwTelemetryIntervalMs"] = args.telemetry
+    firstIp = IPv4Address(args.firstIp)
+    options["esps"] = {}
+    for i in range(args.devices):
+        options["esps"][f"esp{i}"] = {
+            "id": i,
+            "name": f"sim-{i:06x}",
+            "connectionType": "OSC",
+            "lastIp": str(firstIp + i),
+            "wifiMac": simulatedMac(i),
+            "serialPort": "",
+            "numMotors": args.motors,
+            "binaryFrames": not args.osc
+        }
+    configFile = workDir / "config.conf"
+    configFile.write_text(json.dumps(options, indent=4))
+    return configFile
+
+
+def percentile(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[int(pct * (len(values)-1))]
+
+
+def latencyStats(latencies: list[float]) -> dict[str, float] | None:
+    if not latencies:
+        return None
+    return {
+        "mean": statistics.fmean(latencies),
+        "p50": percentile(latencies, 0.5),
+        "p99": percentile(latencies, 0.99),
+        "max": max(latencies)
+    }
+
+
+def analyze(devices: list[VirtualDevice], postNs: list[int],
+            firstTick: int, numPriority: int) -> dict:
+    """Match every arrival to the tick it was posted in.
+
+    Args:
+        devices (list[VirtualDevice]): The simulated devices.
+        postNs (list[int]): perf_counter_ns of every posted tick.
+        firstTick (int): The first tick of the measurement.
+        numPriority (int): The number of high priority devices at the end.
+
+    Returns:
+        dict: The summarized results.
+    """
+    latencies = []
+    priorityLatencies = []
+    intervals = []
+    received = 0
+    for i, device in enumerate(devices):
+        isPriority = i >= len(devices) - numPriority
+        arrivals = []
+        for arrivalNs, mark in zip(device.arrivals, device.marks):
+            # the latest tick with this mark posted before the arrival
+            last = bisect_right(postNs, arrivalNs) - 1
+            tick = last - (last - mark) % MARK_MODULO
+            if tick < firstTick:
+                continue
+            latency = (arrivalNs - postNs[tick]) / 1e6
+            (priorityLatencies if isPriority else latencies).append(latency)
+            arrivals.append(arrivalNs)
+        received += len(arrivals)
+        if stats := intervalStats(arrivals):
+            intervals.append(stats)
+
+    expected = (len(postNs) - firstTick) * len(devices)
+    tickIntervals = [(b - a) / 1e6 for a, b
+                     in zip(postNs[firstTick:], postNs[firstTick+1:])]
+    return {
+        "expected": expected,
+        "received": received,
+        "missed": 1 - received / expected if expected else 0,
+        "latency": latencyStats(latencies),
+        "priorityLatency": latencyStats(priorityLatencies),
+        "interval": {
+            "mean": statistics.fmean(s["mean"] for s in intervals),
+            "jitter": statistics.fmean(s["stdev"] for s in intervals),
+            "worstJitter": max(s["stdev"] for s in intervals),
+            "p99": max(s["p99"] for s in intervals)
+        } if intervals else None,
+        "tickJitter": statistics.stdev(tickIntervals)
+        if len(tickIntervals) > 1 else 0
+    }
+
+
+def printResults(args, results: dict) -> None:
+    print(f"{args.devices} devices, {args.motors} motors, {results['rate']}Hz,"
+          f" {args.duration}s, {'osc' if args.osc else 'binary frames'}, "
+          f"pacing {args.pacing}%")
+    print(f"connected {results['connected']}/{args.devices} devices "
+          f"in {results['connectTime']:.2f}s")
+    print(f"received {results['received']}/{results['expected']} frames "
+          f"({results['missed']:.2%} missed)")
+    if latency := results["latency"]:
+        print("latency post->arrival  mean={mean:.3f}ms p50={p50:.3f}ms "
+              "p99={p99:.3f}ms max={max:.3f}ms".format(**latency))
+    if latency := results["priorityLatency"]:
+        print("  high priority        mean={mean:.3f}ms p50={p50:.3f}ms "
+              "p99={p99:.3f}ms max={max:.3f}ms".format(**latency))
+    if interval := results["interval"]:
+        print("arrival interval       mean={mean:.3f}ms jitter={jitter:.3f}ms "
+              "worst jitter={worstJitter:.3f}ms p99={p99:.3f}ms"
+              .format(**interval))
+    print(f"tick timer jitter      {results['tickJitter']:.3f}ms")
+    if workerLatency := results["workerLatency"]:
+        print("output worker latency  mean={:.3f}ms max={:.3f}ms".format(
+            statistics.fmean(m for m, _ in workerLatency),
+            max(m for _, m in workerLatency)))
+    if link := results["link"]:
+        print("link telemetry         rtt={rttMs:.3f}ms jitter={jitterMs:.3f}ms "
+              "one-way={oneWayMs:.3f}ms loss={loss:.2%} "
+              "({devices} devices)".format(**link))
+
+
+def main() -> None:
+    args = parser.parse_args()
+
+    # work on a copy so the real config is never written to
+    workDir = Path(tempfile.mkdtemp(prefix="hwLoadTest"))
+    configFile = createConfig(args, workDir)
+
+    from PyQt6.QtCore import QCoreApplication, Qt, QTimer
+
+    from modules.GlobalConfig import GlobalConfigSingleton
+    config = GlobalConfigSingleton.fromFile(configFile.as_posix())
+    from modules.HwManager import HwManager
+    from modules.OutputBuffers import OutputFrame
+
+    # the per device debug logging would skew the timings
+    for l in [logging.getLogger(name)
+              for name in logging.root.manager.loggerDict]:
+        l.setLevel(logging.WARNING)
+
+    rate = args.rate or config.get("program.mainTps", 50)
+    firstIp = IPv4Address(args.firstIp)
+    devices = [VirtualDevice(i, str(firstIp + i), args.motors, "127.0.0.1",
+                             not args.osc, args.loss)
+               for i in range(args.devices)]
+    simulator = Simulator(devices)
+    simThread = threading.Thread(target=simulator.run, daemon=True)
+
+    app = QCoreApplication(sys.argv)
+    hwManager = HwManager()
+    hwManager.createAllHardwareDevicesFromConfig()
+    workerLatency = []
+    hwManager.sendLatencyChanged.connect(
+        lambda mean, maximum: workerLatency.append((mean, maximum)))
+    # the latest estimate per device
+    linkStats = {}
+    for hwId, device in hwManager.hardwareDevices.items():
+        device.uiLinkStatsChanged.connect(
+            lambda stats, hwId=hwId: linkStats.__setitem__(hwId, stats))
+
+    channels = tuple(range(args.motors))
+    postNs: list[int] = []
+    state = {"firstTick": 0, "startTime": time.monotonic(), "connected": 0}
+
+    firstPriority = args.devices - args.priority
+
+    def tick() -> None:
+        tickId = len(postNs)
+        frames = tuple(
+            OutputFrame(hwId, channels, tuple(
+                (tickId + c) % MARK_MODULO for c in channels),
+                int(hwId >= firstPriority))
+            for hwId in hwManager.hardwareDevices)
+        tickEndNs = time.perf_counter_ns()
+        postNs.append(tickEndNs)
+        hwManager.outputWorker.post(frames, tickEndNs)
+
+    tickTimer = QTimer()
+    tickTimer.setTimerType(Qt.TimerType.PreciseTimer)
+    tickTimer.timeout.connect(tick)
+
+    def stopMeasurement() -> None:
+        tickTimer.stop()
+        # give the last packets some time to arrive
+        QTimer.singleShot(300, app.quit)
+
+    def waitForDevices() -> None:
+        connected = sum(d.currentConnectionState
+                        for d in hwManager.hardwareDevices.values())
+        elapsed = time.monotonic() - state["startTime"]
+        if connected < args.devices and elapsed < 10:
+            QTimer.singleShot(50, waitForDevices)
+            return
+        state["connected"] = connected
+        state["connectTime"] = elapsed
+        # one second warmup, measured from the tick after it
+        QTimer.singleShot(
+            1000, lambda: state.update(firstTick=len(postNs)))
+        QTimer.singleShot(int((1 + args.duration) * 1000), stopMeasurement)
+        tickTimer.start(int(1000 / rate))
+
+    simThread.start()
+    QTimer.singleShot(0, waitForDevices)
+    try:
+        app.exec()
+    finally:
+        tickTimer.stop()
+        simulator.stop()
+        simThread.join()
+        hwManager.close()
+        simulator.close()
+        config.close()
+
+    results = analyze(devices, postNs, state["firstTick"], args.priority)
+    measured = [s for s in linkStats.values() if s.samples]
+    results["link"] = {
+        "rttMs": statistics.fmean(s.rttMs for s in measured),
+        "jitterMs": statistics.fmean(s.jitterMs for s in measured),
+        "oneWayMs": statistics.fmean(s.oneWayMs for s in measured),
+        "loss": statistics.fmean(s.loss or 0 for s in measured),
+        "devices": len(measured)
+    } if measured else None
+    results.update(rate=rate, connected=state["connected"],
+                   connectTime=state["connectTime"],
+                   workerLatency=workerLatency)
+    printResults(args, results)
+
+    if args.output:
+        results.update(devices=args.devices, motors=args.motors,
+                       duration=args.duration, osc=args.osc,
+                       pacing=args.pacing, priority=args.priority,
+                       telemetry=args.telemetry, loss=args.loss)
+        Path(args.output).write_text(json.dumps(results, indent=4))
+        print(f"Results written to {args.output}")
+
+    shutil.rmtree(workDir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
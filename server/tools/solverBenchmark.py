@@ -0,0 +1,348 @@
+# type: ignore
+# a utility to benchmark the accuracy and speed of all solvers
+# help for command line options are available via -h
+# run it from the server directory: python tools/solverBenchmark.py
+# synthetic touches are generated around the motors of a group from the
+# config file and turned into simulated contact receiver values with
+# optional noise and dropouts. Every solver from the SolverFactory then
+# solves the same touches and the results are stored as json so runs
+# from different versions can be compared with --compare
+# with --batch the tick time of the per-group and the batched MLAT path
+# is measured for an increasing number of copies of the group instead
+
+import json
+import logging
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from datetime import datetime
+from math import dist
+from pathlib import Path
+
+# make the server modules importable when started from anywhere
+SERVER_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(SERVER_DIR))
+
+# setup command line argument parser
+parser = ArgumentParser(prog="solverBenchmark",
+                        description="Benchmark all solvers against "
+                        "synthetic ground-truth contacts")
+parser.add_argument("-c", "--config", required=False, type=str,
+                    default=str(SERVER_DIR / "config.conf"),
+                    help="The config file to read the group geometry from")
+parser.add_argument("-g", "--group", required=False, type=str,
+                    default="group0", help="The key of the group to use")
+parser.add_argument("-n", "--samples", required=False, type=int,
+                    default=1000, help="Number of synthetic touches")
+parser.add_argument("--noise", required=False, type=float, default=0.0,
+                    help="Std deviation of the noise added to each "
+                    "receiver value (0-1 scale)")
+parser.add_argument("--dropout", required=False, type=float, default=0.0,
+                    help="Probability (0-1) that a receiver update is lost")
+parser.add_argument("--seed", required=False, type=int, default=1,
+                    help="Random seed for reproducible runs")
+parser.add_argument("--cache", required=False, action="store_true",
+                    help="Keep the solver result cache enabled")
+parser.add_argument("-o", "--output", required=False, type=str,
+                    default="", help="Write the results to this json file")
+parser.add_argument("--compare", required=False, type=str, default="",
+                    help="A previous result json file to compare against")
+parser.add_argument("--batch", required=False, action="store_true",
+                    help="Measure tick time vs number of MLAT groups for "
+                    "the per-group and the batched solving path")
+parser.add_argument("--maxGroups", required=False, type=int, default=32,
+                    help="Max number of MLAT groups for --batch")
+
+
+def gitRevision() -> str:
+    """Return the current git revision or an empty string."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              cwd=SERVER_DIR, capture_output=True,
+                              text=True, timeout=5).stdout.strip()
+    except Exception:
+        return ""
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Return the nearest-rank percentile of a list of values."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered)*pct/100), len(ordered)-1)]
+
+
+def summarize(values: list[float]) -> dict:
+    """Mean, median and p95 of a list of values."""
+    if not values:
+        return {"mean": None, "median": None, "p95": None}
+    return {"mean": statistics.fmean(values),
+            "median": statistics.median(values),
+            "p95": percentile(values, 95)}
+
+
+def expectedSpeed(touch: tuple, motor, strength: float,
+                  contactOnly: bool) -> float:
+    """The motor speed for a perfectly solved touch.
+    This mirrors the distance based speed calculation of the MLAT solver.
+    """
+    distance = dist(touch, motor.point.xyz)/motor.point.radius
+    if contactOnly:
+        return strength if distance <= 1.0 else 0
+    return max(1.0-max(distance, 0.1), 0)*strength
+
+
+def generateTouches(groupConfig: dict, samples: int,
+                    rnd: random.Random) -> list[tuple]:
+    """Create random touch points inside the bounding box of all motors
+    (including their radius).
+    """
+    motors = groupConfig["motors"]
+    lo = [min(m["xyz"][i]-m["r"] for m in motors) for i in range(3)]
+    hi = [max(m["xyz"][i]+m["r"] for m in motors) for i in range(3)]
+    return [tuple(rnd.uniform(lo[i], hi[i]) for i in range(3))
+            for _ in range(samples)]
+
+
+def runSolver(solverType, groupKey: str, touches: list[tuple],
+              args, rnd: random.Random) -> dict:
+    """Benchmark a single solver type on the given touches."""
+    from modules.AvatarPoint import AvatarPointSphere
+    from modules.GlobalConfig import GlobalConfigSingleton
+    from modules.Measurements import MeasurementStage
+    from modules.Motor import Motor
+    from modules.Solver import SolverFactory
+
+    config = GlobalConfigSingleton.getInstance()
+    config.set(f"{groupKey}.solver.solverType", solverType.value)
+    if not args.cache:
+        config.set(f"{groupKey}.solver.cacheResolution", 0)
+    groupConfig = config.get(groupKey)
+    solverConfig = groupConfig["solver"]
+    strength = solverConfig.get("strength", 100)/100.0
+    contactOnly = solverConfig.get("contactOnly", False)
+
+    # build everything like a ContactGroup would
+    motors = [Motor(m) for m in groupConfig["motors"]]
+    referenceMotors = [Motor(m) for m in groupConfig["motors"]]
+    points = [AvatarPointSphere(p) for p in groupConfig["avatarPoints"]]
+    measurements = MeasurementStage()
+    for point in points:
+        measurements.register(point.receiverId)
+
+    solver = SolverFactory.fromType(solverType)(
+        motors, points, groupKey, measurements)
+    solver.setup()
+    solvedPoints = []
+    solver.newPointSolved.connect(lambda p, _: solvedPoints.append(p))
+
+    tickTime = 1/config.get("program.mainTps", 30)
+    now = time.time()
+    positionErrors, motorErrors, solveTimes = [], [], []
+    solved = 0
+    for touch in touches:
+        # simulate the contact receiver values of this touch
+        now += tickTime
+        for point in points:
+            if rnd.random() < args.dropout:
+                continue
+            value = max(1.0-dist(touch, point.xyz)/point.radius, 0.0)
+            value = min(max(value+rnd.gauss(0, args.noise), 0.0), 1.0) \
+                if args.noise else value
+            measurements.write(point.receiverId, now, value)
+
+        solvedPoints.clear()
+        startTime = time.perf_counter_ns()
+        solver.solve(measurements.snapshot(now))
+        solveTimes.append((time.perf_counter_ns()-startTime)/1e3)
+
+        if solvedPoints:
+            solved += 1
+            p = solvedPoints[-1]
+            positionErrors.append(dist(touch, (p.x(), p.y(), p.z())))
+
+        # compare the real motor output with the ground truth output
+        for motor, reference in zip(motors, referenceMotors):
+            reference.setSpeed(
+                expectedSpeed(touch, reference, strength, contactOnly))
+            motorErrors.append(
+                abs(motor.currentPWM-reference.currentPWM)/reference._maxPwm)
+
+    return {
+        "solveRate": solved/len(touches) if touches else 0,
+        "positionError": summarize(positionErrors),
+        "motorError": summarize(motorErrors),
+        "solveTimeUs": summarize(solveTimes),
+        "cacheHitRate": solver.resultCache.hitRate
+    }
+
+
+def runBatchScaling(groupKey: str, touches: list[tuple],
+                    args) -> dict:
+    """Measure the tick time of all MLAT groups for the per-group
+    and the batched solving path with a growing number of groups.
+    """
+    from modules.AvatarPoint import AvatarPointSphere
+    from modules.GlobalConfig import GlobalConfigSingleton
+    from modules.Measurements import MeasurementStage
+    from modules.Motor import Motor
+    from modules.Solver import MlatBatch, MlatSolver
+
+    config = GlobalConfigSingleton.getInstance()
+    config.set(f"{groupKey}.solver.solverType", "MLat")
+    config.set(f"{groupKey}.solver.cacheResolution", 0)
+    groupConfig = config.get(groupKey)
+    tickTime = 1/config.get("program.mainTps", 30)
+
+    results = {}
+    numGroups = 1
+    while numGroups <= args.maxGroups:
+        # every copy of the group gets it's own set of receivers
+        measurements = MeasurementStage()
+        solvers = []
+        for copy in range(numGroups):
+            points = [AvatarPointSphere(
+                p | {"receiverId": f"{p['receiverId']}_{copy}"})
+                for p in groupConfig["avatarPoints"]]
+            for point in points:
+                measurements.register(point.receiverId)
+            solver = MlatSolver([Motor(m) for m in groupConfig["motors"]],
+                                points, groupKey, measurements)
+            solver.setup()
+            solvers.append(solver)
+        batch = MlatBatch(solvers)
+        singleBatches = [MlatBatch([solver]) for solver in solvers]
+
+        timings = {"perGroup": [], "perGroupNumpy": [], "batched": []}
+        now = time.time()
+        for i, touch in enumerate(touches[:max(args.samples//10, 10)]):
+            now += tickTime
+            for solver in solvers:
+                for point in solver._avatarPoints:
+                    value = max(1.0-dist(touch, point.xyz)/point.radius, 0)
+                    measurements.write(point.receiverId, now, value)
+            snapshot = measurements.snapshot(now)
+
+            startTime = time.perf_counter_ns()
+            for solver in solvers:
+                solver.solve(snapshot)
+            timings["perGroup"].append(
+                (time.perf_counter_ns()-startTime)/1e3)
+
+            startTime = time.perf_counter_ns()
+            for singleBatch in singleBatches:
+                singleBatch.solve(snapshot)
+            timings["perGroupNumpy"].append(
+                (time.perf_counter_ns()-startTime)/1e3)
+
+            startTime = time.perf_counter_ns()
+            batch.solve(snapshot)
+            timings["batched"].append(
+                (time.perf_counter_ns()-startTime)/1e3)
+
+        results[str(numGroups)] = {key: summarize(values)
+                                   for key, values in timings.items()}
+        numGroups *= 2
+    return results
+
+
+def printBatchResults(results: dict) -> None:
+    """Print the tick time table of a --batch run."""
+    print(f"{'groups':>6} {'perGroup us':>14} {'perGroupNumpy us':>17} "
+          f"{'batched us':>12}")
+    for numGroups, result in results.items():
+        print(f"{numGroups:>6} {result['perGroup']['median']:>14.1f} "
+              f"{result['perGroupNumpy']['median']:>17.1f} "
+              f"{result['batched']['median']:>12.1f}")
+
+
+def printResults(results: dict, previous: dict | None = None) -> None:
+    """Print a results table, optionally with the delta to a
+    previous run."""
+    metrics = [("positionError", "mean"), ("motorError", "mean"),
+               ("solveTimeUs", "median"), ("solveTimeUs", "p95")]
+    for solverName, result in results.items():
+        print(f"{solverName}: solve rate {result['solveRate']*100:.1f}%")
+        for metric, stat in metrics:
+            value = result[metric][stat]
+            line = f"    {metric}.{stat}: " + \
+                ("-" if value is None else f"{value:.6f}")
+            oldValue = (previous or {}).get(solverName, {})\
+                .get(metric, {}).get(stat)
+            if value is not None and oldValue is not None:
+                line += f" (was {oldValue:.6f}, {value-oldValue:+.6f})"
+            print(line)
+
+
+def main() -> None:
+    args = parser.parse_args()
+
+    # work on a copy so the real config is never written to
+    workDir = Path(tempfile.mkdtemp(prefix="solverBenchmark"))
+    configFile = workDir / "config.conf"
+    shutil.copy(args.config, configFile)
+
+    from modules.GlobalConfig import GlobalConfigSingleton
+    config = GlobalConfigSingleton.fromFile(configFile.as_posix())
+    from modules.Solver import SolverFactory
+    from utils.Enums import SolverType
+
+    # silence the per-solve debug logging, it would skew the timings
+    for l in [logging.getLogger(name)
+              for name in logging.root.manager.loggerDict]:
+        l.setLevel(logging.WARNING)
+
+    groupKey = f"groups.{args.group}"
+    if not (groupConfig := config.get(groupKey)):
+        print(f"Group {args.group} does not exist in {args.config}")
+        sys.exit(1)
+
+    touchRnd = random.Random(args.seed)
+    touches = generateTouches(groupConfig, args.samples, touchRnd)
+
+    results = {}
+    if args.batch:
+        results = runBatchScaling(groupKey, touches, args)
+        printBatchResults(results)
+    else:
+        for solverType in SolverType:
+            if not SolverFactory.fromType(solverType):
+                continue
+            # every solver gets the same noise/dropout sequence
+            results[solverType.value] = runSolver(
+                solverType, groupKey, touches, args,
+                random.Random(args.seed))
+
+        previous = None
+        if args.compare:
+            previous = json.loads(Path(args.compare).read_text())["results"]
+        printResults(results, previous)
+
+    if args.output:
+        run = {
+            "timestamp": datetime.now().isoformat(),
+            "revision": gitRevision(),
+            "config": args.config,
+            "group": args.group,
+            "samples": args.samples,
+            "noise": args.noise,
+            "dropout": args.dropout,
+            "seed": args.seed,
+            "cache": args.cache,
+            "batch": args.batch,
+            "results": results
+        }
+        Path(args.output).write_text(json.dumps(run, indent=4))
+        print(f"Results written to {args.output}")
+
+    config.close()
+    shutil.rmtree(workDir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -139,6 +139,35 @@ class TabGeneral(QWidget, OptionAdapter):
 
         self.selfLayout.addRow("Group Name:", self.le_groupName)
 
+        # devices of high priority groups are sent first every tick
+        self.cb_highPriority = QCheckBox(self)
+        self.cb_highPriority.setText("High priority")
+        self.addOpt("highPriority", self.cb_highPriority, bool)
+        self.selfLayout.addRow("", self.cb_highPriority)
+
+        # the output envelope, times for a change over the full pwm range
+        self.sb_attack = QSpinBox(self)
+        self.sb_attack.setMaximum(5000)
+        self.sb_attack.setSuffix(" ms")
+        self.sb_attack.setToolTip("Ramp up time, 0 is instant")
+        self.addOpt("attackMs", self.sb_attack, int)
+        self.selfLayout.addRow("Attack:", self.sb_attack)
+
+        self.sb_release = QSpinBox(self)
+        self.sb_release.setMaximum(5000)
+        self.sb_release.setSuffix(" ms")
+        self.sb_release.setToolTip("Ramp down time, 0 is instant")
+        self.addOpt("releaseMs", self.sb_release, int)
+        self.selfLayout.addRow("Release:", self.sb_release)
+
+        self.sb_smoothing = QSpinBox(self)
+        self.sb_smoothing.setMaximum(1000)
+        self.sb_smoothing.setSuffix(" ms")
+        self.sb_smoothing.setToolTip(
+            "Time constant of the low pass on the targets, 0 is off")
+        self.addOpt("smoothingMs", self.sb_smoothing, int)
+        self.selfLayout.addRow("Smoothing:", self.sb_smoothing)
+
     def hasUnsavedOptions(self) -> bool:
         """Check if this tab has unsaved options.
 
@@ -487,13 +516,13 @@ class MLATSolverSettings(BaseSolverSettingsRow):
         self.addOpt("strength", self.sb_strength, int)
         self.selfLayout.addRow("Strength", self.sb_strength)
 
-        # upper sphere check
-        self.cb_allowOnlyUpperSphereHalf = QCheckBox(self)
-        self.cb_allowOnlyUpperSphereHalf.setText(
-            "Only allow upper sphere half")
-        self.addOpt("MLAT_enableHalfSphereCheck",
-                    self.cb_allowOnlyUpperSphereHalf, bool)
-        self.selfLayout.addRow("", self.cb_allowOnlyUpperSphereHalf)
+        # validation volume check
+        self.cb_enableVolumeCheck = QCheckBox(self)
+        self.cb_enableVolumeCheck.setText(
+            "Only allow points inside the receiver volume")
+        self.addOpt("MLAT_enableVolumeCheck",
+                    self.cb_enableVolumeCheck, bool)
+        self.selfLayout.addRow("", self.cb_enableVolumeCheck)
 
         # contact only (on/off instead of pwm, might be better in the contact point?)
         self.cb_contactOnly = QCheckBox(self)
@@ -525,16 +554,42 @@ class SINGLEN2NSolverSettings(BaseSolverSettingsRow):
         self.selfLayout.addRow("", self.cb_contactOnly)
 
 
+class SURFACESolverSettings(BaseSolverSettingsRow):
+    def buildUi(self):
+        # the strength spinbox
+        self.sb_strength = QSpinBox(self)
+        self.sb_strength.setMinimum(0)
+        self.sb_strength.setMaximum(100)
+        self.sb_strength.setSuffix(" %")
+        self.addOpt("strength", self.sb_strength, int)
+        self.selfLayout.addRow("Strength", self.sb_strength)
+
+        # the primitive fitted to the contact receivers
+        self.cb_shape = QComboBox(self)
+        self.cb_shape.addItems(["Sphere", "Capsule", "Ellipsoid"])
+        self.addOpt("SURFACE_shape", self.cb_shape)
+        self.selfLayout.addRow("Surface shape:", self.cb_shape)
+
+        # contact only (on/off instead of pwm, might be better in the contact point?)
+        self.cb_contactOnly = QCheckBox(self)
+        self.cb_contactOnly.setText("Contact only")
+        self.addOpt("contactOnly", self.cb_contactOnly, bool)
+        self.selfLayout.addRow("", self.cb_contactOnly)
+
+
 class SolverSettingsFactory:
     @staticmethod
     def fromType(solverType: SolverType) -> \
             type[MLATSolverSettings] | \
-            type[SINGLEN2NSolverSettings] | None:
+            type[SINGLEN2NSolverSettings] | \
+            type[SURFACESolverSettings] | None:
         match solverType:
             case SolverType.MLAT:
                 return MLATSolverSettings
             case SolverType.SINGLEN2N:
                 return SINGLEN2NSolverSettings
+            case SolverType.SURFACE:
+                return SURFACESolverSettings
 
 
 class contactName(str):
@@ -71,8 +71,7 @@ class HardwareDeviceSettingsDialog(QWidget, OptionAdapter):
 
         # Serial port name
         self.le_serialPort = QLineEdit(self)
-        self.le_serialPort.setEnabled(False)
-        self.le_serialPort.setReadOnly(True)
+        self.le_serialPort.setPlaceholderText("COM3 or /dev/ttyUSB0")
         self.addOpt("serialPort", self.le_serialPort)
 
         self.selfLayout.addRow("Serial Port:", self.le_serialPort)
@@ -1,9 +1,10 @@
 """The main application window."""
 
 import webbrowser
+from collections.abc import Sequence
 from functools import partial
 
-from PyQt6.QtCore import QSize, Qt
+from PyQt6.QtCore import QSize, Qt, QTimer
 from PyQt6.QtCore import pyqtSignal as QSignal
 from PyQt6.QtCore import pyqtSlot as QSlot
 from PyQt6.QtGui import QCloseEvent, QFont
@@ -14,6 +15,7 @@ from PyQt6.QtWidgets import (QFrame, QHBoxLayout, QLabel, QMainWindow,
 from modules.ContactGroup import ContactGroup
 from modules.GlobalConfig import GlobalConfigSingleton
 from modules.HardwareDevice import HardwareDevice
+from modules.LinkTelemetry import LinkStats
 from modules.Server import ServerSingleton
 from ui.ContactGroupSettings import ContactGroupSettings
 from ui.CustomLabel import StatefulLabel, StaticLabel
@@ -213,6 +215,9 @@ class MainWindow(QMainWindow):
                                        self.hardwareAreaWidgetContent)
             device.uiBatteryStateChanged.connect(newRow.lb_hwBat.setFloat)
             device.uiRssiStateChanged.connect(newRow.lb_hwRssi.setNum)
+            device.uiSendStatsChanged.connect(newRow.setSendStats)
+            device.uiQueueDelayChanged.connect(newRow.setQueueDelay)
+            device.uiLinkStatsChanged.connect(newRow.setLinkStats)
             device.deviceConnectionChanged.connect(newRow.lb_hwCon.setState)
             newRow.widgetExpansionStateChanged.connect(self._handleRowResize)
             self.hardwareAreaWidgetContentLayout.addWidget(newRow)
@@ -414,6 +419,31 @@ class HardwareDeviceRow(BaseRow):
         self.lb_hwBat.setFont(font10)
         self.hl_hwTopRow.addWidget(self.lb_hwBat)
 
+        # the sent/suppressed packet counters
+        self.lb_hwTx = StaticLabel("Tx: ", "-", "", self)
+        self.lb_hwTx.setSizePolicy(sizePolicy_PreferredMaximum)
+        self.lb_hwTx.setFont(font10)
+        self.lb_hwTx.setToolTip(
+            "Packets sent / suppressed (unchanged) / failed")
+        self.hl_hwTopRow.addWidget(self.lb_hwTx)
+
+        # the mean delay between tick end and send
+        self.lb_hwQueue = StaticLabel("Queue: ", "-", " ms", self)
+        self.lb_hwQueue.setSizePolicy(sizePolicy_PreferredMaximum)
+        self.lb_hwQueue.setFont(font10)
+        self.lb_hwQueue.setToolTip(
+            "Mean delay between the end of the tick and the send")
+        self.hl_hwTopRow.addWidget(self.lb_hwQueue)
+
+        # the link telemetry, only shown with pings enabled
+        self.lb_hwLink = StaticLabel("Link: ", "-", "", self)
+        self.lb_hwLink.setSizePolicy(sizePolicy_PreferredMaximum)
+        self.lb_hwLink.setFont(font10)
+        self.lb_hwLink.setToolTip(
+            "Round trip time ± jitter / estimated time to the device "
+            "/ lost motor frames (binary frames only)")
+        self.hl_hwTopRow.addWidget(self.lb_hwLink)
+
         # spacer
         self.spc_hwRow_1 = QSpacerItem(
             10, 2, QSizePolicy.Policy.Minimum, QSizePolicy.Policy.Minimum)
@@ -461,6 +491,41 @@ class HardwareDeviceRow(BaseRow):
             config.get(f"{self._configKey}.serialPort")
         self.lb_hwIdMac.setText(f"{id} '{name}' ({mac}/{connAddr})")
 
+    @QSlot(int, int, int)
+    def setSendStats(self, sent: int, suppressed: int, errors: int) -> None:
+        """Show the sent, suppressed and failed packet counters.
+
+        Args:
+            sent (int): The number of sent packets.
+            suppressed (int): The number of suppressed packets.
+            errors (int): The number of failed sends.
+        """
+        self.lb_hwTx.setText(f"{sent} / {suppressed} / {errors}")
+
+    @QSlot(float)
+    def setQueueDelay(self, delayMs: float) -> None:
+        """Show the mean queueing delay of the sends.
+
+        Args:
+            delayMs (float): The mean delay in ms.
+        """
+        self.lb_hwQueue.setText(f"{delayMs:.1f}")
+
+    @QSlot(object)
+    def setLinkStats(self, stats: LinkStats) -> None:
+        """Show the link telemetry of the device.
+
+        Args:
+            stats (LinkStats): The current stats, empty to reset.
+        """
+        if not stats.samples:
+            self.lb_hwLink.setText("-")
+            return
+        loss = "-" if stats.loss is None else f"{stats.loss:.1%}"
+        self.lb_hwLink.setText(
+            f"{stats.rttMs:.1f}±{stats.jitterMs:.1f} / "
+            f"{stats.oneWayMs:.1f} ms / {loss}")
+
     def _openExpandingWidget(self) -> None:
         """Create the expanding widget and initialize it."""
         widget = HardwareDeviceMoreInfoWidget(self)
@@ -527,11 +592,11 @@ class HardwareDeviceMoreInfoWidget(QWidget):
         device.motorDataSent.connect(self._handleMotorData)
         self.bt_stopAllMotors.clicked.connect(device.resetAllPinStates)
 
-    def _handleMotorData(self, values: list[int]) -> None:
-        """Writes the list of PWM values into the slider rows.
+    def _handleMotorData(self, values: Sequence[int]) -> None:
+        """Writes the PWM values into the slider rows.
 
         Args:
-            values (list): The list of PWM values.
+            values (Sequence[int]): The PWM value per channel.
         """
         try:
             for i, row in enumerate(self.rows):
@@ -758,6 +823,9 @@ class ContactGroupRow(BaseRow):
 
 
 class ContactGroupPointsWidget(QWidget):
+    # the motor values are polled while the widget is open
+    REFRESH_INTERVAL_MS = 100
+
     def __init__(self, *args, **kwargs) -> None:
         """Initialize ContactGroupPointsWidget."""
         logger.debug(f"Creating {__class__.__name__}")
@@ -788,12 +856,21 @@ class ContactGroupPointsWidget(QWidget):
         Args:
             contactGroup (ContactGroup): The contact group reference
         """
+        self._contactGroupRef = contactGroup
         self.rows: list[PointDetailsRow] = []
         for motor in contactGroup.motors:
             row = PointDetailsRow(motor._name)
-            motor.speedChanged.connect(row.updateValue)
             self.selfLayout.addLayout(row)
             self.rows.append(row)
+        self._refreshTimer = QTimer(self)
+        self._refreshTimer.timeout.connect(self._refreshValues)
+        self._refreshTimer.start(self.REFRESH_INTERVAL_MS)
+        self._refreshValues()
+
+    def _refreshValues(self) -> None:
+        """Show the current speed of every motor."""
+        for motor, row in zip(self._contactGroupRef.motors, self.rows):
+            row.updateValue(motor.currentSpeed)
 
     # handle the close event
     def closeEvent(self, event: QCloseEvent) -> None:
@@ -803,6 +880,8 @@ class ContactGroupPointsWidget(QWidget):
             event QCloseEvent): The QCloseEvent.
         """
         logger.debug(f"closeEvent in {__class__.__name__}")
+        if hasattr(self, "_refreshTimer"):
+            self._refreshTimer.stop()
 
 
 class PointDetailsRow(ExpandedWidgetDataRowBase):
@@ -821,7 +900,7 @@ class PointDetailsRow(ExpandedWidgetDataRowBase):
         self.addWidget(self.lb_groupPointValue, 0, Qt.AlignmentFlag.AlignLeft)
         self.addStretch(1)
 
-    def updateValue(self, a1: int, a2: int, value: float) -> None:
+    def updateValue(self, value: float) -> None:
         self.lb_groupPointValue.setFloat(value)
 
 
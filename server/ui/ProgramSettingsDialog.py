@@ -75,6 +75,55 @@ class ProgramSettingsDialog(QWidget, OptionAdapter):
 
         self.selfLayout.addRow("TPS:", self.sb_tps)
 
+        # batched mlat solving
+        self.cb_batchMlat = QCheckBox(self)
+        self.cb_batchMlat.setText("Solve all MLat groups in one batch")
+        self.addOpt("batchMlat", self.cb_batchMlat, dataType=bool)
+        self.selfLayout.addRow("", self.cb_batchMlat)
+
+        # hardware keepalive, must stay below the firmware's 1s timeout
+        self.sb_hwKeepalive = QSpinBox(self)
+        self.sb_hwKeepalive.setMinimum(50)
+        self.sb_hwKeepalive.setMaximum(800)
+        self.sb_hwKeepalive.setSuffix(" ms")
+        self.addOpt("hwKeepaliveMs", self.sb_hwKeepalive, dataType=int)
+        self.selfLayout.addRow("Hardware keepalive:", self.sb_hwKeepalive)
+
+        # spread the hardware sends over a part of the tick
+        self.sb_hwPacing = QSpinBox(self)
+        self.sb_hwPacing.setMinimum(0)
+        self.sb_hwPacing.setMaximum(90)
+        self.sb_hwPacing.setSuffix(" %")
+        self.sb_hwPacing.setToolTip(
+            "Spread the hardware sends over this part of the tick time, "
+            "0 sends all at once")
+        self.addOpt("hwPacingPercent", self.sb_hwPacing, dataType=int)
+        self.selfLayout.addRow("Hardware send pacing:", self.sb_hwPacing)
+
+        # send the output envelope in between the ticks
+        self.sb_outputRate = QSpinBox(self)
+        self.sb_outputRate.setMinimum(0)
+        self.sb_outputRate.setMaximum(500)
+        self.sb_outputRate.setSuffix(" Hz")
+        self.sb_outputRate.setToolTip(
+            "Send the motor ramps at this rate in between the ticks, "
+            "0 only sends once per tick")
+        self.addOpt("outputRateHz", self.sb_outputRate, dataType=int)
+        self.selfLayout.addRow("Output rate:", self.sb_outputRate)
+
+        # link quality pings
+        self.sb_hwTelemetry = QSpinBox(self)
+        self.sb_hwTelemetry.setMinimum(0)
+        self.sb_hwTelemetry.setMaximum(10000)
+        self.sb_hwTelemetry.setSingleStep(100)
+        self.sb_hwTelemetry.setSuffix(" ms")
+        self.sb_hwTelemetry.setToolTip(
+            "Ping the hardware at this interval to measure round trip "
+            "time, latency and frame loss, 0 disables it")
+        self.addOpt("hwTelemetryIntervalMs", self.sb_hwTelemetry,
+                    dataType=int)
+        self.selfLayout.addRow("Link telemetry:", self.sb_hwTelemetry)
+
         # log level
         self.cb_logLevel = QComboBox(self)
         for level in LoggerClass.getLoggingLevelStrings():
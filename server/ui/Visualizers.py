@@ -41,6 +41,13 @@ class MLATVisualizerWindow(QWidget):
         self.bt_clearPlot.clicked.connect(self.visualizer.clearPlot)
         self.buttonRowLayout.addWidget(self.bt_clearPlot)
 
+        if self.visualizer.hasOverlay():
+            self.bt_toggleOverlay = QPushButton("Toggle Overlay")
+            self.bt_toggleOverlay.setMaximumHeight(30)
+            self.bt_toggleOverlay.clicked.connect(
+                self.visualizer.toggleOverlay)
+            self.buttonRowLayout.addWidget(self.bt_toggleOverlay)
+
         self.selfLayout.addLayout(self.buttonRowLayout)
 
     def closeEvent(self, event: QCloseEvent) -> None:
@@ -58,6 +65,7 @@ class MLATVisualizer(QWidget):
 
         self._series: list[QScatter3DSeries] = []
         self._seriesMap: dict[int, int] = {}
+        self._overlaySeriesIndex: int | None = None
         self._trailLength = 150
         self._contactGroupRef = groupRef
 
@@ -73,6 +81,7 @@ class MLATVisualizer(QWidget):
         self._createSeries(
             [point for point in self._contactGroupRef.avatarPoints],
             QColorConstants.Blue, 0.05)
+        self._drawSolverOverlay()
 
     def buildUi(self) -> None:
         """Initialize UI elements."""
@@ -123,6 +132,33 @@ class MLATVisualizer(QWidget):
                     Q3DCamera.CameraPreset.CameraPresetIsometricRight)
                 camera.setZoomLevel(160)
 
+    def _drawSolverOverlay(self) -> None:
+        """Draws the solver's validation volume or constraint surface
+        (if it has one) as a transparent overlay."""
+        solver = self._contactGroupRef.solver
+        overlay = getattr(solver, "validationVolume", None) \
+            or getattr(solver, "surface", None)
+        if overlay is None:
+            return
+        self._overlaySeriesIndex = self._createSeries(
+            [QVector3D(*p) for p in overlay.surfacePoints()],
+            QColor(128, 128, 128, 40), 0.01)
+
+    def hasOverlay(self) -> bool:
+        """Check if a solver overlay was drawn.
+
+        Returns:
+            bool: True if the overlay exists, otherwise False.
+        """
+        return self._overlaySeriesIndex is not None
+
+    @QSlot()
+    def toggleOverlay(self) -> None:
+        """Show or hide the solver overlay."""
+        if self._overlaySeriesIndex is not None:
+            series = self._series[self._overlaySeriesIndex]
+            series.setVisible(not series.isVisible())
+
     @QSlot(QVector3D, int)
     def handleDataPoint(self, point: QVector3D, id: int = 0) -> None:
         """Adds a single point to the plot.
@@ -199,6 +235,6 @@ class VisualizerFactory:
     def fromType(solverType: SolverType) -> \
             type[MLATVisualizerWindow] | None:
         match solverType:
-            case SolverType.MLAT:
+            case SolverType.MLAT | SolverType.SURFACE:
                 return MLATVisualizerWindow
         return None
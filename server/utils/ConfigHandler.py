@@ -1,4 +1,5 @@
 import json
+import os
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Any
@@ -49,7 +50,8 @@ class FileHelper(IConfigHandler):
 
     def write(self, data: dict) -> bool:
         """Write all data into the configuration file.
-        Avoids config corruption by writing into a temp file first.
+        Avoids config corruption by writing into a temp file first, that
+        is synced to disk before it replaces the file.
 
         Args:
             data (dict): The data to write to the file.
@@ -61,6 +63,8 @@ class FileHelper(IConfigHandler):
         try:
             with open(self._tempfile, mode="w") as f:
                 json.dump(data, f, indent=4)
+                f.flush()
+                os.fsync(f.fileno())
         except Exception as E:
             logger.exception(E)
             if self._tempfile.exists():
@@ -12,6 +12,11 @@ class ConfigTemplate:
             "vrcOscReceiveAddress": "127.0.0.1",
             "enableOscDiscovery": True,
             "mainTps": 40,
+            "batchMlat": False,
+            "hwKeepaliveMs": 250,
+            "hwPacingPercent": 0,
+            "outputRateHz": 0,
+            "hwTelemetryIntervalMs": 0,
             "logLevel": "DEBUG"
         },
         "esps": {
@@ -22,13 +27,18 @@ class ConfigTemplate:
                 "lastIp": "127.0.0.1",
                 "wifiMac": "FF:FF:FF:AA:AA:AA",
                 "serialPort": "",
-                "numMotors": 0
+                "numMotors": 0,
+                "binaryFrames": False
             }
         },
         "groups": {
             "group0": {
                 "id": 0,
                 "name": "Group 1",
+                "highPriority": False,
+                "attackMs": 0,
+                "releaseMs": 200,
+                "smoothingMs": 0,
                 "motors": [
                     {
                         "name": "Motor 1",
@@ -62,8 +72,12 @@ class ConfigTemplate:
                     "solverType": "MLat",
                     "strength": 100,
                     "contactOnly": False,
-                    "MLAT_enableHalfSphereCheck": True,
-                    "SINGLEN2N_minMaxMode": "Max"
+                    "MLAT_enableVolumeCheck": True,
+                    "MLAT_volumeResolution": 32,
+                    "SINGLEN2N_minMaxMode": "Max",
+                    "SURFACE_shape": "Sphere",
+                    "cacheResolution": 0.01,
+                    "cacheSize": 64
                 }
             }
         }
@@ -73,12 +87,26 @@ class ConfigTemplate:
         "solverType": "MLat",
         "strength": 100,
         "contactOnly": False,
-        "MLAT_enableHalfSphereCheck": False
+        "MLAT_enableVolumeCheck": False,
+        "MLAT_volumeResolution": 32,
+        "cacheResolution": 0.01,
+        "cacheSize": 64
+    }
+
+    SOLVER_SURFACE = {
+        "solverType": "Surface",
+        "strength": 100,
+        "contactOnly": False,
+        "SURFACE_shape": "Sphere",
+        "cacheResolution": 0.01,
+        "cacheSize": 64
     }
 
     SOLVER_SINGLEN2N = {
         "solverType": "Single n:n",
         "strength": 100,
         "contactOnly": False,
-        "SINGLEN2N_mode": "Mean"
+        "SINGLEN2N_mode": "Mean",
+        "cacheResolution": 0.01,
+        "cacheSize": 64
     }
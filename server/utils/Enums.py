@@ -12,6 +12,7 @@ class SolverType(str, Enum):
     SINGLEN2N = "Single n:n"
     LINEARGROUP = "Linear Group"
     DPSLINEAR = "DPS Linear"
+    SURFACE = "Surface"
 
 
 class VisualizerType(str, Enum):